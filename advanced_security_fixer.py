@@ -10,6 +10,20 @@ import re
 from pathlib import Path
 from typing import Dict, List, Any
 
+from security_scanner import SecretScanner
+
+# Common environment variable patterns; the first matching pattern wins
+ENV_VARIABLE_PATTERNS = {
+    'api_key': 'API_KEY',
+    'access_token': 'ACCESS_TOKEN',
+    'secret': 'SECRET_KEY',
+    'password': 'PASSWORD',
+    'url': 'BASE_URL',
+    'endpoint': 'API_ENDPOINT',
+    'webhook_url': 'WEBHOOK_URL'
+}
+ENV_VARIABLE_SCANNER = SecretScanner(key_rules={'env': list(ENV_VARIABLE_PATTERNS)}, scan_urls=False)
+
 class AdvancedSecurityFixer:
     def __init__(self, workflows_dir="workflows"):
         self.workflows_dir = Path(workflows_dir)
@@ -97,40 +111,13 @@ class AdvancedSecurityFixer:
     
     def fix_environment_variables(self, workflow_data: Dict) -> Dict:
         """Replace hardcoded values with environment variables"""
-        fixed = False
+        def env_placeholder(finding):
+            if isinstance(finding.value, str) and not finding.value.startswith('{{'):
+                return f"{{{{ $env.{ENV_VARIABLE_PATTERNS[finding.match]} }}}}"
+            return None
         
-        def replace_env_values(obj, path=""):
-            nonlocal fixed
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
-                    
-                    # Common environment variable patterns
-                    env_patterns = {
-                        'api_key': 'API_KEY',
-                        'access_token': 'ACCESS_TOKEN',
-                        'secret': 'SECRET_KEY',
-                        'password': 'PASSWORD',
-                        'url': 'BASE_URL',
-                        'endpoint': 'API_ENDPOINT',
-                        'webhook_url': 'WEBHOOK_URL'
-                    }
-                    
-                    for pattern, env_var in env_patterns.items():
-                        if pattern in key.lower() and value:
-                            if isinstance(value, str) and not value.startswith('{{'):
-                                obj[key] = f"{{{{ $env.{env_var} }}}}"
-                                fixed = True
-                    
-                    # Recursively process nested structures
-                    replace_env_values(value, current_path)
-                    
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    replace_env_values(item, f"{path}[{i}]")
-        
-        replace_env_values(workflow_data)
-        return workflow_data, fixed
+        workflow_data, findings = ENV_VARIABLE_SCANNER.redact(workflow_data, key_replacement=env_placeholder)
+        return workflow_data, bool(findings)
     
     def fix_single_workflow(self, workflow_path: Path) -> Dict[str, Any]:
         """Fix security issues in a single workflow"""
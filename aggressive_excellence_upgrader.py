@@ -17,6 +17,8 @@ import concurrent.futures
 import threading
 from dataclasses import dataclass
 
+from backup_store import BackupStore, DEFAULT_STORE_DIR
+
 @dataclass
 class WorkflowQuality:
     """Quality metrics for a workflow"""
@@ -30,16 +32,15 @@ class WorkflowQuality:
 class AggressiveExcellenceUpgrader:
     """Aggressive upgrader to achieve 100% excellent quality"""
     
-    def __init__(self, workflows_dir="workflows", backup_dir="workflows_backup", max_workers=4):
+    def __init__(self, workflows_dir="workflows", backup_dir=DEFAULT_STORE_DIR, max_workers=4):
         self.workflows_dir = Path(workflows_dir)
         self.backup_dir = Path(backup_dir)
+        self.backup_store = BackupStore(backup_dir)
+        self.backup_run = None
         self.max_workers = max_workers
         self.upgrade_stats = defaultdict(int)
         self.quality_metrics = defaultdict(list)
         self.thread_lock = threading.Lock()
-        
-        # Create backup directory
-        self.backup_dir.mkdir(exist_ok=True)
     
     def calculate_workflow_quality(self, workflow_data: Dict) -> WorkflowQuality:
         """Calculate comprehensive quality score for workflow"""
@@ -590,6 +591,10 @@ class AggressiveExcellenceUpgrader:
             # Calculate final quality
             final_quality = self.calculate_workflow_quality(workflow_data)
             
+            # Back up the original content before overwriting it
+            if self.backup_run:
+                self.backup_run.add_file(workflow_path)
+            
             # Save upgraded workflow
             with open(workflow_path, 'w', encoding='utf-8') as f:
                 json.dump(workflow_data, f, indent=2, ensure_ascii=False)
@@ -636,33 +641,36 @@ class AggressiveExcellenceUpgrader:
         
         print(f"📊 Found {len(workflow_files)} workflows to upgrade")
         
-        # Process workflows in parallel
-        upgrade_results = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_workflow = {
-                executor.submit(self.upgrade_single_workflow, workflow_file): workflow_file 
-                for workflow_file in workflow_files
-            }
+        with self.backup_store.begin_run('aggressive_excellence', self.workflows_dir) as self.backup_run:
+            # Process workflows in parallel
+            upgrade_results = []
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                future_to_workflow = {
+                    executor.submit(self.upgrade_single_workflow, workflow_file): workflow_file 
+                    for workflow_file in workflow_files
+                }
             
-            completed = 0
-            for future in concurrent.futures.as_completed(future_to_workflow):
-                workflow_file = future_to_workflow[future]
-                try:
-                    result = future.result()
-                    upgrade_results.append(result)
-                    completed += 1
+                completed = 0
+                for future in concurrent.futures.as_completed(future_to_workflow):
+                    workflow_file = future_to_workflow[future]
+                    try:
+                        result = future.result()
+                        upgrade_results.append(result)
+                        completed += 1
                     
-                    if completed % 100 == 0:
-                        print(f"⏳ Processed {completed}/{len(workflow_files)} workflows...")
+                        if completed % 100 == 0:
+                            print(f"⏳ Processed {completed}/{len(workflow_files)} workflows...")
                         
-                except Exception as e:
-                    print(f"❌ Error processing {workflow_file.name}: {e}")
-                    upgrade_results.append({
-                        'filename': workflow_file.name,
-                        'category': workflow_file.parent.name,
-                        'error': str(e),
-                        'success': False
-                    })
+                    except Exception as e:
+                        print(f"❌ Error processing {workflow_file.name}: {e}")
+                        upgrade_results.append({
+                            'filename': workflow_file.name,
+                            'category': workflow_file.parent.name,
+                            'error': str(e),
+                            'success': False
+                        })
+        
+        print(f"📦 Originals backed up as run {self.backup_run.run_id} (restore: python backup_store.py restore {self.backup_run.run_id})")
         
         # Calculate final statistics
         successful_upgrades = sum(1 for r in upgrade_results if r.get('success', False))
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Workflow Analysis Store
+Persistent per-workflow analysis results for the offline analyzers.
+
+Each analyzer (performance, validation, health, patterns, dashboard)
+stores one row per workflow file, keyed by its path relative to the
+workflows directory (so "workflows" and "./workflows" share rows) and
+validated by the file's MD5 hash and the analyzer's version. On the next run unchanged files are reused straight
+from SQLite (size + mtime fast path, hash confirmation on mismatch), so
+re-running after editing five workflows only analyzes those five.
+Reports are built with SQL aggregation over the stored rows instead of
+walking every result in Python.
+
+Bump an analyzer's ANALYZER_VERSION whenever its scoring changes; rows
+written by another version are recomputed.
+
+Usage:
+  python analysis_store.py                 # list analyzers and row counts
+  python analysis_store.py --clear validator
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_ANALYSIS_DB = os.environ.get('ANALYSIS_DB_PATH', 'database/analysis.db')
+
+# (label, lower bound inclusive, upper bound exclusive); None means unbounded
+ScoreBand = Tuple[str, Optional[float], Optional[float]]
+
+
+@dataclass
+class AnalysisRecord:
+    """Result of analyzing one workflow, plus the columns reports aggregate on.
+
+    labels holds countable facts per kind, e.g. {'issue': {'Missing name': 1}};
+    they are stored in a side table so reports can GROUP BY them.
+    """
+    result: Dict[str, Any]
+    workflow_name: Optional[str] = None
+    score: Optional[float] = None
+    status: Optional[str] = None
+    node_count: Optional[int] = None
+    issue_count: Optional[int] = None
+    has_error_handling: Optional[bool] = None
+    labels: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+
+@dataclass
+class AnalysisRunStats:
+    """What a store run did."""
+    analyzer: str
+    total: int = 0
+    analyzed: int = 0
+    reused: int = 0
+    removed: int = 0
+
+    def summary(self) -> str:
+        return (f"♻️  {self.analyzer}: {self.analyzed} analyzed, {self.reused} reused from cache, "
+                f"{self.removed} removed ({self.total} workflows)")
+
+
+class AnalysisStore:
+    """SQLite store of per-workflow analysis results."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DEFAULT_ANALYSIS_DB
+        if self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.init_database()
+
+    def init_database(self):
+        """Create tables and indexes if needed."""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS analysis_results (
+                analyzer TEXT NOT NULL,
+                path TEXT NOT NULL,
+                analyzer_version INTEGER NOT NULL,
+                file_hash TEXT NOT NULL,
+                file_size INTEGER,
+                file_mtime_ns INTEGER,
+                category TEXT,
+                filename TEXT,
+                workflow_name TEXT,
+                score REAL,
+                status TEXT,
+                node_count INTEGER,
+                issue_count INTEGER,
+                has_error_handling INTEGER,
+                result TEXT NOT NULL,
+                analyzed_at TEXT,
+                PRIMARY KEY (analyzer, path)
+            );
+
+            CREATE TABLE IF NOT EXISTS analysis_labels (
+                analyzer TEXT NOT NULL,
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                label TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 1
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_analysis_score ON analysis_results(analyzer, score);
+            CREATE INDEX IF NOT EXISTS idx_analysis_status ON analysis_results(analyzer, status);
+            CREATE INDEX IF NOT EXISTS idx_analysis_labels ON analysis_labels(analyzer, kind, label);
+            CREATE INDEX IF NOT EXISTS idx_analysis_labels_path ON analysis_labels(analyzer, path);
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def get_file_hash(file_path: Union[str, Path]) -> str:
+        """MD5 of a file, matching WorkflowDatabase.get_file_hash."""
+        hash_md5 = hashlib.md5()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                hash_md5.update(chunk)
+        return hash_md5.hexdigest()
+
+    @staticmethod
+    def path_key(path: Path, root: Optional[Union[str, Path]] = None) -> str:
+        """Row key of a file: its path relative to root, else its resolved path."""
+        resolved = path.resolve()
+        if root is not None:
+            try:
+                return resolved.relative_to(Path(root).resolve()).as_posix()
+            except ValueError:
+                pass
+        return resolved.as_posix()
+
+    def run(self, analyzer: str, version: int, files: Iterable[Path],
+            analyze: Callable[[Path], AnalysisRecord],
+            force: bool = False, prune: bool = True,
+            root: Optional[Union[str, Path]] = None) -> AnalysisRunStats:
+        """Analyze new or changed files and reuse stored results for the rest.
+
+        Files are keyed relative to root (the workflows directory) when
+        given. Rows for files that no longer exist are removed when prune
+        is set, so aggregates always describe the current tree.
+        """
+        stats = AnalysisRunStats(analyzer)
+        known = {
+            row['path']: row for row in self.conn.execute(
+                "SELECT path, analyzer_version, file_hash, file_size, file_mtime_ns "
+                "FROM analysis_results WHERE analyzer = ?", (analyzer,))
+        }
+        seen = set()
+
+        with self.conn:
+            for path in files:
+                path = Path(path)
+                key = self.path_key(path, root)
+                seen.add(key)
+                stats.total += 1
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+
+                row = known.get(key)
+                if row is not None and not force and row['analyzer_version'] == version:
+                    if row['file_size'] == st.st_size and row['file_mtime_ns'] == st.st_mtime_ns:
+                        stats.reused += 1
+                        continue
+                    file_hash = self.get_file_hash(path)
+                    if row['file_hash'] == file_hash:
+                        # Touched but not edited: refresh the fast-path stamp only
+                        self.conn.execute(
+                            "UPDATE analysis_results SET file_size = ?, file_mtime_ns = ? "
+                            "WHERE analyzer = ? AND path = ?",
+                            (st.st_size, st.st_mtime_ns, analyzer, key))
+                        stats.reused += 1
+                        continue
+                else:
+                    file_hash = self.get_file_hash(path)
+
+                record = analyze(path)
+                self._store(analyzer, version, key, path, file_hash, st, record)
+                stats.analyzed += 1
+
+            if prune:
+                stale = [key for key in known if key not in seen]
+                for key in stale:
+                    self.conn.execute("DELETE FROM analysis_results WHERE analyzer = ? AND path = ?",
+                                      (analyzer, key))
+                    self.conn.execute("DELETE FROM analysis_labels WHERE analyzer = ? AND path = ?",
+                                      (analyzer, key))
+                stats.removed = len(stale)
+
+        return stats
+
+    def _store(self, analyzer: str, version: int, key: str, path: Path, file_hash: str,
+               st: os.stat_result, record: AnalysisRecord):
+        has_error_handling = None if record.has_error_handling is None else int(record.has_error_handling)
+        self.conn.execute("""
+            INSERT OR REPLACE INTO analysis_results (
+                analyzer, path, analyzer_version, file_hash, file_size, file_mtime_ns,
+                category, filename, workflow_name, score, status, node_count,
+                issue_count, has_error_handling, result, analyzed_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (analyzer, key, version, file_hash, st.st_size, st.st_mtime_ns,
+              path.parent.name, path.name, record.workflow_name, record.score, record.status,
+              record.node_count, record.issue_count, has_error_handling,
+              json.dumps(record.result, ensure_ascii=False), datetime.now().isoformat()))
+
+        self.conn.execute("DELETE FROM analysis_labels WHERE analyzer = ? AND path = ?", (analyzer, key))
+        self.conn.executemany(
+            "INSERT INTO analysis_labels (analyzer, path, kind, label, count) VALUES (?, ?, ?, ?, ?)",
+            [(analyzer, key, kind, label, count)
+             for kind, counts in record.labels.items() for label, count in counts.items()])
+
+    # --- Aggregation -----------------------------------------------------
+
+    def rows(self, analyzer: str, columns: Sequence[str] = ("result",), order_by: str = "path",
+             limit: Optional[int] = None, where: str = "", params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Stored rows as dicts, optionally filtered/ordered by SQL fragments; result is decoded."""
+        sql = f"SELECT {', '.join(columns)} FROM analysis_results WHERE analyzer = ?"
+        if where:
+            sql += f" AND ({where})"
+        sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = []
+        for row in self.conn.execute(sql, (analyzer, *params)):
+            item = dict(row)
+            if 'result' in item:
+                item['result'] = json.loads(item['result'])
+            rows.append(item)
+        return rows
+
+    def results(self, analyzer: str, order_by: str = "path", limit: Optional[int] = None,
+                where: str = "", params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Stored result dicts, optionally filtered/ordered by SQL fragments on result columns."""
+        return [row['result'] for row in self.rows(analyzer, ("result",), order_by, limit, where, params)]
+
+    def count(self, analyzer: str, where: str = "", params: Sequence[Any] = ()) -> int:
+        sql = "SELECT COUNT(*) FROM analysis_results WHERE analyzer = ?"
+        if where:
+            sql += f" AND ({where})"
+        return self.conn.execute(sql, (analyzer, *params)).fetchone()[0]
+
+    def score_summary(self, analyzer: str) -> Dict[str, Any]:
+        """Count, mean, median, min and max of the score column."""
+        row = self.conn.execute(
+            "SELECT COUNT(score), AVG(score), MIN(score), MAX(score) "
+            "FROM analysis_results WHERE analyzer = ?", (analyzer,)).fetchone()
+        count = row[0]
+        if not count:
+            return {'count': 0}
+
+        # Median: the middle one or two scores, fetched in index order
+        offset = (count - 1) // 2
+        middle = [r[0] for r in self.conn.execute(
+            "SELECT score FROM analysis_results WHERE analyzer = ? AND score IS NOT NULL "
+            "ORDER BY score LIMIT ? OFFSET ?", (analyzer, 2 - count % 2, offset))]
+        return {
+            'count': count,
+            'average': row[1],
+            'median': sum(middle) / len(middle),
+            'min': row[2],
+            'max': row[3]
+        }
+
+    def score_distribution(self, analyzer: str, bands: Sequence[ScoreBand]) -> Dict[str, int]:
+        """Count scores per band in one query; bands are checked in order like an if/elif chain."""
+        cases, params = [], []
+        for label, low, high in bands:
+            conditions = []
+            if low is not None:
+                conditions.append("score >= ?")
+                params.append(low)
+            if high is not None:
+                conditions.append("score < ?")
+                params.append(high)
+            cases.append(f"WHEN {' AND '.join(conditions) or '1'} THEN ?")
+            params.append(label)
+        sql = (f"SELECT CASE {' '.join(cases)} END AS band, COUNT(*) FROM analysis_results "
+               f"WHERE analyzer = ? AND score IS NOT NULL GROUP BY band")
+        counts = {label: 0 for label, _, _ in bands}
+        for band, count in self.conn.execute(sql, (*params, analyzer)):
+            if band in counts:
+                counts[band] = count
+        return counts
+
+    def status_counts(self, analyzer: str) -> Dict[str, int]:
+        return {row[0]: row[1] for row in self.conn.execute(
+            "SELECT status, COUNT(*) FROM analysis_results WHERE analyzer = ? GROUP BY status",
+            (analyzer,))}
+
+    def totals(self, analyzer: str, expressions: Dict[str, str], group_by: Optional[str] = None,
+               where: str = "") -> Dict[str, Any]:
+        """Named aggregate expressions, overall or per value of a column (category, status, ...).
+
+        Example: totals('dashboard', {'nodes': 'SUM(node_count)'}, group_by='category')
+        """
+        select = ", ".join(f"{expression} AS {name}" for name, expression in expressions.items())
+        condition = f" AND ({where})" if where else ""
+        if group_by is None:
+            row = self.conn.execute(f"SELECT {select} FROM analysis_results WHERE analyzer = ?{condition}",
+                                    (analyzer,)).fetchone()
+            return dict(row)
+        if group_by not in ('category', 'status', 'has_error_handling'):
+            raise ValueError(f"cannot group by {group_by}")
+        return {row[0]: {name: row[name] for name in expressions} for row in self.conn.execute(
+            f"SELECT {group_by}, {select} FROM analysis_results WHERE analyzer = ?{condition} "
+            f"GROUP BY {group_by} ORDER BY COUNT(*) DESC, {group_by}", (analyzer,))}
+
+    def label_counts(self, analyzer: str, kind: str, limit: Optional[int] = None,
+                     per_workflow: bool = False) -> List[Tuple[str, int]]:
+        """Most common labels of a kind; per_workflow counts workflows instead of summing uses."""
+        measure = "COUNT(DISTINCT path)" if per_workflow else "SUM(count)"
+        sql = (f"SELECT label, {measure} AS total FROM analysis_labels "
+               f"WHERE analyzer = ? AND kind = ? GROUP BY label ORDER BY total DESC, label")
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [(row[0], row[1]) for row in self.conn.execute(sql, (analyzer, kind))]
+
+    def aggregate(self, analyzer: str, *expressions: str) -> Tuple[Any, ...]:
+        """Evaluate aggregate SQL expressions (e.g. "AVG(json_extract(result, '$.x'))") over an analyzer's rows."""
+        sql = f"SELECT {', '.join(expressions)} FROM analysis_results WHERE analyzer = ?"
+        return tuple(self.conn.execute(sql, (analyzer,)).fetchone())
+
+    def analyzers(self) -> List[Tuple[str, int, int]]:
+        """(analyzer, version, rows) for everything stored."""
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT analyzer, MAX(analyzer_version), COUNT(*) FROM analysis_results "
+            "GROUP BY analyzer ORDER BY analyzer")]
+
+    def clear(self, analyzer: str) -> int:
+        with self.conn:
+            removed = self.conn.execute("DELETE FROM analysis_results WHERE analyzer = ?",
+                                        (analyzer,)).rowcount
+            self.conn.execute("DELETE FROM analysis_labels WHERE analyzer = ?", (analyzer,))
+        return removed
+
+
+def workflow_files(workflows_dir: Union[str, Path]) -> List[Path]:
+    """Workflow JSON files one level below the category directories, in stable order."""
+    workflows_dir = Path(workflows_dir)
+    files = []
+    for category_dir in sorted(workflows_dir.iterdir()):
+        if category_dir.is_dir():
+            files.extend(sorted(category_dir.glob('*.json')))
+    return files
+
+
+def main():
+    """Inspect or clear stored analysis results."""
+    import argparse
+
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+    parser = argparse.ArgumentParser(description='Inspect the per-workflow analysis store')
+    parser.add_argument('--db', default=DEFAULT_ANALYSIS_DB)
+    parser.add_argument('--clear', metavar='ANALYZER', help='Drop stored results for an analyzer')
+    args = parser.parse_args()
+
+    store = AnalysisStore(args.db)
+    if args.clear:
+        removed = store.clear(args.clear)
+        print(f"🗑️  Removed {removed} stored {args.clear} results")
+        return
+
+    rows = store.analyzers()
+    if not rows:
+        print("📭 No stored analysis results")
+    for analyzer, version, count in rows:
+        print(f"   {analyzer} (v{version}): {count} workflows")
+
+
+if __name__ == "__main__":
+    main()
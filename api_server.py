@@ -4,20 +4,30 @@ FastAPI Server for N8N Workflow Documentation
 High-performance API with sub-100ms response times.
 """
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Header
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, field_validator
 from typing import Optional, List, Dict, Any
+import hashlib
+import hmac
 import json
 import os
+import sys
+import time
 import asyncio
 from pathlib import Path
-import uvicorn
+from urllib.parse import quote
 
 from workflow_db import WorkflowDatabase
+from workflow_diagrams import DEFAULT_MAX_NODES, diagram_etag, generate_lod_diagram
+from request_metrics import REQUEST_METRICS, RequestMetricsMiddleware
+from metrics_registry import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from broadcast_hub import BROADCAST_HUB
+from query_profiler import QUERY_PROFILER
+from db_snapshots import request_reindex
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -35,20 +45,56 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so recorded latency covers compression and CORS handling too
+app.add_middleware(RequestMetricsMiddleware, metrics=REQUEST_METRICS)
+
+class LazyDatabase:
+    """WorkflowDatabase opened on first use, so importing this module touches no files.
+    
+    Every worker process of a multi-worker server imports the module; the
+    database is opened (and, in rw mode, migrated) only once it is needed,
+    with the options given to create_app().
+    """
+    
+    def __init__(self):
+        self._db: Optional[WorkflowDatabase] = None
+        self._options: Dict[str, Any] = {}
+    
+    def configure(self, **options):
+        self._options = options
+        self._db = None
+    
+    def __getattr__(self, name):
+        if self._db is None:
+            self._db = WorkflowDatabase(**self._options)
+        return getattr(self._db, name)
+
 
 # Initialize database
-db = WorkflowDatabase()
+db = LazyDatabase()
+_performance_monitor = None
+
+
+def create_app(db_path: Optional[str] = None, mode: Optional[str] = None) -> FastAPI:
+    """App factory: `uvicorn api_server:create_app --factory` (one call per worker).
+    
+    db_path and mode default to WORKFLOW_DB_PATH and WORKFLOW_DB_MODE; workers
+    serving a published snapshot use mode "snapshot" (see db_snapshots).
+    """
+    db.configure(db_path=db_path, mode=mode)
+    return app
 
 # Startup function to verify database
 @app.on_event("startup")
 async def startup_event():
-    """Verify database connectivity on startup."""
+    """Verify database connectivity on startup (one cheap query; see /health/ready)."""
     try:
-        stats = db.get_stats()
-        if stats['total'] == 0:
+        if _performance_monitor is not None:
+            _performance_monitor.db_path = db.db_path
+        if not db.is_indexed():
             print("⚠️  Warning: No workflows found in database. Run indexing first.")
         else:
-            print(f"✅ Database connected: {stats['total']} workflows indexed")
+            print(f"✅ Database connected ({db.mode})")
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
         raise
@@ -65,6 +111,7 @@ class WorkflowSummary(BaseModel):
     node_count: int = 0
     integrations: List[str] = []
     tags: List[str] = []
+    category: Optional[str] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
     
@@ -119,6 +166,74 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "message": "N8N Workflow API is running"}
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is serving requests. Touches no files."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def readiness_check():
+    """Readiness probe: 200 once the database opens and has workflows indexed, else 503."""
+    try:
+        indexed = db.is_indexed()
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "detail": str(e)})
+    if not indexed:
+        return JSONResponse(status_code=503, content={"status": "indexing", "detail": "No workflows indexed yet"})
+    return {"status": "ready", "mode": db.mode}
+
+# Corpus gauges need a query; refresh them at most every CORPUS_GAUGE_TTL seconds
+CORPUS_GAUGE_TTL = 15.0
+_corpus_gauges = {'values': None, 'at': 0.0}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus/OpenMetrics text exposition of API and indexer metrics."""
+    now = time.monotonic()
+    if _corpus_gauges['values'] is None or now - _corpus_gauges['at'] > CORPUS_GAUGE_TTL:
+        try:
+            _corpus_gauges['values'] = db.get_corpus_totals()
+        except Exception as e:
+            print(f"⚠️  Corpus gauges unavailable: {e}")
+        _corpus_gauges['at'] = now
+    body = render_metrics(REQUEST_METRICS, _corpus_gauges['values'])
+    return Response(content=body, media_type=METRICS_CONTENT_TYPE)
+
+def require_admin(token: Optional[str]):
+    """Admin endpoints are closed unless ADMIN_TOKEN is set; then X-Admin-Token must match it."""
+    expected = os.environ.get("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    if not token or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/api/admin/queries")
+async def admin_query_profile(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total", description="total, mean, max, calls or rows"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Top SQL statements by time, from the query profiler (enable with QUERY_PROFILING=1)."""
+    require_admin(x_admin_token)
+    return QUERY_PROFILER.report(limit, order_by)
+
+@app.post("/api/admin/queries/profiling")
+async def admin_set_query_profiling(
+    enabled: bool = True,
+    threshold_ms: Optional[float] = Query(None, ge=0),
+    reset: bool = False,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Turn query profiling on or off at runtime, optionally changing the slow-query threshold."""
+    require_admin(x_admin_token)
+    if reset:
+        QUERY_PROFILER.reset()
+    if enabled:
+        QUERY_PROFILER.enable(threshold_ms)
+    else:
+        QUERY_PROFILER.disable()
+    return {"enabled": QUERY_PROFILER.enabled, "threshold_ms": QUERY_PROFILER.threshold_ms}
+
 @app.get("/api/stats", response_model=StatsResponse)
 async def get_stats():
     """Get workflow database statistics."""
@@ -134,6 +249,7 @@ async def search_workflows(
     trigger: str = Query("all", description="Filter by trigger type"),
     complexity: str = Query("all", description="Filter by complexity"),
     active_only: bool = Query(False, description="Show only active workflows"),
+    category: str = Query("all", description="Filter by category (see /api/categories)"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page")
 ):
@@ -147,7 +263,8 @@ async def search_workflows(
             complexity_filter=complexity,
             active_only=active_only,
             limit=per_page,
-            offset=offset
+            offset=offset,
+            category_filter=category
         )
         
         # Convert to Pydantic models with error handling
@@ -166,6 +283,7 @@ async def search_workflows(
                     'node_count': workflow.get('node_count', 0),
                     'integrations': workflow.get('integrations', []),
                     'tags': workflow.get('tags', []),
+                    'category': workflow.get('category'),
                     'created_at': workflow.get('created_at'),
                     'updated_at': workflow.get('updated_at')
                 }
@@ -187,12 +305,20 @@ async def search_workflows(
             filters={
                 "trigger": trigger,
                 "complexity": complexity,
-                "active_only": active_only
+                "active_only": active_only,
+                "category": category
             }
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching workflows: {str(e)}")
 
+def attachment_header(filename: str) -> str:
+    """Content-Disposition for a download, as FileResponse builds it."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
 @app.get("/api/workflows/{filename}")
 async def get_workflow_detail(filename: str):
     """Get detailed workflow information including raw JSON."""
@@ -204,24 +330,12 @@ async def get_workflow_detail(filename: str):
         
         workflow_meta = workflows[0]
         
-        # file_path = Path(__file__).parent / "workflows" / workflow_meta.name / filename
-        # print(f"当前工作目录: {workflow_meta}")
-        # Load raw JSON from file
-        workflows_path = Path('workflows')
-        json_files = list(workflows_path.rglob("*.json"))
-        matching_files = [f for f in json_files if f.name == filename]
-        
-        if not matching_files:
-            print(f"Warning: File {filename} not found in workflows directory")
-            raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
-        
-        file_path = matching_files[0]
-        if not file_path.exists():
-            print(f"Warning: File {file_path} not found on filesystem but exists in database")
+        # Load raw JSON (stored blob, or the file on disk)
+        blob = db.get_workflow_blob(filename)
+        if blob is None:
+            print(f"Warning: File {filename} not found on filesystem but exists in database")
             raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            raw_json = json.load(f)
+        raw_json = json.loads(blob.read())
         
         return {
             "metadata": workflow_meta,
@@ -236,24 +350,22 @@ async def get_workflow_detail(filename: str):
 async def download_workflow(filename: str):
     """Download workflow JSON file."""
     try:
-        workflows_path = Path('workflows')
-        json_files = list(workflows_path.rglob("*.json"))
-        matching_files = [f for f in json_files if f.name == filename]
-        
-        if not matching_files:
+        blob = db.get_workflow_blob(filename)
+        if blob is None:
             print(f"Warning: File {filename} not found in workflows directory")
             raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
         
-        file_path = matching_files[0]
-        if not os.path.exists(file_path):
-            print(f"Warning: Download requested for missing file: {file_path}")
-            raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
-        
-        return FileResponse(
-            file_path,
+        return StreamingResponse(
+            blob.iter_bytes(),
             media_type="application/json",
-            filename=filename
+            headers={
+                "Content-Disposition": attachment_header(filename),
+                "Content-Length": str(blob.size),
+                "ETag": f'"{blob.file_hash}"'
+            }
         )
+    except HTTPException:
+        raise
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found")
     except Exception as e:
@@ -261,33 +373,47 @@ async def download_workflow(filename: str):
         raise HTTPException(status_code=500, detail=f"Error downloading workflow: {str(e)}")
 
 @app.get("/api/workflows/{filename}/diagram")
-async def get_workflow_diagram(filename: str):
-    """Get Mermaid diagram code for workflow visualization."""
+async def get_workflow_diagram(
+    filename: str,
+    detail: str = Query("full", pattern="^(full|auto|clustered)$"),
+    cluster_by: str = Query("layer", pattern="^(layer|type)$"),
+    max_nodes: int = Query(DEFAULT_MAX_NODES, ge=5, le=1000),
+    expand: Optional[str] = Query(None, description="Comma-separated cluster ids to expand"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get Mermaid diagram code for workflow visualization.
+    
+    Diagrams are rendered at indexing time and cached per file version, so
+    this is a single indexed read; the ETag lets browsers revalidate cheaply.
+    
+    detail=auto|clustered returns a level-of-detail rendering for large
+    workflows: linear chains collapsed and nodes grouped into clusters (by
+    layer or type) with at most max_nodes boxes; pass cluster ids in expand
+    to open them.
+    """
     try:
-        workflows_path = Path('workflows')
-        json_files = list(workflows_path.rglob("*.json"))
-        matching_files = [f for f in json_files if f.name == filename]
-        
-        if not matching_files:
-            print(f"Warning: File {filename} not found in workflows directory")
-            raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
-        
-        file_path = matching_files[0]
-        print(f'{file_path}')
-        if not file_path.exists():
-            print(f"Warning: Diagram requested for missing file: {file_path}")
-            raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        nodes = data.get('nodes', [])
-        connections = data.get('connections', {})
-        
-        # Generate Mermaid diagram
-        diagram = generate_mermaid_diagram(nodes, connections)
+        if detail == "full":
+            cached = db.get_diagram(filename)
+            if cached is None:
+                raise HTTPException(status_code=404, detail=f"Workflow '{filename}' not found in database")
+            etag, diagram = cached
+            body = {"diagram": diagram}
+        else:
+            graph = db.get_workflow_graph(filename)
+            if graph is None:
+                raise HTTPException(status_code=404, detail=f"Workflow '{filename}' not found in database")
+            file_hash, nodes, connections = graph
+            expanded = sorted({c.strip() for c in (expand or "").split(",") if c.strip()})
+            etag = diagram_etag(file_hash, f"{detail}:{cluster_by}:{max_nodes}:{','.join(expanded)}")
+            body = None
         
-        return {"diagram": diagram}
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+        if body is None:
+            body = generate_lod_diagram(nodes, connections, detail=detail, cluster_by=cluster_by,
+                                        max_nodes=max_nodes, expand=expanded)
+        return JSONResponse(body, headers=headers)
     except HTTPException:
         raise
     except FileNotFoundError:
@@ -299,74 +425,6 @@ async def get_workflow_diagram(filename: str):
         print(f"Error generating diagram for {filename}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating diagram: {str(e)}")
 
-def generate_mermaid_diagram(nodes: List[Dict], connections: Dict) -> str:
-    """Generate Mermaid.js flowchart code from workflow nodes and connections."""
-    if not nodes:
-        return "graph TD\n  EmptyWorkflow[No nodes found in workflow]"
-    
-    # Create mapping for node names to ensure valid mermaid IDs
-    mermaid_ids = {}
-    for i, node in enumerate(nodes):
-        node_id = f"node{i}"
-        node_name = node.get('name', f'Node {i}')
-        mermaid_ids[node_name] = node_id
-    
-    # Start building the mermaid diagram
-    mermaid_code = ["graph TD"]
-    
-    # Add nodes with styling
-    for node in nodes:
-        node_name = node.get('name', 'Unnamed')
-        node_id = mermaid_ids[node_name]
-        node_type = node.get('type', '').replace('n8n-nodes-base.', '')
-        
-        # Determine node style based on type
-        style = ""
-        if any(x in node_type.lower() for x in ['trigger', 'webhook', 'cron']):
-            style = "fill:#b3e0ff,stroke:#0066cc"  # Blue for triggers
-        elif any(x in node_type.lower() for x in ['if', 'switch']):
-            style = "fill:#ffffb3,stroke:#e6e600"  # Yellow for conditional nodes
-        elif any(x in node_type.lower() for x in ['function', 'code']):
-            style = "fill:#d9b3ff,stroke:#6600cc"  # Purple for code nodes
-        elif 'error' in node_type.lower():
-            style = "fill:#ffb3b3,stroke:#cc0000"  # Red for error handlers
-        else:
-            style = "fill:#d9d9d9,stroke:#666666"  # Gray for other nodes
-        
-        # Add node with label (escaping special characters)
-        clean_name = node_name.replace('"', "'")
-        clean_type = node_type.replace('"', "'")
-        label = f"{clean_name}<br>({clean_type})"
-        mermaid_code.append(f"  {node_id}[\"{label}\"]")
-        mermaid_code.append(f"  style {node_id} {style}")
-    
-    # Add connections between nodes
-    for source_name, source_connections in connections.items():
-        if source_name not in mermaid_ids:
-            continue
-        
-        if isinstance(source_connections, dict) and 'main' in source_connections:
-            main_connections = source_connections['main']
-            
-            for i, output_connections in enumerate(main_connections):
-                if not isinstance(output_connections, list):
-                    continue
-                    
-                for connection in output_connections:
-                    if not isinstance(connection, dict) or 'node' not in connection:
-                        continue
-                        
-                    target_name = connection['node']
-                    if target_name not in mermaid_ids:
-                        continue
-                        
-                    # Add arrow with output index if multiple outputs
-                    label = f" -->|{i}| " if len(main_connections) > 1 else " --> "
-                    mermaid_code.append(f"  {mermaid_ids[source_name]}{label}{mermaid_ids[target_name]}")
-    
-    # Format the final mermaid diagram code
-    return "\n".join(mermaid_code)
-
 @app.get("/api/ai/workflows")
 async def ai_list_workflows(page: int = Query(1, ge=1), per_page: int = Query(50, ge=1, le=200)):
     """AI-friendly listing of workflow metadata (paginated)."""
@@ -411,15 +469,11 @@ async def ai_list_workflows(page: int = Query(1, ge=1), per_page: int = Query(50
 async def ai_raw_workflow(filename: str):
     """Return raw JSON for a workflow (for AI ingestion)."""
     try:
-        workflows_path = Path('workflows')
-        json_files = list(workflows_path.rglob("*.json"))
-        matching_files = [f for f in json_files if f.name == filename]
-        if not matching_files:
+        blob = db.get_workflow_blob(filename)
+        if blob is None:
             raise HTTPException(status_code=404, detail=f"Workflow file '{filename}' not found on filesystem")
-        file_path = matching_files[0]
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return JSONResponse(content=data)
+        return StreamingResponse(blob.iter_bytes(), media_type="application/json",
+                                 headers={"Content-Length": str(blob.size)})
     except HTTPException:
         raise
     except Exception as e:
@@ -439,13 +493,7 @@ async def ai_dataset_ndjson():
                     break
                 for w in workflows:
                     try:
-                        workflows_path = Path('workflows')
-                        json_files = list(workflows_path.rglob("*.json"))
-                        match = next((f for f in json_files if f.name == w.get('filename')), None)
-                        raw_json = None
-                        if match and match.exists():
-                            with open(match, 'r', encoding='utf-8') as f:
-                                raw_json = json.load(f)
+                        raw_json = db.load_workflow_json(w.get('filename', ''))
                     except Exception:
                         raw_json = None
                     record = {
@@ -472,8 +520,18 @@ async def ai_dataset_ndjson():
 @app.post("/api/reindex")
 async def reindex_workflows(background_tasks: BackgroundTasks, force: bool = False):
     """Trigger workflow reindexing in the background."""
+    if db.mode == "snapshot":
+        # Workers serve a read-only snapshot; the indexing process reindexes and republishes
+        request_reindex(db.db_path, force)
+        return {"message": "Reindexing requested; a new snapshot is published when it completes"}
+    if db.read_only:
+        raise HTTPException(status_code=409, detail="Database is read-only; reindex from the process that owns it")
+    
     def run_indexing():
-        db.index_all_workflows(force_reindex=force)
+        BROADCAST_HUB.publish("index", {"type": "index", "data": {"event": "started", "force": force}})
+        stats = db.index_all_workflows(force_reindex=force)
+        _category_cache['at'] = 0.0
+        BROADCAST_HUB.publish("index", {"type": "index", "data": {"event": "completed", **stats}})
     
     background_tasks.add_task(run_indexing)
     return {"message": "Reindexing started in background"}
@@ -488,61 +546,34 @@ async def get_integrations():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching integrations: {str(e)}")
 
+# Categories are stored per workflow at indexing time; the mappings (one entry per
+# workflow) are served from a serialized snapshot refreshed every CATEGORY_CACHE_TTL
+# seconds, or as soon as a reindex started from this process completes
+CATEGORY_CACHE_TTL = 30.0
+_category_cache = {'body': None, 'etag': None, 'at': 0.0}
+
 @app.get("/api/categories")
-async def get_categories():
+def get_categories():
     """Get available workflow categories for filtering."""
     try:
-        # Try to load from the generated unique categories file
-        categories_file = Path("context/unique_categories.json")
-        if categories_file.exists():
-            with open(categories_file, 'r', encoding='utf-8') as f:
-                categories = json.load(f)
-            return {"categories": categories}
-        else:
-            # Fallback: extract categories from search_categories.json
-            search_categories_file = Path("context/search_categories.json")
-            if search_categories_file.exists():
-                with open(search_categories_file, 'r', encoding='utf-8') as f:
-                    search_data = json.load(f)
-                
-                unique_categories = set()
-                for item in search_data:
-                    if item.get('category'):
-                        unique_categories.add(item['category'])
-                    else:
-                        unique_categories.add('Uncategorized')
-                
-                categories = sorted(list(unique_categories))
-                return {"categories": categories}
-            else:
-                # Last resort: return basic categories
-                return {"categories": ["Uncategorized"]}
-                
+        return {"categories": db.get_categories()}
     except Exception as e:
         print(f"Error loading categories: {e}")
         raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
 
 @app.get("/api/category-mappings")
-async def get_category_mappings():
+def get_category_mappings(if_none_match: Optional[str] = Header(None)):
     """Get filename to category mappings for client-side filtering."""
     try:
-        search_categories_file = Path("context/search_categories.json")
-        if not search_categories_file.exists():
-            return {"mappings": {}}
-        
-        with open(search_categories_file, 'r', encoding='utf-8') as f:
-            search_data = json.load(f)
-        
-        # Convert to a simple filename -> category mapping
-        mappings = {}
-        for item in search_data:
-            filename = item.get('filename')
-            category = item.get('category') or 'Uncategorized'
-            if filename:
-                mappings[filename] = category
-        
-        return {"mappings": mappings}
+        now = time.monotonic()
+        if _category_cache['body'] is None or now - _category_cache['at'] > CATEGORY_CACHE_TTL:
+            body = json.dumps({"mappings": db.get_category_mappings()}, ensure_ascii=False).encode('utf-8')
+            _category_cache.update(body=body, etag=f'"{hashlib.md5(body).hexdigest()}"', at=now)
         
+        headers = {"ETag": _category_cache['etag'], "Cache-Control": "no-cache"}
+        if if_none_match and _category_cache['etag'] in [t.strip() for t in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=_category_cache['body'], media_type="application/json", headers=headers)
     except Exception as e:
         print(f"Error loading category mappings: {e}")
         raise HTTPException(status_code=500, detail=f"Error fetching category mappings: {str(e)}")
@@ -608,6 +639,16 @@ async def global_exception_handler(request, exc):
         content={"detail": f"Internal server error: {str(exc)}"}
     )
 
+# Optional in-process performance monitor (/monitor/*), fed by RequestMetricsMiddleware; needs psutil
+if os.environ.get("ENABLE_PERFORMANCE_MONITOR", "").lower() in ("1", "true", "yes"):
+    try:
+        sys.path.append(str(Path(__file__).resolve().parent / "src"))
+        from performance_monitor import monitor_app, performance_monitor as _performance_monitor
+        app.include_router(monitor_app.router)
+        print("✅ Performance monitor enabled at /monitor/dashboard")
+    except ImportError as e:
+        print(f"⚠️  Performance monitor disabled: {e}")
+
 # Mount static files AFTER all routes are defined
 static_dir = Path("static")
 if static_dir.exists():
@@ -659,6 +700,7 @@ def run_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False):
     print(f"🌐 Server will be available at: http://{host}:{port}")
     print(f"📁 Static files at: http://{host}:{port}/static/")
     
+    import uvicorn
     uvicorn.run(
         "api_server:app",
         host=host,
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Backup Store
+Deduplicated backups for upgrader and repair runs.
+
+Every file is stored once as a blob keyed by the SHA-256 of its contents
+(optionally zlib-compressed), and each run only writes a small manifest
+mapping relative paths to blob hashes. Backing up an unchanged corpus a
+second time therefore costs only the manifest.
+
+A run in progress has no manifest yet, so it leaves a runs/<run_id>.pending
+marker from its first file until commit; prune keeps every blob while
+such a marker exists (markers older than PENDING_STALE_HOURS are treated
+as left over from a crashed run).
+
+Usage:
+  python backup_store.py list
+  python backup_store.py snapshot workflows --label manual
+  python backup_store.py restore latest
+  python backup_store.py prune --keep 5
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+DEFAULT_STORE_DIR = "backups/store"
+PENDING_STALE_HOURS = 24
+
+
+class BackupRun:
+    """A single backup run collecting files into the store."""
+
+    def __init__(self, store: "BackupStore", run_id: str, label: str, source_root: Path):
+        self.store = store
+        self.run_id = run_id
+        self.label = label
+        self.source_root = source_root
+        self.created_at = datetime.now().isoformat()
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'files': 0, 'new_blobs': 0, 'bytes_read': 0, 'bytes_stored': 0}
+        self._lock = threading.Lock()
+        self._committed = False
+
+    def relative_key(self, path: Path) -> str:
+        """Return the manifest key for a path (relative to the source root when possible)."""
+        try:
+            return path.resolve().relative_to(self.source_root.resolve()).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def add_file(self, path: Union[str, Path]) -> Optional[str]:
+        """Back up the current contents of a file. Safe to call from worker threads.
+
+        A file is only recorded the first time it is added to a run, so the
+        manifest always holds the state from before the run touched it.
+        """
+        path = Path(path)
+        key = self.relative_key(path)
+        with self._lock:
+            if key in self.files:
+                return self.files[key]['hash']
+            if not self.files and not self._committed:
+                self.store.mark_pending(self.run_id)
+
+        data = path.read_bytes()
+        blob_hash, stored_bytes, is_new = self.store.put_blob(data)
+
+        with self._lock:
+            if key in self.files:
+                return self.files[key]['hash']
+            self.files[key] = {'hash': blob_hash, 'size': len(data)}
+            self.stats['files'] += 1
+            self.stats['bytes_read'] += len(data)
+            if is_new:
+                self.stats['new_blobs'] += 1
+                self.stats['bytes_stored'] += stored_bytes
+        return blob_hash
+
+    def add_tree(self, root: Union[str, Path], pattern: str = "*.json") -> int:
+        """Back up every file under root matching pattern."""
+        count = 0
+        for path in sorted(Path(root).rglob(pattern)):
+            if path.is_file():
+                self.add_file(path)
+                count += 1
+        return count
+
+    def commit(self) -> Path:
+        """Write the run manifest. Runs without files are not recorded."""
+        with self._lock:
+            if self._committed:
+                return self.store.run_path(self.run_id)
+            self._committed = True
+            manifest = {
+                'run_id': self.run_id,
+                'label': self.label,
+                'created_at': self.created_at,
+                'source_root': str(self.source_root),
+                'compressed': self.store.compress,
+                'stats': dict(self.stats),
+                'files': dict(sorted(self.files.items()))
+            }
+
+        try:
+            if not manifest['files']:
+                return self.store.run_path(self.run_id)
+            return self.store.write_manifest(manifest)
+        finally:
+            self.store.clear_pending(self.run_id)
+
+    def __enter__(self) -> "BackupRun":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.commit()
+        return False
+
+
+class BackupStore:
+    """Blob store keyed by content hash plus per-run manifests."""
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_STORE_DIR, compress: bool = True, level: int = 6):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.runs_dir = self.root / "runs"
+        self.compress = compress
+        self.level = level
+
+    # ------------------------------------------------------------------ blobs
+
+    def blob_path(self, blob_hash: str, compressed: bool) -> Path:
+        suffix = ".z" if compressed else ""
+        return self.objects_dir / blob_hash[:2] / f"{blob_hash}{suffix}"
+
+    def find_blob(self, blob_hash: str) -> Optional[Path]:
+        """Locate a blob regardless of whether it was stored compressed."""
+        for compressed in (True, False):
+            path = self.blob_path(blob_hash, compressed)
+            if path.exists():
+                return path
+        return None
+
+    def put_blob(self, data: bytes) -> Tuple[str, int, bool]:
+        """Store data if not already present. Returns (hash, stored bytes, is_new)."""
+        blob_hash = hashlib.sha256(data).hexdigest()
+        if self.find_blob(blob_hash):
+            return blob_hash, 0, False
+
+        payload = zlib.compress(data, self.level) if self.compress else data
+        path = self.blob_path(blob_hash, self.compress)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a unique temp name first so concurrent writers never expose partial blobs
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return blob_hash, len(payload), True
+
+    def get_blob(self, blob_hash: str) -> bytes:
+        path = self.find_blob(blob_hash)
+        if path is None:
+            raise FileNotFoundError(f"Blob {blob_hash} missing from {self.objects_dir}")
+        data = path.read_bytes()
+        return zlib.decompress(data) if path.suffix == ".z" else data
+
+    # ------------------------------------------------------------------- runs
+
+    def run_path(self, run_id: str) -> Path:
+        return self.runs_dir / f"{run_id}.json"
+
+    def begin_run(self, label: str, source_root: Union[str, Path] = "workflows") -> BackupRun:
+        """Start a new run. Call commit() (or use it as a context manager) when done."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        safe_label = "".join(c if c.isalnum() or c in "-_" else "_" for c in label) or "run"
+        return BackupRun(self, f"{timestamp}_{safe_label}", label, Path(source_root))
+
+    def pending_path(self, run_id: str) -> Path:
+        return self.runs_dir / f"{run_id}.pending"
+
+    def mark_pending(self, run_id: str):
+        """Record that a run has started writing blobs but has no manifest yet."""
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        self.pending_path(run_id).touch()
+
+    def clear_pending(self, run_id: str):
+        self.pending_path(run_id).unlink(missing_ok=True)
+
+    def pending_runs(self) -> List[str]:
+        """Runs in progress (pending markers younger than PENDING_STALE_HOURS)."""
+        if not self.runs_dir.exists():
+            return []
+        cutoff = datetime.now() - timedelta(hours=PENDING_STALE_HOURS)
+        return [path.stem for path in sorted(self.runs_dir.glob("*.pending"))
+                if datetime.fromtimestamp(path.stat().st_mtime) >= cutoff]
+
+    def write_manifest(self, manifest: Dict[str, Any]) -> Path:
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        path = self.run_path(manifest['run_id'])
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def list_runs(self) -> List[Dict[str, Any]]:
+        """Return run manifests (without file lists), oldest first."""
+        runs = []
+        if not self.runs_dir.exists():
+            return runs
+        for path in sorted(self.runs_dir.glob("*.json")):
+            try:
+                manifest = self.load_run(path.stem)
+            except (OSError, json.JSONDecodeError, KeyError):
+                continue
+            manifest.pop('files', None)
+            runs.append(manifest)
+        return runs
+
+    def load_run(self, run_id: str) -> Dict[str, Any]:
+        """Load a run manifest. "latest" resolves to the most recent run."""
+        if run_id == "latest":
+            candidates = sorted(self.runs_dir.glob("*.json")) if self.runs_dir.exists() else []
+            if not candidates:
+                raise KeyError("No backup runs recorded")
+            run_id = candidates[-1].stem
+
+        path = self.run_path(run_id)
+        if not path.exists():
+            raise KeyError(f"Unknown backup run: {run_id}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def restore_run(self, run_id: str, target_root: Optional[Union[str, Path]] = None,
+                    dry_run: bool = False) -> Dict[str, int]:
+        """Restore every file of a run. Files already matching the backup are left untouched."""
+        manifest = self.load_run(run_id)
+        root = Path(target_root) if target_root else Path(manifest['source_root'])
+        stats = {'restored': 0, 'unchanged': 0, 'missing_blobs': 0}
+
+        for key, entry in manifest['files'].items():
+            dest = Path(key) if Path(key).is_absolute() else root / key
+
+            if dest.exists() and hashlib.sha256(dest.read_bytes()).hexdigest() == entry['hash']:
+                stats['unchanged'] += 1
+                continue
+
+            try:
+                data = self.get_blob(entry['hash'])
+            except FileNotFoundError as e:
+                print(f"❌ {e}")
+                stats['missing_blobs'] += 1
+                continue
+
+            if not dry_run:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                with open(dest, 'wb') as f:
+                    f.write(data)
+            stats['restored'] += 1
+
+        return stats
+
+    def prune(self, keep_last: Optional[int] = None, older_than_days: Optional[int] = None) -> Dict[str, int]:
+        """Delete old runs, then remove blobs no remaining run references.
+
+        Only committed runs (with a manifest) are considered. While a run is
+        in progress its blobs are not in any manifest yet, so no blobs are
+        removed until it commits.
+        """
+        stats = {'runs_removed': 0, 'blobs_removed': 0, 'bytes_freed': 0, 'runs_in_progress': 0}
+        run_files = sorted(self.runs_dir.glob("*.json")) if self.runs_dir.exists() else []
+
+        to_remove = set()
+        if keep_last is not None and len(run_files) > keep_last:
+            to_remove.update(run_files[:len(run_files) - keep_last])
+        if older_than_days is not None:
+            cutoff = datetime.now() - timedelta(days=older_than_days)
+            for path in run_files:
+                if datetime.fromtimestamp(path.stat().st_mtime) < cutoff:
+                    to_remove.add(path)
+
+        for path in to_remove:
+            path.unlink()
+            stats['runs_removed'] += 1
+
+        stats['runs_in_progress'] = len(self.pending_runs())
+        if stats['runs_in_progress']:
+            return stats
+
+        referenced = set()
+        for path in run_files:
+            if path in to_remove:
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                referenced.update(entry['hash'] for entry in json.load(f)['files'].values())
+
+        if self.objects_dir.exists():
+            for blob in self.objects_dir.rglob("*"):
+                if not blob.is_file():
+                    continue
+                blob_hash = blob.name.split(".")[0]
+                if blob_hash not in referenced:
+                    stats['bytes_freed'] += blob.stat().st_size
+                    blob.unlink()
+                    stats['blobs_removed'] += 1
+
+        return stats
+
+
+def main():
+    """Command-line interface for the backup store."""
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+    parser = argparse.ArgumentParser(description='Content-addressed workflow backups')
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help='Backup store directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('list', help='List backup runs')
+
+    snapshot = sub.add_parser('snapshot', help='Back up a directory tree')
+    snapshot.add_argument('directory', nargs='?', default='workflows')
+    snapshot.add_argument('--label', default='snapshot')
+    snapshot.add_argument('--no-compress', action='store_true', help='Store blobs uncompressed')
+
+    restore = sub.add_parser('restore', help='Restore a run ("latest" for the most recent)')
+    restore.add_argument('run_id')
+    restore.add_argument('--target', default=None, help='Restore into this directory instead')
+    restore.add_argument('--dry-run', action='store_true')
+
+    prune = sub.add_parser('prune', help='Delete old runs and unreferenced blobs')
+    prune.add_argument('--keep', type=int, default=None, help='Keep the N most recent runs')
+    prune.add_argument('--older-than', type=int, default=None, help='Delete runs older than N days')
+
+    args = parser.parse_args()
+    store = BackupStore(args.store, compress=not getattr(args, 'no_compress', False))
+
+    if args.command == 'list':
+        runs = store.list_runs()
+        if not runs:
+            print("No backup runs recorded")
+        for run in runs:
+            s = run.get('stats', {})
+            print(f"  {run['run_id']}  {s.get('files', 0)} files, "
+                  f"{s.get('new_blobs', 0)} new blobs, {s.get('bytes_stored', 0):,} bytes stored")
+
+    elif args.command == 'snapshot':
+        with store.begin_run(args.label, args.directory) as run:
+            run.add_tree(args.directory)
+        s = run.stats
+        print(f"✅ Run {run.run_id}: {s['files']} files, {s['new_blobs']} new blobs, "
+              f"{s['bytes_stored']:,} of {s['bytes_read']:,} bytes stored")
+
+    elif args.command == 'restore':
+        stats = store.restore_run(args.run_id, target_root=args.target, dry_run=args.dry_run)
+        prefix = "Would restore" if args.dry_run else "Restored"
+        print(f"✅ {prefix} {stats['restored']} files ({stats['unchanged']} already up to date, "
+              f"{stats['missing_blobs']} missing blobs)")
+
+    elif args.command == 'prune':
+        if args.keep is None and args.older_than is None:
+            parser.error("prune needs --keep and/or --older-than")
+        stats = store.prune(keep_last=args.keep, older_than_days=args.older_than)
+        print(f"🧹 Removed {stats['runs_removed']} runs and {stats['blobs_removed']} blobs "
+              f"({stats['bytes_freed']:,} bytes freed)")
+        if stats['runs_in_progress']:
+            print(f"⚠️ {stats['runs_in_progress']} backup runs in progress; blobs were kept, prune again later")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the Workflow API and Indexer
+Reproducible measurements on synthetic corpora, for comparing commits.
+
+For each corpus size the suite:
+  1. generates a deterministic corpus (synthetic_workflows.py, fixed seed)
+  2. indexes it from scratch and again incrementally (files/sec, MB/sec)
+  3. runs FTS, filter, category and stats queries against WorkflowDatabase
+     and records latency distributions (p50/p95/p99/mean/max)
+  4. drives the FastAPI app in-process through httpx.ASGITransport with N
+     concurrent clients: search, filters, stats, workflow detail and
+     diagram endpoints (latency distribution, requests/sec, errors)
+
+Results are written as JSON; --compare prints the change against an
+earlier result file and exits non-zero if any p95 latency or indexing
+throughput regressed by more than --fail-threshold.
+
+Usage:
+  python benchmark.py                                  # 1k workflows
+  python benchmark.py --sizes 1k,10k,100k --output bench.json
+  python benchmark.py --output new.json --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from request_metrics import LatencyHistogram
+from synthetic_workflows import write_corpus
+from workflow_db import WorkflowDatabase
+
+RESULT_FORMAT_VERSION = 1
+TRIGGERS = ['Webhook', 'Scheduled', 'Manual', 'Complex']
+COMPLEXITIES = ['low', 'medium', 'high']
+CATEGORIES = ['messaging', 'database', 'project_management', 'ecommerce', 'ai_ml']
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000."""
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def summarize(histogram: LatencyHistogram, seconds: Optional[float] = None,
+              errors: int = 0) -> Dict[str, Any]:
+    """Latency distribution in milliseconds, plus throughput when wall time is given."""
+    p = histogram.percentiles((50, 95, 99))
+    summary = {
+        'count': histogram.total,
+        'p50_ms': round(p[50], 3),
+        'p95_ms': round(p[95], 3),
+        'p99_ms': round(p[99], 3),
+        'mean_ms': round(histogram.mean_ms(), 3),
+        'max_ms': round(histogram.max_us / 1000.0, 3),
+    }
+    if seconds is not None:
+        summary['requests_per_second'] = round(histogram.total / seconds, 1) if seconds else 0.0
+        summary['errors'] = errors
+    return summary
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=Path(__file__).resolve().parent, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'commit': commit or None,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+# --- Indexing --------------------------------------------------------------
+
+def bench_index(root: Path, db_path: str) -> Tuple[WorkflowDatabase, Dict[str, Any]]:
+    db = WorkflowDatabase(db_path)
+    db.workflows_dir = str(root / 'workflows')
+
+    started = time.perf_counter()
+    full = db.index_all_workflows(force_reindex=True)
+    full_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    incremental = db.index_all_workflows()
+    incremental_seconds = time.perf_counter() - started
+
+    totals = db.get_corpus_totals()
+    return db, {
+        'files': totals['workflows'],
+        'bytes': totals['bytes'],
+        'full_seconds': round(full_seconds, 3),
+        'files_per_second': round(totals['workflows'] / full_seconds, 1) if full_seconds else 0.0,
+        'mb_per_second': round(totals['bytes'] / 1024 / 1024 / full_seconds, 2) if full_seconds else 0.0,
+        'incremental_seconds': round(incremental_seconds, 3),
+        'errors': full['errors'],
+        'skipped_incremental': incremental['skipped'],
+        'db_bytes': os.path.getsize(db_path),
+    }
+
+
+# --- Database queries --------------------------------------------------------
+
+def query_scenarios(db: WorkflowDatabase, terms: List[str]) -> Dict[str, Callable[[int], Any]]:
+    return {
+        'fts_search': lambda i: db.search_workflows(terms[i % len(terms)], limit=20),
+        'fts_search_filtered': lambda i: db.search_workflows(
+            terms[i % len(terms)], complexity_filter=COMPLEXITIES[i % 3], limit=20),
+        'fts_search_deep_page': lambda i: db.search_workflows(terms[i % len(terms)], limit=20, offset=200),
+        'filter_trigger': lambda i: db.search_workflows('', trigger_filter=TRIGGERS[i % 4], limit=20),
+        'browse_recent': lambda i: db.search_workflows('', limit=20, offset=(i % 10) * 20),
+        'category': lambda i: db.search_by_category(CATEGORIES[i % len(CATEGORIES)], limit=20),
+        'stats': lambda i: db.get_stats(),
+    }
+
+
+def bench_queries(db: WorkflowDatabase, terms: List[str], iterations: int) -> Dict[str, Any]:
+    results = {}
+    for name, run in query_scenarios(db, terms).items():
+        for i in range(min(5, iterations)):  # warm the page cache
+            run(i)
+        histogram = LatencyHistogram()
+        for i in range(iterations):
+            start = time.perf_counter()
+            run(i)
+            histogram.record(time.perf_counter() - start)
+        results[name] = summarize(histogram)
+    return results
+
+
+# --- HTTP ------------------------------------------------------------------
+
+def http_scenarios(filenames: List[str], terms: List[str], requests: int,
+                   detail_requests: int) -> Dict[str, List[str]]:
+    step = max(1, len(filenames) // max(1, detail_requests))
+    sample = [filenames[(i * step) % len(filenames)] for i in range(detail_requests)]
+    return {
+        'search': [f"/api/workflows?q={terms[i % len(terms)]}" for i in range(requests)],
+        'search_filtered': [f"/api/workflows?q={terms[i % len(terms)]}&trigger={TRIGGERS[i % 4]}"
+                            f"&complexity={COMPLEXITIES[i % 3]}" for i in range(requests)],
+        'browse': [f"/api/workflows?page={i % 10 + 1}" for i in range(requests)],
+        'category': [f"/api/workflows/category/{CATEGORIES[i % len(CATEGORIES)]}" for i in range(requests)],
+        'stats': ["/api/stats"] * requests,
+        'detail': [f"/api/workflows/{name}" for name in sample],
+        'diagram': [f"/api/workflows/{name}/diagram" for name in sample],
+    }
+
+
+async def _drive(client, paths: List[str], concurrency: int) -> Tuple[LatencyHistogram, int, float]:
+    """Issue every path with `concurrency` clients sharing one work list."""
+    histogram = LatencyHistogram()
+    errors = 0
+    pending = iter(paths)
+
+    async def worker():
+        nonlocal errors
+        for path in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                failed = response.status_code != 200
+            except Exception:
+                failed = True
+            histogram.record(time.perf_counter() - start)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return histogram, errors, time.perf_counter() - started
+
+
+async def _bench_http(app, scenarios: Dict[str, List[str]], concurrency: int) -> Dict[str, Any]:
+    import httpx
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name, paths in scenarios.items():
+            await _drive(client, paths[:min(5, len(paths))], 1)  # warm-up, not recorded
+            histogram, errors, seconds = await _drive(client, paths, concurrency)
+            results[name] = summarize(histogram, seconds, errors)
+            results[name]['concurrency'] = concurrency
+    return results
+
+
+def bench_http(root: Path, db: WorkflowDatabase, filenames: List[str], terms: List[str],
+               requests: int, detail_requests: int, concurrency: int) -> Dict[str, Any]:
+    """Run the API in-process against this corpus (it resolves workflows/ from the cwd)."""
+    os.environ['WORKFLOW_DB_PATH'] = db.db_path
+    previous_cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        import api_server
+        api_server.db = db
+        scenarios = http_scenarios(filenames, terms, requests, detail_requests)
+        return asyncio.run(_bench_http(api_server.app, scenarios, concurrency))
+    finally:
+        os.chdir(previous_cwd)
+
+
+# --- Suite -----------------------------------------------------------------
+
+def run_size(size: int, args, workdir: Path) -> Dict[str, Any]:
+    root = workdir / f"corpus_{size}"
+    if root.exists():
+        shutil.rmtree(root)
+    print(f"\n🏭 Generating {size:,} workflows (seed {args.seed})...")
+    corpus = write_corpus(str(root), size, seed=args.seed, workers=args.workers)
+    print(f"   {corpus.bytes / 1024 / 1024:.1f} MB, {corpus.nodes:,} nodes in {corpus.seconds:.1f}s "
+          f"(digest {corpus.digest[:12]})")
+
+    terms = corpus.search_terms
+
+    print("📚 Indexing...")
+    db, index = bench_index(root, str(root / 'workflows.db'))
+    print(f"   {index['files_per_second']:,.0f} files/s, {index['mb_per_second']} MB/s, "
+          f"incremental {index['incremental_seconds']}s")
+
+    print(f"🔍 Database queries ({args.iterations} iterations each)...")
+    queries = bench_queries(db, terms, args.iterations)
+    for name, summary in queries.items():
+        print(f"   {name:<22} p50 {summary['p50_ms']:>8.2f}ms  p95 {summary['p95_ms']:>8.2f}ms")
+
+    print(f"🌐 HTTP ({args.concurrency} concurrent clients)...")
+    http = bench_http(root, db, corpus.filenames, terms, args.requests,
+                      args.detail_requests, args.concurrency)
+    for name, summary in http.items():
+        print(f"   {name:<22} p50 {summary['p50_ms']:>8.2f}ms  p95 {summary['p95_ms']:>8.2f}ms  "
+              f"{summary['requests_per_second']:>7.1f} req/s  {summary['errors']} errors")
+
+    if not args.keep:
+        shutil.rmtree(root, ignore_errors=True)
+    return {
+        'corpus': {'files': corpus.files, 'bytes': corpus.bytes, 'nodes': corpus.nodes,
+                   'digest': corpus.digest, 'generate_seconds': round(corpus.seconds, 3)},
+        'index': index,
+        'queries': queries,
+        'http': http,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """Print changes against a baseline result; returns the number of regressions."""
+    regressions = 0
+    print(f"\n📊 Compared with {baseline['environment'].get('commit') or 'baseline'} "
+          f"(regression threshold {threshold:.0%})")
+    for size, result in current['sizes'].items():
+        base = baseline.get('sizes', {}).get(size)
+        if not base:
+            print(f"   {size}: no baseline")
+            continue
+        rows = [('index files/s', result['index']['files_per_second'],
+                 base['index']['files_per_second'], True)]
+        for section in ('queries', 'http'):
+            for name, summary in result[section].items():
+                if name in base.get(section, {}):
+                    rows.append((f"{section}.{name} p95", summary['p95_ms'], base[section][name]['p95_ms'], False))
+
+        print(f"\n   {int(size):,} workflows")
+        for label, value, old, higher_is_better in rows:
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = -change if higher_is_better else change
+            flag = '❌' if worse > threshold else ('✅' if worse < -threshold else '  ')
+            regressions += worse > threshold
+            print(f"   {flag} {label:<34} {old:>10.2f} -> {value:>10.2f}  ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the workflow indexer and API')
+    parser.add_argument('--sizes', default='1k', help='Comma-separated corpus sizes, e.g. 1k,10k,100k')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--iterations', type=int, default=200, help='Runs per database query scenario')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per HTTP scenario')
+    parser.add_argument('--detail-requests', type=int, default=50,
+                        help='Requests for the detail and diagram scenarios')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent HTTP clients')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Corpus generator processes')
+    parser.add_argument('--workdir', help='Where corpora are generated (default: a temp dir)')
+    parser.add_argument('--keep', action='store_true', help='Keep generated corpora and databases')
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--fail-threshold', type=float, default=0.15,
+                        help='Relative regression that fails --compare (default 0.15)')
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix='n8n-bench-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = {
+        'format': RESULT_FORMAT_VERSION,
+        'environment': environment(),
+        'parameters': {'seed': args.seed, 'iterations': args.iterations, 'requests': args.requests,
+                       'detail_requests': args.detail_requests, 'concurrency': args.concurrency},
+        'sizes': {},
+    }
+    print(f"🚀 Benchmarking sizes {', '.join(f'{s:,}' for s in sizes)} in {workdir}")
+    try:
+        for size in sizes:
+            results['sizes'][str(size)] = run_size(size, args, workdir)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.fail_threshold)
+        if regressions:
+            print(f"\n❌ {regressions} regression(s) beyond {args.fail_threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+WebSocket Broadcast Hub
+Fan-out of monitoring messages to many WebSocket clients.
+
+Each message is JSON-encoded once, whatever the number of clients, and
+handed to every subscribed client's bounded queue. A per-client sender
+task drains the queue on the event loop; when a client falls behind, its
+oldest queued messages are dropped (monitoring data is only interesting
+while fresh) so one slow tab can never hold memory or stall the others.
+
+Publishing is safe from any thread: calls made off the event loop (the
+monitor's sampling thread, indexing background tasks) are handed over
+with call_soon_threadsafe.
+
+Channels: "metrics", "alerts" and "index". Clients pick channels with
+?channels=metrics,alerts on connect and may change them by sending
+{"action": "subscribe" | "unsubscribe", "channels": [...]}.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Set
+
+CHANNELS = ("metrics", "alerts", "index")
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_SEND_TIMEOUT = 10.0
+
+
+class HubClient:
+    """One connected WebSocket with its subscriptions and bounded outbox."""
+
+    def __init__(self, websocket, channels: Iterable[str], queue_size: int):
+        self.websocket = websocket
+        self.channels: Set[str] = set(channels)
+        self.outbox: deque = deque(maxlen=queue_size)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.sent = 0
+
+    def offer(self, text: str):
+        if len(self.outbox) == self.outbox.maxlen:
+            self.dropped += 1  # deque(maxlen) discards the oldest entry
+        self.outbox.append(text)
+        self.ready.set()
+
+
+class BroadcastHub:
+    """Serialize-once, drop-oldest WebSocket broadcaster."""
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE, send_timeout: float = DEFAULT_SEND_TIMEOUT):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.clients: Dict[int, HubClient] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+
+    def has_subscribers(self, channel: str) -> bool:
+        return any(channel in client.channels for client in list(self.clients.values()))
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> bool:
+        """Queue a message for every subscriber of a channel; returns False if nobody listens."""
+        if self.loop is None or not self.has_subscribers(channel):
+            return False
+        text = json.dumps(message, default=str)
+        self.published += 1
+        if self._on_loop_thread():
+            self._fan_out(channel, text)
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self._fan_out, channel, text)
+            except RuntimeError:  # loop closed during shutdown
+                return False
+        return True
+
+    def _on_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _fan_out(self, channel: str, text: str):
+        for client in list(self.clients.values()):
+            if channel in client.channels:
+                client.offer(text)
+
+    async def serve(self, websocket, channels: Optional[Iterable[str]] = None):
+        """Accept a WebSocket and pump messages to it until it disconnects."""
+        self.loop = asyncio.get_running_loop()
+        await websocket.accept()
+
+        wanted = [c for c in (channels or CHANNELS) if c in CHANNELS]
+        client = HubClient(websocket, wanted, self.queue_size)
+        self.clients[id(client)] = client
+        sender = asyncio.create_task(self._send_loop(client))
+        try:
+            while True:
+                text = await websocket.receive_text()
+                self._handle_command(client, text)
+        except Exception:
+            pass  # WebSocketDisconnect or a broken transport both end the session
+        finally:
+            sender.cancel()
+            self.clients.pop(id(client), None)
+
+    def _handle_command(self, client: HubClient, text: str):
+        try:
+            command = json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            return  # plain keep-alive pings
+        if not isinstance(command, dict):
+            return
+        requested = {c for c in command.get('channels', []) if c in CHANNELS}
+        if command.get('action') == 'subscribe':
+            client.channels |= requested
+        elif command.get('action') == 'unsubscribe':
+            client.channels -= requested
+
+    async def _send_loop(self, client: HubClient):
+        websocket = client.websocket
+        try:
+            while True:
+                await client.ready.wait()
+                client.ready.clear()
+                while client.outbox:
+                    text = client.outbox.popleft()
+                    await asyncio.wait_for(websocket.send_text(text), self.send_timeout)
+                    client.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # A stalled or closed socket: drop the client, the receive loop will end too
+            self.clients.pop(id(client), None)
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        clients = list(self.clients.values())
+        return {
+            'clients': len(clients),
+            'published': self.published,
+            'dropped': sum(c.dropped for c in clients),
+            'queued': sum(len(c.outbox) for c in clients),
+            'subscribers': {channel: sum(1 for c in clients if channel in c.channels) for channel in CHANNELS}
+        }
+
+
+BROADCAST_HUB = BroadcastHub()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Category Engine
+Compiled form of the create_categories.py rules, for the indexer and importer.
+
+create_categories.categorize_workflow normalizes every token with a regex
+and, for tokens without an exact match, scans every integration key for a
+substring relation in both directions, then tries FILENAME_RULES one word
+at a time. The engine compiles the same rules once:
+  - exact: normalized integration key -> category;
+  - "token in key": every substring of every key -> first key containing it;
+  - "key in token": one trie-shaped regex over the keys that reports the
+    longest key at each offset of the token; the first key is taken among
+    each match's key prefixes;
+  - FILENAME_RULES: one such regex over all rule words, with the first
+    rule taken among each match's word prefixes.
+Each distinct token is resolved once. The rules themselves stay in
+create_categories.py; `python category_engine.py --verify` checks the
+engine agrees with them on every workflow filename.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from create_categories import (FILENAME_RULES, categorize_workflow, extract_tokens_from_filename,
+                               load_def_categories)
+from node_classifier import trie_pattern
+
+DEF_CATEGORIES_PATH = "context/def_categories.json"
+
+MAX_CACHED_TOKENS = 50000
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+
+
+def _first_prefix_order(words: Dict[str, int]) -> Dict[str, int]:
+    """word -> lowest order among the words that are prefixes of it (itself included)."""
+    first = {}
+    for word, order in words.items():
+        best = order
+        for end in range(len(word)):
+            prefix_order = words.get(word[:end])
+            if prefix_order is not None and prefix_order < best:
+                best = prefix_order
+        first[word] = best
+    return first
+
+
+def _finder(words: List[str]) -> Optional[re.Pattern]:
+    """Zero-width regex reporting, at every offset where a word starts, the longest one there."""
+    if not words:
+        return None
+    return re.compile(f"(?=({trie_pattern(words).pattern}))")
+
+
+def _first_contained(finder: re.Pattern, first_prefix: Dict[str, int], text: str) -> Optional[int]:
+    """Lowest order of any word contained in text.
+
+    Every other word starting at an offset is a prefix of the longest one.
+    """
+    best = None
+    for match in finder.finditer(text):
+        order = first_prefix[match.group(1)]
+        if best is None or order < best:
+            best = order
+            if best == 0:
+                break
+    return best
+
+
+class CategoryEngine:
+    """Compiled create_categories rules for one set of category definitions."""
+
+    def __init__(self, integration_to_category: Dict[str, str],
+                 rules: List[Tuple[List[str], str]] = FILENAME_RULES):
+        self.exact = dict(integration_to_category)
+        keys = list(self.exact)
+        self.key_categories = [self.exact[key] for key in keys]
+
+        # "token in key": any substring of a key (the empty one included) -> first such key
+        self.contained_in: Dict[str, int] = {}
+        for order, key in enumerate(keys):
+            for start in range(len(key) + 1):
+                for end in range(start, len(key) + 1):
+                    self.contained_in.setdefault(key[start:end], order)
+
+        # "key in token"
+        key_orders = {key: order for order, key in enumerate(keys) if key}
+        self.key_finder = _finder(list(key_orders))
+        self.key_first_prefix = _first_prefix_order(key_orders)
+
+        # Filename rules
+        self.rule_categories = [category for _, category in rules]
+        word_rules: Dict[str, int] = {}
+        for index, (words, _) in enumerate(rules):
+            for word in words:
+                word_rules.setdefault(word, index)
+        self.rule_finder = _finder(list(word_rules))
+        self.rule_first_prefix = _first_prefix_order(word_rules)
+
+        # normalized token -> (exact category or None, first partially matching key order or None)
+        self.tokens: Dict[str, Tuple[Optional[str], Optional[int]]] = {}
+
+    def _token(self, norm: str) -> Tuple[Optional[str], Optional[int]]:
+        resolved = self.tokens.get(norm)
+        if resolved is None:
+            partial = self.contained_in.get(norm)
+            if self.key_finder is not None:
+                contained = _first_contained(self.key_finder, self.key_first_prefix, norm)
+                if contained is not None and (partial is None or contained < partial):
+                    partial = contained
+            resolved = (self.exact.get(norm), partial)
+            if len(self.tokens) < MAX_CACHED_TOKENS:
+                self.tokens[norm] = resolved
+        return resolved
+
+    def categorize(self, filename: str) -> str:
+        """Category of a workflow file, as create_categories.categorize_workflow ("" if none)."""
+        resolved = [self._token(_NON_ALNUM.sub("", token))
+                    for token in extract_tokens_from_filename(filename)]
+        for exact, _ in resolved:
+            if exact is not None:
+                return exact
+        for _, partial in resolved:
+            if partial is not None:
+                return self.key_categories[partial]
+
+        if self.rule_finder is not None:
+            rule = _first_contained(self.rule_finder, self.rule_first_prefix, filename.lower())
+            if rule is not None:
+                return self.rule_categories[rule]
+        return ""
+
+    def categorize_all(self, filenames: Iterable[str]) -> Dict[str, str]:
+        """filename -> category for a batch (e.g. the whole corpus)."""
+        return {filename: self.categorize(filename) for filename in filenames}
+
+
+_engines: Dict[str, Tuple[float, CategoryEngine]] = {}
+
+
+def load_category_engine(path: str = DEF_CATEGORIES_PATH) -> CategoryEngine:
+    """Engine for the definitions at path, compiled once and again only after the file changes."""
+    mtime = os.path.getmtime(path)
+    cached = _engines.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _engines[path] = (mtime, CategoryEngine(load_def_categories(path)))
+    return cached[1]
+
+
+def verify(workflows_dir: str, def_path: str) -> int:
+    """Compare the engine with create_categories.categorize_workflow on every workflow filename."""
+    integration_to_category = load_def_categories(def_path)
+    filenames = sorted({path.name for path in Path(workflows_dir).rglob('*.json')})
+    if not filenames:
+        print(f"❌ No workflows found in {workflows_dir}")
+        return 1
+
+    engine = CategoryEngine(integration_to_category)
+    mismatches = 0
+    for filename in filenames:
+        expected, actual = categorize_workflow(filename, integration_to_category), engine.categorize(filename)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"❌ {filename}: expected {expected!r}, got {actual!r}")
+
+    timings = {}
+    start = time.perf_counter()
+    for filename in filenames:
+        categorize_workflow(filename, integration_to_category)
+    timings['reference'] = time.perf_counter() - start
+    # Compiling is part of the engine's cost
+    start = time.perf_counter()
+    CategoryEngine(integration_to_category).categorize_all(filenames)
+    timings['compiled'] = time.perf_counter() - start
+
+    print(f"📊 {len(filenames)} workflow filenames, {len(integration_to_category)} integration keys")
+    print(f"   reference: {timings['reference'] * 1000:.1f} ms, engine: {timings['compiled'] * 1000:.1f} ms "
+          f"({timings['reference'] / max(timings['compiled'], 1e-9):.1f}x)")
+    if mismatches:
+        print(f"❌ {mismatches} workflows categorized differently")
+        return 1
+    print("✅ Category engine matches create_categories on every workflow")
+    return 0
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Compiled workflow categorization rules")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check the engine against the create_categories rules over a corpus")
+    parser.add_argument("--workflows-dir", default="workflows", help="Corpus for --verify")
+    parser.add_argument("--definitions", default=DEF_CATEGORIES_PATH, help="Category definitions JSON")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(verify(args.workflows_dir, args.definitions))
+    parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
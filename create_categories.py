@@ -4,9 +4,9 @@ from pathlib import Path
 import glob
 import re
 
-def load_def_categories():
+def load_def_categories(def_categories_path="context/def_categories.json"):
     """Load the definition categories from def_categories.json"""
-    def_categories_path = Path("context/def_categories.json")
+    def_categories_path = Path(def_categories_path)
     with open(def_categories_path, 'r', encoding='utf-8') as f:
         raw_map = json.load(f)
 
@@ -47,106 +47,76 @@ def find_matching_category(tokens, integration_to_category):
     
     return ""
 
-def categorize_by_filename(filename):
-    """
-    Categorize workflow based on filename patterns.
-    Returns the most likely category or None if uncertain.
-    """
-    filename_lower = filename.lower()
-    
+# Filename patterns for workflows no integration token matched, in priority order:
+# the first rule with a word contained in the lowercased filename wins
+FILENAME_RULES = [
     # Security & Authentication
-    if any(word in filename_lower for word in ['totp', 'bitwarden', 'auth', 'security']):
-        return "Technical Infrastructure & DevOps"
-
+    (['totp', 'bitwarden', 'auth', 'security'], "Technical Infrastructure & DevOps"),
     # Data Processing & File Operations
-    if any(word in filename_lower for word in ['process', 'writebinaryfile', 'readbinaryfile', 'extractfromfile', 'converttofile', 'googlefirebasecloudfirestore', 'supabase', 'surveymonkey', 'renamekeys', 'readpdf', 'wufoo', 'splitinbatches', 'airtop', 'comparedatasets', 'spreadsheetfile', 'calcslive']):
-        return "Data Processing & Analysis"
-
+    (['process', 'writebinaryfile', 'readbinaryfile', 'extractfromfile', 'converttofile', 'googlefirebasecloudfirestore', 'supabase', 'surveymonkey', 'renamekeys', 'readpdf', 'wufoo', 'splitinbatches', 'airtop', 'comparedatasets', 'spreadsheetfile', 'calcslive'], "Data Processing & Analysis"),
     # Utility & Business Process Automation
-    if any(word in filename_lower for word in ['noop', 'code', 'schedule', 'filter', 'splitout', 'wait', 'limit', 'aggregate', 'acuityscheduling', 'eventbrite', 'philipshue', 'stickynote', 'n8ntrainingcustomerdatastore', 'n8n']):
-        return "Business Process Automation"
-
+    (['noop', 'code', 'schedule', 'filter', 'splitout', 'wait', 'limit', 'aggregate', 'acuityscheduling', 'eventbrite', 'philipshue', 'stickynote', 'n8ntrainingcustomerdatastore', 'n8n'], "Business Process Automation"),
     # Webhook & API related
-    if any(word in filename_lower for word in ['webhook', 'respondtowebhook', 'http', 'rssfeedread']):
-        return "Web Scraping & Data Extraction"
-
+    (['webhook', 'respondtowebhook', 'http', 'rssfeedread'], "Web Scraping & Data Extraction"),
     # Form & Data Collection
-    if any(word in filename_lower for word in ['form', 'typeform', 'jotform']):
-        return "Data Processing & Analysis"
-
+    (['form', 'typeform', 'jotform'], "Data Processing & Analysis"),
     # Local file operations
-    if any(word in filename_lower for word in ['localfile', 'filemaker']):
-        return "Cloud Storage & File Management"
-
+    (['localfile', 'filemaker'], "Cloud Storage & File Management"),
     # Database operations
-    if any(word in filename_lower for word in ['postgres', 'mysql', 'mongodb', 'redis', 'elasticsearch', 'snowflake']):
-        return "Data Processing & Analysis"
-
+    (['postgres', 'mysql', 'mongodb', 'redis', 'elasticsearch', 'snowflake'], "Data Processing & Analysis"),
     # AI & Machine Learning
-    if any(word in filename_lower for word in ['openai', 'awstextract', 'awsrekognition', 'humanticai', 'openthesaurus', 'googletranslate', 'summarize']):
-        return "AI Agent Development"
-
+    (['openai', 'awstextract', 'awsrekognition', 'humanticai', 'openthesaurus', 'googletranslate', 'summarize'], "AI Agent Development"),
     # E-commerce specific
-    if any(word in filename_lower for word in ['woocommerce', 'gumroad']):
-        return "E-commerce & Retail"
-
+    (['woocommerce', 'gumroad'], "E-commerce & Retail"),
     # Social media specific
-    if any(word in filename_lower for word in ['facebook', 'linkedin', 'instagram']):
-        return "Social Media Management"
-
+    (['facebook', 'linkedin', 'instagram'], "Social Media Management"),
     # Customer support
-    if any(word in filename_lower for word in ['zendesk', 'intercom', 'drift', 'pagerduty']):
-        return "Communication & Messaging"
-
+    (['zendesk', 'intercom', 'drift', 'pagerduty'], "Communication & Messaging"),
     # Analytics & Tracking
-    if any(word in filename_lower for word in ['googleanalytics', 'segment', 'mixpanel']):
-        return "Data Processing & Analysis"
-
+    (['googleanalytics', 'segment', 'mixpanel'], "Data Processing & Analysis"),
     # Development tools
-    if any(word in filename_lower for word in ['git', 'github', 'gitlab', 'travisci', 'jenkins', 'uptimerobot', 'gsuiteadmin', 'debughelper', 'bitbucket']):
-        return "Technical Infrastructure & DevOps"
-
+    (['git', 'github', 'gitlab', 'travisci', 'jenkins', 'uptimerobot', 'gsuiteadmin', 'debughelper', 'bitbucket'], "Technical Infrastructure & DevOps"),
     # CRM & Sales tools
-    if any(word in filename_lower for word in ['pipedrive', 'hubspot', 'salesforce', 'copper', 'orbit', 'agilecrm']):
-        return "CRM & Sales"
-
+    (['pipedrive', 'hubspot', 'salesforce', 'copper', 'orbit', 'agilecrm'], "CRM & Sales"),
     # Marketing tools
-    if any(word in filename_lower for word in ['mailchimp', 'convertkit', 'sendgrid', 'mailerlite', 'lemlist', 'sendy', 'postmark', 'mailgun']):
-        return "Marketing & Advertising Automation"
-
+    (['mailchimp', 'convertkit', 'sendgrid', 'mailerlite', 'lemlist', 'sendy', 'postmark', 'mailgun'], "Marketing & Advertising Automation"),
     # Project management
-    if any(word in filename_lower for word in ['asana', 'mondaycom', 'clickup', 'trello', 'notion', 'toggl', 'microsofttodo', 'calendly', 'jira']):
-        return "Project Management"
-
+    (['asana', 'mondaycom', 'clickup', 'trello', 'notion', 'toggl', 'microsofttodo', 'calendly', 'jira'], "Project Management"),
     # Communication
-    if any(word in filename_lower for word in ['slack', 'telegram', 'discord', 'mattermost', 'twilio', 'emailreadimap', 'teams', 'gotowebinar']):
-        return "Communication & Messaging"
-
+    (['slack', 'telegram', 'discord', 'mattermost', 'twilio', 'emailreadimap', 'teams', 'gotowebinar'], "Communication & Messaging"),
     # Cloud storage
-    if any(word in filename_lower for word in ['dropbox', 'googledrive', 'onedrive', 'awss3', 'googledocs']):
-        return "Cloud Storage & File Management"
-
+    (['dropbox', 'googledrive', 'onedrive', 'awss3', 'googledocs'], "Cloud Storage & File Management"),
     # Creative tools
-    if any(word in filename_lower for word in ['canva', 'figma', 'bannerbear', 'editimage']):
-        return "Creative Design Automation"
-
+    (['canva', 'figma', 'bannerbear', 'editimage'], "Creative Design Automation"),
     # Video & content
-    if any(word in filename_lower for word in ['youtube', 'vimeo', 'storyblok', 'strapi']):
-        return "Creative Content & Video Automation"
-
+    (['youtube', 'vimeo', 'storyblok', 'strapi'], "Creative Content & Video Automation"),
     # Financial tools
-    if any(word in filename_lower for word in ['stripe', 'chargebee', 'quickbooks', 'harvest']):
-        return "Financial & Accounting"
-
+    (['stripe', 'chargebee', 'quickbooks', 'harvest'], "Financial & Accounting"),
     # Weather & external APIs
-    if any(word in filename_lower for word in ['openweathermap', 'nasa', 'crypto', 'coingecko']):
-        return "Web Scraping & Data Extraction"
+    (['openweathermap', 'nasa', 'crypto', 'coingecko'], "Web Scraping & Data Extraction"),
+]
 
+def categorize_by_filename(filename):
+    """
+    Categorize workflow based on filename patterns (FILENAME_RULES).
+    Returns the most likely category or "" if uncertain.
+    """
+    filename_lower = filename.lower()
+    for words, category in FILENAME_RULES:
+        if any(word in filename_lower for word in words):
+            return category
     return ""
 
+def categorize_workflow(filename, integration_to_category):
+    """Category for a workflow file: integration tokens first, then filename patterns ("" if none)."""
+    tokens = extract_tokens_from_filename(filename)
+    return find_matching_category(tokens, integration_to_category) or categorize_by_filename(filename)
+
 def main():
-    # Load definition categories
-    integration_to_category = load_def_categories()
+    from category_engine import CategoryEngine
+
+    # Compile the definition categories once for the whole corpus
+    engine = CategoryEngine(load_def_categories())
     
     # Get all JSON files from workflows directory
     workflows_dir = Path("workflows")
@@ -155,24 +125,10 @@ def main():
         recursive=True
     ) 
     
-    # Process each file
-    search_categories = []
-    
-    for json_file in json_files:
-        path_obj = Path(json_file)
-        filename = path_obj.name
-        tokens = extract_tokens_from_filename(filename)
-        category = find_matching_category(tokens, integration_to_category)
-        
-        search_categories.append({
-            "filename": filename,
-            "category": category
-        })
-
-    # Second pass for categorization
-    for item in search_categories:
-        if not item['category']:
-            item['category'] = categorize_by_filename(item['filename'])
+    # Categorize all files in one batch
+    categories = engine.categorize_all(Path(json_file).name for json_file in json_files)
+    search_categories = [{"filename": filename, "category": category}
+                         for filename, category in categories.items()]
     
     # Sort by filename for consistency
     search_categories.sort(key=lambda x: x['filename'])
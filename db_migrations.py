@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Database Migrations
+Versioned schema changes for workflows.db, tracked in PRAGMA user_version.
+
+Each migration moves the schema from version N-1 to N and runs in its own
+transaction together with the user_version bump, so a database is always
+at exactly one version. Migrations are additive (new tables, columns and
+indexes) and work on the existing rows, so they apply online: the API can
+keep serving while `python db_migrations.py` or the next WorkflowDatabase
+open brings a database up to date, and no reindex is needed.
+
+Version 0 is a new database or one created before versioning; migration 1
+is written with IF NOT EXISTS throughout so it also adopts those.
+
+To change the schema, append a migration; never edit one that has shipped.
+"""
+
+import argparse
+import sqlite3
+import sys
+from typing import Callable, List, Tuple
+
+from metrics_registry import connect
+
+
+def _baseline(conn: sqlite3.Connection):
+    """Workflows table, FTS index and triggers, diagram cache and blob store."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS workflows (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filename TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            workflow_id TEXT,
+            active BOOLEAN DEFAULT 0,
+            description TEXT,
+            trigger_type TEXT,
+            complexity TEXT,
+            node_count INTEGER DEFAULT 0,
+            integrations TEXT,  -- JSON array
+            tags TEXT,         -- JSON array
+            created_at TEXT,
+            updated_at TEXT,
+            file_hash TEXT,
+            file_size INTEGER,
+            analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # FTS5 table for full-text search
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS workflows_fts USING fts5(
+            filename,
+            name,
+            description,
+            integrations,
+            tags,
+            content=workflows,
+            content_rowid=id
+        )
+    """)
+
+    # Indexes for fast filtering
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_trigger_type ON workflows(trigger_type)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_complexity ON workflows(complexity)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_active ON workflows(active)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_node_count ON workflows(node_count)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_filename ON workflows(filename)")
+
+    # Triggers to keep the FTS table in sync
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS workflows_ai AFTER INSERT ON workflows BEGIN
+            INSERT INTO workflows_fts(rowid, filename, name, description, integrations, tags)
+            VALUES (new.id, new.filename, new.name, new.description, new.integrations, new.tags);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS workflows_ad AFTER DELETE ON workflows BEGIN
+            INSERT INTO workflows_fts(workflows_fts, rowid, filename, name, description, integrations, tags)
+            VALUES ('delete', old.id, old.filename, old.name, old.description, old.integrations, old.tags);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS workflows_au AFTER UPDATE ON workflows BEGIN
+            INSERT INTO workflows_fts(workflows_fts, rowid, filename, name, description, integrations, tags)
+            VALUES ('delete', old.id, old.filename, old.name, old.description, old.integrations, old.tags);
+            INSERT INTO workflows_fts(rowid, filename, name, description, integrations, tags)
+            VALUES (new.id, new.filename, new.name, new.description, new.integrations, new.tags);
+        END
+    """)
+
+    # Rendered diagrams (zlib-compressed), valid while file_hash and version match.
+    # Variants: 'mermaid' (full diagram) and 'graph' (compact nodes/connections
+    # JSON the level-of-detail renderings are built from)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(workflow_diagrams)")]
+    if columns and 'variant' not in columns:
+        conn.execute("DROP TABLE workflow_diagrams")  # pre-variant layout; it is only a cache
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS workflow_diagrams (
+            filename TEXT NOT NULL,
+            variant TEXT NOT NULL,
+            file_hash TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (filename, variant)
+        )
+    """)
+    # Compressed workflow files by file_hash (see workflow_blobs); unreferenced
+    # blobs are pruned at the end of each indexing run
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS workflow_blobs (
+            file_hash TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS workflows_diagram_ad AFTER DELETE ON workflows BEGIN
+            DELETE FROM workflow_diagrams WHERE filename = old.filename;
+        END
+    """)
+
+
+def _category_column(conn: sqlite3.Connection):
+    """workflows.category, which optimized_server and src/enhanced_api filter and group on."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(workflows)")]
+    if 'category' not in columns:
+        conn.execute("ALTER TABLE workflows ADD COLUMN category TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_category ON workflows(category)")
+
+
+# (version, description, apply); versions are consecutive from 1
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "baseline schema", _baseline),
+    (2, "workflows.category column", _category_column),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target: int = LATEST_VERSION) -> List[int]:
+    """Apply pending migrations up to target; returns the versions applied.
+
+    BEGIN IMMEDIATE takes the write lock before the version is re-read, so
+    concurrent processes opening the same database apply each migration once.
+    """
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        if version > target:
+            break
+        if version <= schema_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            apply(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Apply or show schema migrations of the workflow database")
+    parser.add_argument("--db", default="database/workflows.db", help="Database path (default: database/workflows.db)")
+    parser.add_argument("--status", action="store_true", help="Show the schema version and pending migrations only")
+    args = parser.parse_args()
+
+    # Autocommit mode: migrate() manages its own transactions
+    conn = connect(args.db, isolation_level=None)
+    try:
+        current = schema_version(conn)
+        pending = [(version, description) for version, description, _ in MIGRATIONS if version > current]
+        print(f"🗄️  {args.db}: schema version {current} (latest {LATEST_VERSION})")
+        if args.status or not pending:
+            for version, description in pending:
+                print(f"   pending {version}: {description}")
+            if not pending:
+                print("✅ Schema is up to date")
+            return
+        for version in migrate(conn):
+            print(f"✅ Applied migration {version}: {dict(pending)[version]}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
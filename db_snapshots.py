@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Database Snapshots
+Read-only copies of the workflow database for multi-worker serving.
+
+One process owns the writable database and indexes into it. After each
+indexing run that changed something it publishes a snapshot: a consistent
+copy made with SQLite's backup API, switched to rollback journaling,
+written next to the target and renamed over it. The rename is atomic, so
+readers see either the old snapshot or the new one, never a partial file.
+
+API workers open the snapshot with immutable=1 and query_only (see
+WorkflowDatabase read-only modes). They open a connection per query, so a
+new snapshot is picked up by the next query without a restart; a query
+already running keeps reading the file it opened, which the OS keeps alive
+until that connection closes.
+
+Workers cannot index. POST /api/reindex drops a request file next to the
+snapshot (request_reindex) that the indexing process picks up.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+REQUEST_SUFFIX = '.reindex'
+
+
+def publish_snapshot(source_path: str, snapshot_path: str) -> Dict[str, Any]:
+    """Copy source_path to snapshot_path atomically; returns size and duration."""
+    started = time.perf_counter()
+    tmp_path = f"{snapshot_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    source = sqlite3.connect(source_path)
+    try:
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target)
+            # Immutable readers cannot use a WAL; the snapshot is never written again anyway
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            target.close()
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        source.close()
+
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, snapshot_path)
+    return {
+        'path': snapshot_path,
+        'bytes': os.path.getsize(snapshot_path),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def request_reindex(snapshot_path: str, force: bool = False):
+    """Ask the indexing process to reindex and publish a new snapshot."""
+    request_path = snapshot_path + REQUEST_SUFFIX
+    tmp_path = f"{request_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'force': force, 'requested_at': time.time()}, f)
+    os.replace(tmp_path, request_path)
+
+
+def _take_request(snapshot_path: str) -> Optional[Dict[str, Any]]:
+    request_path = snapshot_path + REQUEST_SUFFIX
+    try:
+        with open(request_path, 'r', encoding='utf-8') as f:
+            request = json.load(f)
+        os.remove(request_path)
+        return request
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError):
+        try:
+            os.remove(request_path)
+        except OSError:
+            pass
+        return {'force': False}
+
+
+class SnapshotIndexer:
+    """Indexing loop of the process that owns the writable database.
+
+    Reindexes when a worker requests it (polled every poll_seconds) and,
+    if interval is set, every interval seconds; publishes a new snapshot
+    whenever a run processed anything.
+    """
+
+    def __init__(self, db_path: str, snapshot_path: str, interval: float = 0, poll_seconds: float = 1.0):
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.poll_seconds = poll_seconds
+        self.published = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self) -> Dict[str, Any]:
+        result = publish_snapshot(self.db_path, self.snapshot_path)
+        self.published += 1
+        print(f"📸 Published snapshot {result['path']} ({result['bytes'] / 1024 / 1024:.1f} MB, {result['seconds']}s)")
+        return result
+
+    def run_once(self, force: bool = False) -> Dict[str, int]:
+        from workflow_db import WorkflowDatabase
+
+        stats = WorkflowDatabase(self.db_path).index_all_workflows(force_reindex=force)
+        if stats['processed'] > 0:
+            self.publish()
+        return stats
+
+    def _loop(self):
+        next_scheduled = time.monotonic() + self.interval if self.interval else None
+        while not self._stop.wait(self.poll_seconds):
+            request = _take_request(self.snapshot_path)
+            due = next_scheduled is not None and time.monotonic() >= next_scheduled
+            if request is None and not due:
+                continue
+            try:
+                self.run_once(force=bool(request and request.get('force')))
+            except Exception as e:
+                print(f"❌ Snapshot indexing failed: {e}")
+            if self.interval:
+                next_scheduled = time.monotonic() + self.interval
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self._loop, name="snapshot-indexer", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
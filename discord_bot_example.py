@@ -2,13 +2,21 @@
 """
 🤖 Bot Discord para N8N Workflows
 Busca e disponibiliza workflows através de comandos Discord
+
+Todos os comandos usam um único WorkflowAPIClient: uma sessão aiohttp
+compartilhada (conexões keep-alive), cache com TTL para estatísticas,
+categorias e listagens, uma única request para consultas idênticas em
+andamento e no máximo MAX_CONCURRENT_REQUESTS requests simultâneas.
+Assim, um servidor movimentado gera uma carga pequena e limitada na API.
 """
 
 import discord
 from discord.ext import commands
 import aiohttp
+import asyncio
 import json
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Tuple
 from urllib.parse import quote
 import random
 
@@ -16,28 +24,110 @@ import random
 API_BASE_URL = "https://seu-dominio.railway.app/api"  # ← ALTERE AQUI
 BOT_TOKEN = "seu_token_discord_aqui"  # ← ALTERE AQUI
 
+MAX_CONCURRENT_REQUESTS = 4  # Requests simultâneas à API, no máximo
+MAX_CACHED_RESPONSES = 256
+
+# TTL do cache (segundos) por tipo de consulta
+STATS_TTL = 60
+CATEGORIES_TTL = 300
+LISTING_TTL = 120
+
+
+# ==================== CLIENTE DA API ====================
+
+class WorkflowAPIClient:
+    """Cliente da API de workflows com sessão compartilhada, cache, coalescência e limite de concorrência"""
+    
+    def __init__(self, base_url: str, max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 max_cached: int = MAX_CACHED_RESPONSES):
+        self.base_url = base_url
+        self.max_cached = max_cached
+        self._max_concurrent = max_concurrent
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # chave -> (expira em, resposta)
+        self._cache: Dict[Tuple, Tuple[float, Dict]] = {}
+        # chave -> request em andamento, compartilhada por consultas idênticas
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Sessão compartilhada, criada no primeiro uso (dentro do event loop do bot)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10),
+                connector=aiohttp.TCPConnector(limit=self._max_concurrent)
+            )
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+        return self._session
+    
+    async def close(self):
+        """Fecha a sessão (ao desligar o bot)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _fetch(self, endpoint: str, params: Optional[Dict[str, Any]]) -> Optional[Dict]:
+        session = self._get_session()
+        try:
+            async with self._semaphore:
+                async with session.get(f"{self.base_url}{endpoint}", params=params) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    print(f"❌ API Error: {response.status}")
+                    return None
+        except Exception as e:
+            print(f"❌ Request Error: {e}")
+            return None
+    
+    async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                  ttl: float = 0) -> Optional[Dict]:
+        """GET na API; com ttl > 0 a resposta fica em cache por ttl segundos (erros não são guardados)"""
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        now = time.monotonic()
+        
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(endpoint, params))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: um comando cancelado não cancela a request dos outros que a aguardam
+        data = await asyncio.shield(future)
+        
+        if data is not None and ttl > 0:
+            if len(self._cache) >= self.max_cached:
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+                if len(self._cache) >= self.max_cached:
+                    self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = (time.monotonic() + ttl, data)
+        return data
+
+
+api = WorkflowAPIClient(API_BASE_URL)
+
+
+class WorkflowBot(commands.Bot):
+    async def close(self):
+        await api.close()
+        await super().close()
+
+
 # Configurar intents
 intents = discord.Intents.default()
 intents.message_content = True
 
 # Criar bot
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = WorkflowBot(command_prefix="!", intents=intents)
 
 # ==================== FUNÇÕES AUXILIARES ====================
 
-async def api_request(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
-    """Faz request para a API de workflows"""
-    try:
-        async with aiohttp.ClientSession() as session:
-            url = f"{API_BASE_URL}{endpoint}"
-            async with session.get(url, params=params, timeout=10) as response:
-                if response.status == 200:
-                    return await response.json()
-                print(f"❌ API Error: {response.status}")
-                return None
-    except Exception as e:
-        print(f"❌ Request Error: {e}")
-        return None
+async def api_request(endpoint: str, params: Optional[Dict[str, Any]] = None,
+                      ttl: float = 0) -> Optional[Dict]:
+    """Faz request para a API de workflows (ttl > 0 usa o cache)"""
+    return await api.get(endpoint, params, ttl)
 
 
 def create_workflow_embed(workflow: Dict, color: discord.Color = discord.Color.blue()) -> discord.Embed:
@@ -98,7 +188,7 @@ async def on_ready():
     print("=" * 50)
     
     # Testar conexão com API
-    stats = await api_request("/stats")
+    stats = await api_request("/stats", ttl=STATS_TTL)
     if stats:
         print(f"✅ API Online - {stats.get('total', 0)} workflows disponíveis")
     else:
@@ -109,7 +199,7 @@ async def on_ready():
 async def stats(ctx):
     """📊 Mostra estatísticas dos workflows disponíveis"""
     async with ctx.typing():
-        data = await api_request("/stats")
+        data = await api_request("/stats", ttl=STATS_TTL)
         
         if not data:
             await ctx.send("❌ Erro ao buscar estatísticas da API")
@@ -227,7 +317,7 @@ async def download(ctx, *, filename: str):
 async def categories(ctx):
     """📂 Lista todas as categorias disponíveis"""
     async with ctx.typing():
-        data = await api_request("/categories")
+        data = await api_request("/categories", ttl=CATEGORIES_TTL)
         
         if not data:
             await ctx.send("❌ Erro ao buscar categorias")
@@ -271,7 +361,7 @@ async def category(ctx, *, category_name: str):
     async with ctx.typing():
         # URL encode da categoria
         encoded_cat = quote(category_name)
-        data = await api_request(f"/workflows/category/{encoded_cat}")
+        data = await api_request(f"/workflows/category/{encoded_cat}", ttl=LISTING_TTL)
         
         if not data or not data.get('workflows'):
             await ctx.send(f"❌ Nenhum workflow na categoria: **{category_name}**\n"
@@ -305,7 +395,7 @@ async def random_workflow(ctx):
     """🎲 Mostra um workflow aleatório"""
     async with ctx.typing():
         # Buscar workflows (primeira página com 100 itens)
-        data = await api_request("/workflows", {"per_page": 100})
+        data = await api_request("/workflows", {"per_page": 100}, ttl=LISTING_TTL)
         
         if not data or not data.get('workflows'):
             await ctx.send("❌ Erro ao buscar workflows")
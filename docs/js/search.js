@@ -3,6 +3,49 @@
  * Handles searching, filtering, and displaying workflow results
  */
 
+// Letters and digits in any script; must match TOKEN_PATTERN in scripts/generate_search_index.py
+const TOKEN_PATTERN = /[\p{L}\p{N}]+/gu;
+
+function tokenize(text) {
+    return text.toLowerCase().match(TOKEN_PATTERN) || [];
+}
+
+/**
+ * Expand a compact search index (see scripts/generate_search_index.py) into
+ * the workflow objects the UI works with. Indexes in the older format, with
+ * full objects and searchable_text, are returned unchanged.
+ */
+function decodeSearchIndex(raw) {
+    if (raw.format !== 'compact') {
+        return raw;
+    }
+    const dict = raw.dict;
+    const column = {};
+    raw.fields.forEach((field, i) => { column[field] = i; });
+
+    const workflows = raw.workflows.map(row => {
+        const filename = row[column.filename];
+        return {
+            id: filename.replace('.json', ''),
+            name: row[column.name],
+            description: row[column.description],
+            filename,
+            active: row[column.active],
+            trigger_type: dict.triggers[row[column.trigger_type]],
+            complexity: dict.complexities[row[column.complexity]],
+            node_count: row[column.node_count],
+            category: dict.categories[row[column.category]],
+            integrations: row[column.integrations].map(i => dict.integrations[i]),
+            tags: row[column.tags].map(i => dict.tags[i]),
+            download_url: raw.url
+                .replace('{folder}', dict.folders[row[column.folder]])
+                .replace('{filename}', filename)
+        };
+    });
+
+    return { ...raw, workflows, tokens: raw.tokens, tokenList: Object.keys(raw.tokens), postings: new Map() };
+}
+
 class WorkflowSearch {
     constructor() {
         this.searchIndex = null;
@@ -46,7 +89,7 @@ class WorkflowSearch {
             if (!response.ok) {
                 throw new Error('Failed to load search index');
             }
-            this.searchIndex = await response.json();
+            this.searchIndex = decodeSearchIndex(await response.json());
         } finally {
             this.showLoading(false);
         }
@@ -105,14 +148,51 @@ class WorkflowSearch {
         this.updateResultsHeader(query, { category, complexity, trigger });
     }
 
+    /**
+     * Positions of workflows containing every query term, where a term matches
+     * any indexed token that contains it (so partial words still match).
+     */
+    matchTokens(query) {
+        const index = this.searchIndex;
+        let matches = null;
+        for (const term of new Set(tokenize(query))) {
+            const termMatches = new Set();
+            for (const token of index.tokenList) {
+                if (token.includes(term)) {
+                    this.tokenPostings(token).forEach(position => termMatches.add(position));
+                }
+            }
+            matches = matches === null
+                ? termMatches
+                : new Set([...matches].filter(position => termMatches.has(position)));
+            if (matches.size === 0) break;
+        }
+        return matches === null ? [] : [...matches].sort((a, b) => a - b);
+    }
+
+    tokenPostings(token) {
+        // Decoded on first use: stored as gaps between ascending workflow positions
+        let positions = this.searchIndex.postings.get(token);
+        if (!positions) {
+            let position = 0;
+            positions = this.searchIndex.tokens[token].map(gap => (position += gap));
+            this.searchIndex.postings.set(token, positions);
+        }
+        return positions;
+    }
+
     searchWorkflows(query, filters = {}) {
         let results = [...this.searchIndex.workflows];
 
         // Text search
         if (query) {
-            results = results.filter(workflow =>
-                workflow.searchable_text.includes(query)
-            );
+            if (this.searchIndex.tokens) {
+                results = this.matchTokens(query).map(position => this.searchIndex.workflows[position]);
+            } else {
+                results = results.filter(workflow =>
+                    workflow.searchable_text.includes(query)
+                );
+            }
 
             // Sort by relevance (name matches first, then description)
             results.sort((a, b) => {
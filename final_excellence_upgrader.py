@@ -18,6 +18,8 @@ import concurrent.futures
 import threading
 from dataclasses import dataclass
 
+from backup_store import BackupStore, DEFAULT_STORE_DIR
+
 @dataclass
 class WorkflowQuality:
     """Quality metrics for a workflow"""
@@ -31,38 +33,33 @@ class WorkflowQuality:
 class FinalExcellenceUpgrader:
     """Final comprehensive workflow upgrader with advanced analytics"""
     
-    def __init__(self, workflows_dir="workflows", backup_dir="workflows_backup", max_workers=4):
+    def __init__(self, workflows_dir="workflows", backup_dir=DEFAULT_STORE_DIR, max_workers=4):
         self.workflows_dir = Path(workflows_dir)
         self.backup_dir = Path(backup_dir)
+        self.backup_store = BackupStore(backup_dir)
         self.max_workers = max_workers
         self.upgrade_stats = defaultdict(int)
         self.quality_metrics = defaultdict(list)
         self.thread_lock = threading.Lock()
-        
-        # Create backup directory
-        self.backup_dir.mkdir(exist_ok=True)
     
     def create_backup(self):
-        """Create comprehensive backup of original workflows"""
+        """Create comprehensive backup of original workflows (only changed content is stored)"""
         print("📦 Creating comprehensive backup...")
         
-        if self.backup_dir.exists():
-            shutil.rmtree(self.backup_dir)
-        
-        shutil.copytree(self.workflows_dir, self.backup_dir)
+        with self.backup_store.begin_run('final_excellence', self.workflows_dir) as run:
+            run.add_tree(self.workflows_dir)
         
         # Create backup metadata
         backup_metadata = {
             'backup_timestamp': datetime.now().isoformat(),
-            'total_workflows': self.count_total_workflows(),
-            'backup_location': str(self.backup_dir),
+            'total_workflows': run.stats['files'],
+            'backup_location': str(self.backup_store.run_path(run.run_id)),
+            'backup_run_id': run.run_id,
+            'bytes_stored': run.stats['bytes_stored'],
             'upgrader_version': 'final_excellence_v1.0'
         }
         
-        with open(self.backup_dir / 'backup_metadata.json', 'w') as f:
-            json.dump(backup_metadata, f, indent=2)
-        
-        print(f"✅ Backup created at: {self.backup_dir}")
+        print(f"✅ Backup run {run.run_id} created ({run.stats['bytes_stored']:,} new bytes stored)")
         return backup_metadata
     
     def count_total_workflows(self) -> int:
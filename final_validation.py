@@ -15,6 +15,17 @@ import concurrent.futures
 import threading
 from dataclasses import dataclass
 
+from security_scanner import SecretScanner
+
+# Both security rules are evaluated in the same walk over the workflow
+CREDENTIAL_SCANNER = SecretScanner(
+    key_rules={
+        'credential': ['password', 'token', 'key', 'secret'],
+        'sensitive': ['api_key', 'access_token', 'secret'],
+    },
+    scan_urls=False
+)
+
 @dataclass
 class ValidationResult:
     """Validation result for a workflow"""
@@ -213,13 +224,15 @@ class FinalValidator:
         """Validate security aspects"""
         issues = []
         
+        findings = self.scan_credentials(workflow_data)
+        
         # Check for hardcoded credentials
-        hardcoded_creds = self.find_hardcoded_credentials(workflow_data)
+        hardcoded_creds = findings['credential']
         if hardcoded_creds:
             issues.append(f"Hardcoded credentials found: {len(hardcoded_creds)}")
         
         # Check for sensitive data
-        sensitive_data = self.find_sensitive_data(workflow_data)
+        sensitive_data = findings['sensitive']
         if sensitive_data:
             issues.append(f"Sensitive data found: {len(sensitive_data)}")
         
@@ -279,43 +292,21 @@ class FinalValidator:
         
         return len(trigger_nodes) > 0
     
+    def scan_credentials(self, workflow_data: Dict) -> Dict[str, List[str]]:
+        """Find hardcoded credentials and sensitive data in a single pass"""
+        results = {'credential': [], 'sensitive': []}
+        for finding in CREDENTIAL_SCANNER.scan(workflow_data):
+            if isinstance(finding.value, str):
+                results[finding.rule].append(f"{finding.path}: {finding.preview(20)}...")
+        return results
+    
     def find_hardcoded_credentials(self, workflow_data: Dict) -> List[str]:
         """Find hardcoded credentials"""
-        credentials = []
-        
-        def search_credentials(obj, path=""):
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
-                    if any(cred in key.lower() for cred in ['password', 'token', 'key', 'secret']):
-                        if isinstance(value, str) and value.strip() and value != "":
-                            credentials.append(f"{current_path}: {value[:20]}...")
-                    search_credentials(value, current_path)
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    search_credentials(item, f"{path}[{i}]")
-        
-        search_credentials(workflow_data)
-        return credentials
+        return self.scan_credentials(workflow_data)['credential']
     
     def find_sensitive_data(self, workflow_data: Dict) -> List[str]:
         """Find sensitive data"""
-        sensitive = []
-        
-        def search_sensitive(obj, path=""):
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
-                    if any(sens in key.lower() for sens in ['api_key', 'access_token', 'secret']):
-                        if isinstance(value, str) and value.strip() and value != "":
-                            sensitive.append(f"{current_path}: {value[:20]}...")
-                    search_sensitive(value, current_path)
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    search_sensitive(item, f"{path}[{i}]")
-        
-        search_sensitive(workflow_data)
-        return sensitive
+        return self.scan_credentials(workflow_data)['sensitive']
     
     def validate_single_workflow(self, workflow_path: Path) -> Dict[str, Any]:
         """Validate a single workflow"""
@@ -2,15 +2,31 @@
 """
 N8N Workflow Importer
 Python replacement for import-workflows.sh with better error handling and progress tracking.
+
+Workflows are imported in batches: valid files are staged into one
+temporary directory per chunk and each chunk is a single
+`n8n import:workflow --separate --input=<dir>` run, with a few chunks
+running in parallel. A chunk that fails is bisected and its halves
+retried, so one bad workflow only fails itself. search_categories.json is updated once,
+after all chunks.
+
+The n8n command defaults to `npx n8n` and can be replaced with --n8n or
+N8N_COMMAND (e.g. a local binary, or a stub for testing).
 """
 
+import argparse
 import json
+import os
+import shlex
+import shutil
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-from create_categories import categorize_by_filename
+from category_engine import load_category_engine
 
 
 def load_categories():
@@ -26,11 +42,45 @@ def save_categories(data):
     with open('context/search_categories.json', 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
+def update_categories(filenames: List[str]):
+    """Set the category of each imported file in search_categories.json (one read, one write)."""
+    categories = load_category_engine().categorize_all(filenames)
+    all_workflows_data = load_categories()
+    
+    for workflow_entry in all_workflows_data:
+        filename = workflow_entry.get('filename')
+        if filename in categories:
+            workflow_entry['category'] = categories.pop(filename)
+    
+    # New workflow entries (e.g., first import)
+    for filename, category in categories.items():
+        all_workflows_data.append({
+            "filename": filename,
+            "category": category,
+            "name": Path(filename).stem, # Assuming workflow name is filename without extension
+            "description": "", # Placeholder, can be updated manually
+            "nodes": [] # Placeholder, can be updated manually
+        })
+    
+    save_categories(all_workflows_data)
+
+def n8n_command() -> List[str]:
+    """The n8n CLI invocation (env N8N_COMMAND, default `npx n8n`)."""
+    return shlex.split(os.environ.get('N8N_COMMAND', 'npx n8n'))
+
 class WorkflowImporter:
     """Import n8n workflows with progress tracking and error handling."""
     
-    def __init__(self, workflows_dir: str = "workflows"):
+    # Seconds allowed per file in a chunk, on top of CHUNK_TIMEOUT_BASE for n8n's own startup
+    CHUNK_TIMEOUT_BASE = 60
+    CHUNK_TIMEOUT_PER_FILE = 2
+    
+    def __init__(self, workflows_dir: str = "workflows", chunk_size: int = 100, jobs: int = 2,
+                 command: Optional[List[str]] = None):
         self.workflows_dir = Path(workflows_dir)
+        self.chunk_size = max(1, chunk_size)
+        self.jobs = max(1, jobs)
+        self.command = command or n8n_command()
         self.imported_count = 0
         self.failed_count = 0
         self.errors = []
@@ -56,7 +106,7 @@ class WorkflowImporter:
             return False
 
     def import_workflow(self, file_path: Path) -> bool:
-        """Import a single workflow file."""
+        """Import a single workflow file (categories are left to the caller)."""
         try:
             # Validate first
             if not self.validate_workflow(file_path):
@@ -64,39 +114,13 @@ class WorkflowImporter:
                 return False
             
             # Run n8n import command
-            result = subprocess.run([
-                'npx', 'n8n', 'import:workflow', 
+            result = subprocess.run(self.command + [
+                'import:workflow', 
                 f'--input={file_path}'
             ], capture_output=True, text=True, timeout=30)
             
             if result.returncode == 0:
                 print(f"✅ Imported: {file_path.name}")
-                
-                # Categorize the workflow and update search_categories.json
-                suggested_category = categorize_by_filename(file_path.name)
-                
-                all_workflows_data = load_categories()
-                
-                found = False
-                for workflow_entry in all_workflows_data:
-                    if workflow_entry.get('filename') == file_path.name:
-                        workflow_entry['category'] = suggested_category
-                        found = True
-                        break
-                
-                if not found:
-                    # Add new workflow entry if not found (e.g., first import)
-                    all_workflows_data.append({
-                        "filename": file_path.name,
-                        "category": suggested_category,
-                        "name": file_path.stem, # Assuming workflow name is filename without extension
-                        "description": "", # Placeholder, can be updated manually
-                        "nodes": [] # Placeholder, can be updated manually
-                    })
-                
-                save_categories(all_workflows_data)
-                print(f"  Categorized '{file_path.name}' as '{suggested_category or 'Uncategorized'}'")
-                
                 return True
             else:
                 error_msg = result.stderr.strip() or result.stdout.strip()
@@ -113,6 +137,41 @@ class WorkflowImporter:
             print(f"❌ Error: {file_path.name} - {str(e)}")
             return False
 
+    def run_import(self, files: List[Path]) -> Optional[str]:
+        """One n8n run over a staging directory holding files; None on success, else the error."""
+        with tempfile.TemporaryDirectory(prefix="n8n-import-") as staging:
+            for file_path in files:
+                shutil.copyfile(file_path, os.path.join(staging, file_path.name))
+            try:
+                result = subprocess.run(self.command + [
+                    'import:workflow', '--separate',
+                    f'--input={staging}'
+                ], capture_output=True, text=True,
+                   timeout=self.CHUNK_TIMEOUT_BASE + self.CHUNK_TIMEOUT_PER_FILE * len(files))
+            except subprocess.TimeoutExpired:
+                return "timeout"
+            except OSError as e:
+                return str(e)
+        if result.returncode != 0:
+            return result.stderr.strip() or result.stdout.strip() or f"exit code {result.returncode}"
+        return None
+
+    def import_chunk(self, files: List[Path]) -> Tuple[List[Path], List[Tuple[Path, str]]]:
+        """Import files in one run; if it fails, bisect so only the bad workflows fail.
+        
+        Returns (imported files, [(failed file, error)]). A failing chunk of n
+        files with one bad workflow costs about 2*log2(n) more runs.
+        """
+        error = self.run_import(files)
+        if error is None:
+            return files, []
+        if len(files) == 1:
+            return [], [(files[0], error)]
+        middle = len(files) // 2
+        imported, failed = self.import_chunk(files[:middle])
+        more_imported, more_failed = self.import_chunk(files[middle:])
+        return imported + more_imported, failed + more_failed
+
     def get_workflow_files(self) -> List[Path]:
         """Get all workflow JSON files."""
         if not self.workflows_dir.exists():
@@ -127,24 +186,44 @@ class WorkflowImporter:
         return sorted(json_files)
 
     def import_all(self) -> Dict[str, Any]:
-        """Import all workflow files."""
+        """Import all workflow files in chunks, then update categories once."""
         workflow_files = self.get_workflow_files()
         total_files = len(workflow_files)
         
         if total_files == 0:
             return {"success": False, "message": "No workflow files found"}
         
-        print(f"🚀 Starting import of {total_files} workflows...")
-        print("-" * 50)
-        
-        for i, file_path in enumerate(workflow_files, 1):
-            print(f"[{i}/{total_files}] Processing {file_path.name}...")
-            
-            if self.import_workflow(file_path):
-                self.imported_count += 1
+        # Validate up front; only valid files are staged
+        valid_files = []
+        for file_path in workflow_files:
+            if self.validate_workflow(file_path):
+                valid_files.append(file_path)
             else:
+                self.errors.append(f"Invalid JSON: {file_path.name}")
                 self.failed_count += 1
         
+        chunks = [valid_files[i:i + self.chunk_size] for i in range(0, len(valid_files), self.chunk_size)]
+        print(f"🚀 Starting import of {total_files} workflows "
+              f"({len(chunks)} chunks of up to {self.chunk_size}, {self.jobs} in parallel)...")
+        print("-" * 50)
+        
+        imported_files = []
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = [executor.submit(self.import_chunk, chunk) for chunk in chunks]
+            for i, future in enumerate(futures, 1):
+                imported, failed = future.result()
+                imported_files.extend(imported)
+                print(f"{'✅' if not failed else '⚠️'} [{i}/{len(chunks)}] Imported {len(imported)} workflows"
+                      + (f", {len(failed)} failed" if failed else ""))
+                for file_path, error in failed:
+                    self.errors.append(f"Import failed for {file_path.name}: {error}")
+                    self.failed_count += 1
+        self.imported_count = len(imported_files)
+        
+        if imported_files:
+            update_categories([file_path.name for file_path in imported_files])
+            print(f"🏷️ Categorized {len(imported_files)} workflows in search_categories.json")
+        
         # Summary
         print("\n" + "=" * 50)
         print(f"📊 Import Summary:")
@@ -168,11 +247,11 @@ class WorkflowImporter:
         }
 
 
-def check_n8n_available() -> bool:
+def check_n8n_available(command: Optional[List[str]] = None) -> bool:
     """Check if n8n CLI is available."""
     try:
         result = subprocess.run(
-            ['npx', 'n8n', '--version'], 
+            (command or n8n_command()) + ['--version'], 
             capture_output=True, text=True, timeout=10
         )
         return result.returncode == 0
@@ -183,17 +262,25 @@ def check_n8n_available() -> bool:
 def main():
     """Main entry point."""
     sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Import workflows into n8n in batches")
+    parser.add_argument("--workflows-dir", default="workflows", help="Directory of workflow JSON files")
+    parser.add_argument("--chunk-size", type=int, default=100, help="Workflows per n8n import run (default: 100)")
+    parser.add_argument("--jobs", type=int, default=2, help="Import runs in parallel (default: 2)")
+    parser.add_argument("--n8n", default=None, help="n8n command (default: $N8N_COMMAND or 'npx n8n')")
+    args = parser.parse_args()
+    command = shlex.split(args.n8n) if args.n8n else n8n_command()
+    
     print("🔧 N8N Workflow Importer")
     print("=" * 40)
     
     # Check if n8n is available
-    if not check_n8n_available():
+    if not check_n8n_available(command):
         print("❌ n8n CLI not found. Please install n8n first:")
         print("   npm install -g n8n")
         sys.exit(1)
     
     # Create importer and run
-    importer = WorkflowImporter()
+    importer = WorkflowImporter(args.workflows_dir, chunk_size=args.chunk_size, jobs=args.jobs, command=command)
     result = importer.import_all()
     
     # Exit with appropriate code
@@ -201,4 +288,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main() 
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Metrics Registry
+Process-wide counters for the API and indexer, rendered in the
+Prometheus text exposition format (version 0.0.4) for GET /metrics.
+
+Collected here:
+  - DB query durations by query name   (QUERY_METRICS, @QUERY_METRICS.timed)
+  - SQLite connection stats            (CONNECTION_METRICS, via connect())
+  - cache hit/miss counts and sizes    (CACHE_METRICS)
+  - indexing throughput                (INDEX_METRICS, from index_all_workflows)
+Request latency comes from request_metrics.REQUEST_METRICS.
+
+Recording is lock-free: every update is a plain attribute or dict update
+on the recording thread. A scrape copies the histograms it renders, so it
+never blocks request handling; at worst a scrape sees a sample that is a
+few observations behind.
+"""
+
+import contextvars
+import functools
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from request_metrics import REQUEST_METRICS, LatencyHistogram, RequestMetrics
+
+# Prometheus histogram bucket boundaries in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Name of the timed operation currently running, so lower layers (query_profiler) can attribute SQL
+CURRENT_QUERY: contextvars.ContextVar = contextvars.ContextVar('current_query', default=None)
+
+
+class TimingRegistry:
+    """Named latency histograms, e.g. one per DB query."""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+
+    def observe(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.record(seconds)
+
+    @contextmanager
+    def time(self, name: str):
+        token = CURRENT_QUERY.set(name)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start)
+            CURRENT_QUERY.reset(token)
+
+    def timed(self, name: str) -> Callable:
+        """Decorator timing every call of a function under `name`."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, LatencyHistogram]:
+        return {name: histogram.copy() for name, histogram in list(self.histograms.items())}
+
+
+class CacheStats:
+    """Hit/miss counters and entry counts per named cache."""
+
+    def __init__(self):
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.sizes: Dict[str, int] = {}
+
+    def hit(self, name: str):
+        self.hits[name] = self.hits.get(name, 0) + 1
+
+    def miss(self, name: str):
+        self.misses[name] = self.misses.get(name, 0) + 1
+
+    def set_size(self, name: str, entries: int):
+        self.sizes[name] = entries
+
+    def ratio(self, name: str) -> float:
+        hits = self.hits.get(name, 0)
+        total = hits + self.misses.get(name, 0)
+        return hits / total if total else 0.0
+
+    def names(self) -> List[str]:
+        return sorted(set(self.hits) | set(self.misses) | set(self.sizes))
+
+
+class ConnectionStats:
+    """SQLite connections opened through connect() and how many are still open."""
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+
+    @property
+    def open(self) -> int:
+        return self.opened - self.closed
+
+
+class IndexStats:
+    """Throughput of the most recent indexing run plus running totals."""
+
+    def __init__(self):
+        self.runs = 0
+        self.files_total = 0
+        self.bytes_total = 0
+        self.last = {'files': 0, 'bytes': 0, 'processed': 0, 'skipped': 0, 'errors': 0,
+                     'duration_seconds': 0.0, 'finished_at': 0.0}
+
+    def record_run(self, files: int, bytes_read: int, processed: int, skipped: int,
+                   errors: int, seconds: float):
+        self.runs += 1
+        self.files_total += files
+        self.bytes_total += bytes_read
+        self.last = {'files': files, 'bytes': bytes_read, 'processed': processed,
+                     'skipped': skipped, 'errors': errors, 'duration_seconds': seconds,
+                     'finished_at': time.time()}
+
+    def throughput(self) -> Tuple[float, float]:
+        """(files/sec, bytes/sec) of the last run."""
+        seconds = self.last['duration_seconds']
+        if not seconds:
+            return 0.0, 0.0
+        return self.last['files'] / seconds, self.last['bytes'] / seconds
+
+
+QUERY_METRICS = TimingRegistry()
+CACHE_METRICS = CacheStats()
+CONNECTION_METRICS = ConnectionStats()
+INDEX_METRICS = IndexStats()
+
+
+class TrackedConnection(sqlite3.Connection):
+    """sqlite3 connection that reports its close() to CONNECTION_METRICS.
+
+    A connection dropped without close() (e.g. on an exception path) is
+    closed by sqlite3 when it is garbage collected and counted then, so the
+    open gauge follows connection lifetimes instead of drifting upward.
+    """
+
+    _closed_counted = False
+
+    def _count_closed(self):
+        if not self._closed_counted:
+            self._closed_counted = True
+            CONNECTION_METRICS.closed += 1
+
+    def close(self):
+        self._count_closed()
+        super().close()
+
+    def __del__(self):
+        self._count_closed()
+
+
+_connection_factory = TrackedConnection
+
+
+def set_connection_factory(factory):
+    """Connection class used by connect() from now on (query_profiler swaps in its own)."""
+    global _connection_factory
+    _connection_factory = factory
+
+
+def connect(db_path: str, **kwargs) -> sqlite3.Connection:
+    """sqlite3.connect() that is counted in CONNECTION_METRICS."""
+    kwargs.setdefault('factory', _connection_factory)
+    conn = sqlite3.connect(db_path, **kwargs)
+    CONNECTION_METRICS.opened += 1
+    return conn
+
+
+# --- Exposition ------------------------------------------------------------
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class Exposition:
+    """Accumulates metric families in text format."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, metric_type: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {metric_type}")
+
+    def sample(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        self.lines.append(f"{name}{_labels(labels or {})} {_number(value)}")
+
+    def histogram(self, name: str, histogram: LatencyHistogram, labels: Dict[str, Any],
+                  buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Fold the fine-grained latency buckets into cumulative Prometheus buckets."""
+        cumulative = [0] * len(buckets)
+        for upper_us, count in histogram.buckets():
+            upper_seconds = upper_us / 1_000_000
+            for i, bound in enumerate(buckets):
+                if upper_seconds <= bound:
+                    cumulative[i] += count
+                    break
+        running = 0
+        for bound, count in zip(buckets, cumulative):
+            running += count
+            self.sample(f"{name}_bucket", running, {**labels, 'le': _number(bound)})
+        self.sample(f"{name}_bucket", histogram.total, {**labels, 'le': '+Inf'})
+        self.sample(f"{name}_sum", histogram.sum_us / 1_000_000, labels)
+        self.sample(f"{name}_count", histogram.total, labels)
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics(request_metrics: Optional[RequestMetrics] = None,
+                   corpus: Optional[Dict[str, int]] = None) -> str:
+    """Render every registry in Prometheus text format.
+
+    corpus holds gauges describing the indexed corpus, e.g.
+    {'workflows': 2053, 'bytes': 88_000_000, 'nodes': 29000}.
+    """
+    request_metrics = request_metrics or REQUEST_METRICS
+    out = Exposition()
+
+    # HTTP requests
+    routes = {route: stats.copy() for route, stats in list(request_metrics.routes.items())}
+    out.family("n8n_http_request_duration_seconds", "histogram", "HTTP request latency by route")
+    for route, stats in sorted(routes.items()):
+        method, _, path = route.partition(" ")
+        out.histogram("n8n_http_request_duration_seconds", stats.histogram, {'method': method, 'route': path})
+    out.family("n8n_http_requests_total", "counter", "HTTP requests by route and status")
+    for route, stats in sorted(routes.items()):
+        method, _, path = route.partition(" ")
+        for status, count in sorted(stats.statuses.items()):
+            out.sample("n8n_http_requests_total", count, {'method': method, 'route': path, 'status': status})
+    out.family("n8n_http_requests_in_flight", "gauge", "HTTP requests currently being served")
+    out.sample("n8n_http_requests_in_flight", request_metrics.in_flight)
+
+    # Database
+    out.family("n8n_db_query_duration_seconds", "histogram", "Database query latency by query name")
+    queries = QUERY_METRICS.snapshot()
+    for name, histogram in sorted(queries.items()):
+        out.histogram("n8n_db_query_duration_seconds", histogram, {'query': name})
+    out.family("n8n_db_query_errors_total", "counter", "Database queries that raised, by query name")
+    for name, count in sorted(QUERY_METRICS.errors.items()):
+        out.sample("n8n_db_query_errors_total", count, {'query': name})
+    out.family("n8n_db_connections_opened_total", "counter", "SQLite connections opened")
+    out.sample("n8n_db_connections_opened_total", CONNECTION_METRICS.opened)
+    out.family("n8n_db_connections_open", "gauge", "SQLite connections currently open")
+    out.sample("n8n_db_connections_open", CONNECTION_METRICS.open)
+
+    # Caches
+    names = CACHE_METRICS.names()
+    out.family("n8n_cache_hits_total", "counter", "Cache hits by cache")
+    for name in names:
+        out.sample("n8n_cache_hits_total", CACHE_METRICS.hits.get(name, 0), {'cache': name})
+    out.family("n8n_cache_misses_total", "counter", "Cache misses by cache")
+    for name in names:
+        out.sample("n8n_cache_misses_total", CACHE_METRICS.misses.get(name, 0), {'cache': name})
+    out.family("n8n_cache_hit_ratio", "gauge", "Cache hit ratio since process start")
+    for name in names:
+        out.sample("n8n_cache_hit_ratio", round(CACHE_METRICS.ratio(name), 6), {'cache': name})
+    out.family("n8n_cache_entries", "gauge", "Entries currently held by a cache")
+    for name in names:
+        if name in CACHE_METRICS.sizes:
+            out.sample("n8n_cache_entries", CACHE_METRICS.sizes[name], {'cache': name})
+
+    # Indexing
+    last = INDEX_METRICS.last
+    files_per_second, bytes_per_second = INDEX_METRICS.throughput()
+    out.family("n8n_index_runs_total", "counter", "Completed indexing runs")
+    out.sample("n8n_index_runs_total", INDEX_METRICS.runs)
+    out.family("n8n_index_files_total", "counter", "Workflow files examined by indexing runs")
+    out.sample("n8n_index_files_total", INDEX_METRICS.files_total)
+    out.family("n8n_index_bytes_total", "counter", "Workflow bytes examined by indexing runs")
+    out.sample("n8n_index_bytes_total", INDEX_METRICS.bytes_total)
+    out.family("n8n_index_last_duration_seconds", "gauge", "Duration of the last indexing run")
+    out.sample("n8n_index_last_duration_seconds", round(last['duration_seconds'], 6))
+    out.family("n8n_index_last_files_per_second", "gauge", "Files per second in the last indexing run")
+    out.sample("n8n_index_last_files_per_second", round(files_per_second, 3))
+    out.family("n8n_index_last_bytes_per_second", "gauge", "Bytes per second in the last indexing run")
+    out.sample("n8n_index_last_bytes_per_second", round(bytes_per_second, 3))
+    out.family("n8n_index_last_files", "gauge", "Files in the last indexing run by outcome")
+    for outcome in ('processed', 'skipped', 'errors'):
+        out.sample("n8n_index_last_files", last[outcome], {'outcome': outcome})
+    out.family("n8n_index_last_finished_timestamp_seconds", "gauge", "Unix time the last indexing run finished")
+    out.sample("n8n_index_last_finished_timestamp_seconds", round(last['finished_at'], 3))
+
+    # Corpus
+    if corpus:
+        for key, value in sorted(corpus.items()):
+            out.family(f"n8n_corpus_{key}", "gauge", f"Indexed corpus size: {key}")
+            out.sample(f"n8n_corpus_{key}", value or 0)
+
+    return out.render()
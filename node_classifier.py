@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Node Classifier
+Trigger type and integrations of a workflow, from its nodes' types and names.
+
+Indexing classifies every node of every file, so the rules are compiled
+once at import instead of being re-evaluated per node:
+  - a node type's trigger kind and type-derived service are memoized;
+  - the name hints (any SERVICE_MAPPINGS key contained in the node name)
+    are screened by one precompiled trie-shaped regex, so only names that
+    contain a key are scanned, and each distinct name is resolved once.
+
+The rules themselves are those of the original per-node loop, kept below
+as reference_analyze_nodes; `python node_classifier.py --verify` checks
+both agree on every workflow in the corpus.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Node type (lowercased, without package prefix or 'trigger') -> integration name;
+# None marks utility nodes that are not integrations
+SERVICE_MAPPINGS: Dict[str, Optional[str]] = {
+    # Messaging & Communication
+    'telegram': 'Telegram',
+    'telegramTrigger': 'Telegram',
+    'discord': 'Discord',
+    'slack': 'Slack', 
+    'whatsapp': 'WhatsApp',
+    'mattermost': 'Mattermost',
+    'teams': 'Microsoft Teams',
+    'rocketchat': 'Rocket.Chat',
+    
+    # Email
+    'gmail': 'Gmail',
+    'mailjet': 'Mailjet',
+    'emailreadimap': 'Email (IMAP)',
+    'emailsendsmt': 'Email (SMTP)',
+    'outlook': 'Outlook',
+    
+    # Cloud Storage
+    'googledrive': 'Google Drive',
+    'googledocs': 'Google Docs',
+    'googlesheets': 'Google Sheets',
+    'dropbox': 'Dropbox',
+    'onedrive': 'OneDrive',
+    'box': 'Box',
+    
+    # Databases
+    'postgres': 'PostgreSQL',
+    'mysql': 'MySQL',
+    'mongodb': 'MongoDB',
+    'redis': 'Redis',
+    'airtable': 'Airtable',
+    'notion': 'Notion',
+    
+    # Project Management
+    'jira': 'Jira',
+    'github': 'GitHub',
+    'gitlab': 'GitLab',
+    'trello': 'Trello',
+    'asana': 'Asana',
+    'mondaycom': 'Monday.com',
+    
+    # AI/ML Services
+    'openai': 'OpenAI',
+    'anthropic': 'Anthropic',
+    'huggingface': 'Hugging Face',
+    
+    # Social Media
+    'linkedin': 'LinkedIn',
+    'twitter': 'Twitter/X',
+    'facebook': 'Facebook',
+    'instagram': 'Instagram',
+    
+    # E-commerce
+    'shopify': 'Shopify',
+    'stripe': 'Stripe',
+    'paypal': 'PayPal',
+    
+    # Analytics
+    'googleanalytics': 'Google Analytics',
+    'mixpanel': 'Mixpanel',
+    
+    # Calendar & Tasks
+    'googlecalendar': 'Google Calendar', 
+    'googletasks': 'Google Tasks',
+    'cal': 'Cal.com',
+    'calendly': 'Calendly',
+    
+    # Forms & Surveys
+    'typeform': 'Typeform',
+    'googleforms': 'Google Forms',
+    'form': 'Form Trigger',
+    
+    # Development Tools
+    'webhook': 'Webhook',
+    'httpRequest': 'HTTP Request',
+    'graphql': 'GraphQL',
+    'sse': 'Server-Sent Events',
+    
+    # Utility nodes (exclude from integrations)
+    'set': None,
+    'function': None,
+    'code': None,
+    'if': None,
+    'switch': None,
+    'merge': None,
+    'split': None,
+    'stickynote': None,
+    'stickyNote': None,
+    'wait': None,
+    'schedule': None,
+    'cron': None,
+    'manual': None,
+    'stopanderror': None,
+    'noop': None,
+    'noOp': None,
+    'error': None,
+    'limit': None,
+    'aggregate': None,
+    'summarize': None,
+    'filter': None,
+    'sort': None,
+    'removeDuplicates': None,
+    'dateTime': None,
+    'extractFromFile': None,
+    'convertToFile': None,
+    'readBinaryFile': None,
+    'readBinaryFiles': None,
+    'executionData': None,
+    'executeWorkflow': None,
+    'executeCommand': None,
+    'respondToWebhook': None,
+}
+
+# Custom (community) node packages recognised by a substring of the type
+CUSTOM_NODE_HINTS = (
+    ('youtube', 'YouTube'),
+    ('telegram', 'Telegram'),
+    ('discord', 'Discord'),
+    ('calcslive', 'CalcsLive'),
+)
+
+# Trigger kinds of a node type
+WEBHOOK, SCHEDULED, TRIGGER = 'webhook', 'scheduled', 'trigger'
+
+MAX_CACHED_NAMES = 50000
+
+
+def _service_from_type(node_type: str) -> Optional[str]:
+    """Integration named by the node type alone (before name hints)."""
+    # Handle n8n-nodes-base nodes
+    if node_type.startswith('n8n-nodes-base.'):
+        raw_service = node_type.replace('n8n-nodes-base.', '').lower().replace('trigger', '')
+        return SERVICE_MAPPINGS.get(raw_service, raw_service.title() if raw_service else None)
+    # Handle @n8n/ namespaced nodes
+    if node_type.startswith('@n8n/'):
+        raw_service = node_type.split('.')[-1].lower() if '.' in node_type else node_type.lower()
+        raw_service = raw_service.replace('trigger', '')
+        return SERVICE_MAPPINGS.get(raw_service, raw_service.title() if raw_service else None)
+    # Handle custom nodes like "n8n-nodes-youtube-transcription-kasha.youtubeTranscripter"
+    if '-' in node_type or '@' in node_type:
+        for part in node_type.lower().split('.'):
+            for needle, service in CUSTOM_NODE_HINTS:
+                if needle in part:
+                    return service
+    return None
+
+
+def _trigger_kind(node_type: str) -> Optional[str]:
+    lowered = node_type.lower()
+    if 'webhook' in lowered:
+        return WEBHOOK
+    if 'cron' in lowered or 'schedule' in lowered:
+        return SCHEDULED
+    if 'trigger' in lowered and 'manual' not in lowered:
+        return TRIGGER
+    return None
+
+
+def trie_pattern(words: List[str]) -> re.Pattern:
+    """One regex matching any of the words, shaped as a trie (a(?:irtable|sana)...).
+
+    Literal alternatives are tried one after another by the re engine; in
+    trie form each position only follows the branch of its character.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return re.compile(build(trie))
+
+
+class NodeClassifier:
+    """Compiled form of the node classification rules."""
+
+    def __init__(self, mappings: Dict[str, Optional[str]] = SERVICE_MAPPINGS):
+        # Only keys that can match a lowercased name and map to a service produce hints
+        self.hints: List[Tuple[str, str]] = [(key, value) for key, value in mappings.items()
+                                             if value and key == key.lower()]
+        self.hint_pattern = trie_pattern([key for key, _ in self.hints])
+        self.types: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self.names: Dict[str, Optional[str]] = {}
+
+    def classify_type(self, node_type: str) -> Tuple[Optional[str], Optional[str]]:
+        """(trigger kind, service) of a node type, memoized."""
+        classified = self.types.get(node_type)
+        if classified is None:
+            classified = self.types[node_type] = (_trigger_kind(node_type), _service_from_type(node_type))
+        return classified
+
+    def name_hint(self, node_name: str) -> Optional[str]:
+        """Service named in a (lowercased) node name, if any; the first key in mapping order wins."""
+        if node_name in self.names:
+            return self.names[node_name]
+        hint = None
+        # Most names contain no key at all; one regex search rules them out
+        if self.hint_pattern.search(node_name):
+            for key, value in self.hints:
+                # "cal" (Cal.com) is not a hint in calculation-related names
+                if key in node_name and not (key == 'cal' and 'calc' in node_name):
+                    hint = value
+                    break
+        if len(self.names) < MAX_CACHED_NAMES:
+            self.names[node_name] = hint
+        return hint
+
+    def analyze(self, nodes: List[Dict]) -> Tuple[str, Set[str]]:
+        """Trigger type and integrations of a workflow's nodes."""
+        trigger_type = 'Manual'
+        integrations = set()
+
+        for node in nodes:
+            trigger_kind, service_name = self.classify_type(node.get('type', ''))
+            node_name = node.get('name', '').lower()
+
+            # Determine trigger type
+            if trigger_kind == WEBHOOK or 'webhook' in node_name:
+                trigger_type = 'Webhook'
+            elif trigger_kind == SCHEDULED:
+                trigger_type = 'Scheduled'
+            elif trigger_kind == TRIGGER and trigger_type == 'Manual':
+                trigger_type = 'Webhook'
+
+            # Node names can name the service too (and win over the type)
+            service_name = self.name_hint(node_name) or service_name
+
+            # Add to integrations if valid service found
+            if service_name and service_name != 'None':
+                integrations.add(service_name)
+
+        # Determine if complex based on node variety and count
+        if len(nodes) > 10 and len(integrations) > 3:
+            trigger_type = 'Complex'
+
+        return trigger_type, integrations
+
+
+NODE_CLASSIFIER = NodeClassifier()
+
+
+def reference_analyze_nodes(nodes: List[Dict]) -> Tuple[str, set]:
+    """The original uncompiled rules, kept as the reference for --verify."""
+    trigger_type = 'Manual'
+    integrations = set()
+
+    for node in nodes:
+        node_type = node.get('type', '')
+        node_name = node.get('name', '').lower()
+
+        # Determine trigger type
+        if 'webhook' in node_type.lower() or 'webhook' in node_name:
+            trigger_type = 'Webhook'
+        elif 'cron' in node_type.lower() or 'schedule' in node_type.lower():
+            trigger_type = 'Scheduled'
+        elif 'trigger' in node_type.lower() and trigger_type == 'Manual':
+            if 'manual' not in node_type.lower():
+                trigger_type = 'Webhook'
+
+        # Extract integrations with enhanced mapping
+        service_name = None
+
+        # Handle n8n-nodes-base nodes
+        if node_type.startswith('n8n-nodes-base.'):
+            raw_service = node_type.replace('n8n-nodes-base.', '').lower()
+            raw_service = raw_service.replace('trigger', '')
+            service_name = SERVICE_MAPPINGS.get(raw_service, raw_service.title() if raw_service else None)
+
+        # Handle @n8n/ namespaced nodes
+        elif node_type.startswith('@n8n/'):
+            raw_service = node_type.split('.')[-1].lower() if '.' in node_type else node_type.lower()
+            raw_service = raw_service.replace('trigger', '')
+            service_name = SERVICE_MAPPINGS.get(raw_service, raw_service.title() if raw_service else None)
+
+        # Handle custom nodes
+        elif '-' in node_type or '@' in node_type:
+            parts = node_type.lower().split('.')
+            for part in parts:
+                if 'youtube' in part:
+                    service_name = 'YouTube'
+                    break
+                elif 'telegram' in part:
+                    service_name = 'Telegram'
+                    break
+                elif 'discord' in part:
+                    service_name = 'Discord'
+                    break
+                elif 'calcslive' in part:
+                    service_name = 'CalcsLive'
+                    break
+
+        # Also check node names for service hints (but avoid false positives)
+        for service_key, service_value in SERVICE_MAPPINGS.items():
+            if service_key in node_name and service_value:
+                # Avoid false positive: "cal" in calcslive-related terms should not match "Cal.com"
+                if service_key == 'cal' and any(term in node_name.lower() for term in ['calcslive', 'calc', 'calculation']):
+                    continue
+                service_name = service_value
+                break
+
+        # Add to integrations if valid service found
+        if service_name and service_name not in ['None', None]:
+            integrations.add(service_name)
+
+    # Determine if complex based on node variety and count
+    if len(nodes) > 10 and len(integrations) > 3:
+        trigger_type = 'Complex'
+
+    return trigger_type, integrations
+
+
+def verify(workflows_dir: str) -> int:
+    """Compare the compiled classifier with the reference on every workflow file."""
+    corpus = []
+    for path in sorted(Path(workflows_dir).rglob('*.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+            continue
+        nodes = data.get('nodes') if isinstance(data, dict) else None
+        if isinstance(nodes, list):
+            corpus.append((path, nodes))
+    if not corpus:
+        print(f"❌ No workflows found in {workflows_dir}")
+        return 1
+
+    mismatches = 0
+    for path, nodes in corpus:
+        expected, actual = reference_analyze_nodes(nodes), NODE_CLASSIFIER.analyze(nodes)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"❌ {path}: expected {expected}, got {actual}")
+
+    # A fresh classifier, so its memo tables fill up during the timed pass as in real indexing
+    timings = {}
+    for label, analyze in (('reference', reference_analyze_nodes), ('compiled', NodeClassifier().analyze)):
+        start = time.perf_counter()
+        for _, nodes in corpus:
+            analyze(nodes)
+        timings[label] = time.perf_counter() - start
+
+    node_total = sum(len(nodes) for _, nodes in corpus)
+    print(f"📊 {len(corpus)} workflows, {node_total} nodes")
+    print(f"   reference: {timings['reference'] * 1000:.1f} ms, compiled: {timings['compiled'] * 1000:.1f} ms "
+          f"({timings['reference'] / max(timings['compiled'], 1e-9):.1f}x)")
+    if mismatches:
+        print(f"❌ {mismatches} workflows classified differently")
+        return 1
+    print("✅ Compiled classifier matches the reference on every workflow")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="N8N workflow node classifier")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check the compiled classifier against the reference rules over a corpus")
+    parser.add_argument("--workflows-dir", default="workflows", help="Corpus for --verify")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(verify(args.workflows_dir))
+    parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
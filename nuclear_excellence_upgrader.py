@@ -18,6 +18,14 @@ import concurrent.futures
 import threading
 from dataclasses import dataclass
 
+from backup_store import BackupStore, DEFAULT_STORE_DIR
+from security_scanner import SecretScanner, KIND_HARDCODED_URL, URL_PLACEHOLDERS
+
+QUALITY_SCANNER = SecretScanner(
+    url_placeholders=URL_PLACEHOLDERS + ['example.com'],
+    token_value_rule='sensitive'
+)
+
 @dataclass
 class WorkflowQuality:
     """Quality metrics for a workflow"""
@@ -31,16 +39,15 @@ class WorkflowQuality:
 class NuclearExcellenceUpgrader:
     """NUCLEAR-LEVEL upgrader - ABSOLUTELY NO MERCY!"""
     
-    def __init__(self, workflows_dir="C:\\Users\\sahii\\OneDrive\\Saved Games\\Microsoft Edge Drop Files\\Documents\\Cline\\n8n-workflows\\workflows", backup_dir="workflows_backup", max_workers=8):
+    def __init__(self, workflows_dir="C:\\Users\\sahii\\OneDrive\\Saved Games\\Microsoft Edge Drop Files\\Documents\\Cline\\n8n-workflows\\workflows", backup_dir=DEFAULT_STORE_DIR, max_workers=8):
         self.workflows_dir = Path(workflows_dir)
         self.backup_dir = Path(backup_dir)
+        self.backup_store = BackupStore(backup_dir)
+        self.backup_run = None
         self.max_workers = max_workers
         self.upgrade_stats = defaultdict(int)
         self.quality_metrics = defaultdict(list)
         self.thread_lock = threading.Lock()
-        
-        # Create backup directory
-        self.backup_dir.mkdir(exist_ok=True)
     
     def calculate_workflow_quality(self, workflow_data: Dict) -> WorkflowQuality:
         """Calculate comprehensive quality score for workflow"""
@@ -53,15 +60,15 @@ class NuclearExcellenceUpgrader:
         # Base score
         score = 100.0
         
+        hardcoded_urls, sensitive_data = self.scan_security(workflow_data)
+        
         # Check for hardcoded URLs (deduct 15 points)
-        hardcoded_urls = self.find_hardcoded_urls(workflow_data)
         if hardcoded_urls:
             score -= 15
             issues.append(f"Hardcoded URLs found: {len(hardcoded_urls)}")
             recommendations.append("Replace hardcoded URLs with environment variables")
         
         # Check for sensitive data (deduct 20 points)
-        sensitive_data = self.find_sensitive_data(workflow_data)
         if sensitive_data:
             score -= 20
             issues.append(f"Sensitive data found: {len(sensitive_data)}")
@@ -201,51 +208,24 @@ class NuclearExcellenceUpgrader:
             complexity=complexity
         )
     
-    def find_hardcoded_urls(self, data: Any, path: str = "") -> List[str]:
-        """Find hardcoded URLs in workflow data"""
+    def scan_security(self, data: Any) -> Tuple[List[str], List[str]]:
+        """Find hardcoded URLs and sensitive data in a single pass"""
         urls = []
-        
-        if isinstance(data, dict):
-            for key, value in data.items():
-                current_path = f"{path}.{key}" if path else key
-                urls.extend(self.find_hardcoded_urls(value, current_path))
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                urls.extend(self.find_hardcoded_urls(item, f"{path}[{i}]"))
-        elif isinstance(data, str):
-            url_pattern = r'https?://[^\s<>"\'{}|\\^`\[\]]+'
-            matches = re.findall(url_pattern, data)
-            for match in matches:
-                if not any(placeholder in data for placeholder in ['{{', '${', 'YOUR_', 'PLACEHOLDER', 'example.com']):
-                    urls.append(f"{path}: {match}")
-        
-        return urls
-    
-    def find_sensitive_data(self, data: Any, path: str = "") -> List[str]:
-        """Find sensitive data patterns"""
         sensitive_locations = []
-        sensitive_patterns = [
-            r'password', r'token', r'key', r'secret', r'credential',
-            r'api_key', r'access_token', r'refresh_token', r'bearer'
-        ]
-        
-        if isinstance(data, dict):
-            for key, value in data.items():
-                current_path = f"{path}.{key}" if path else key
-                
-                if any(pattern in key.lower() for pattern in sensitive_patterns):
-                    if value and str(value).strip() and value != "":
-                        sensitive_locations.append(f"{current_path}: {str(value)[:50]}...")
-                
-                sensitive_locations.extend(self.find_sensitive_data(value, current_path))
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                sensitive_locations.extend(self.find_sensitive_data(item, f"{path}[{i}]"))
-        elif isinstance(data, str):
-            if re.search(r'[A-Za-z0-9]{20,}', data) and any(pattern in path.lower() for pattern in sensitive_patterns):
-                sensitive_locations.append(f"{path}: {data[:50]}...")
-        
-        return sensitive_locations
+        for finding in QUALITY_SCANNER.scan(data):
+            if finding.kind == KIND_HARDCODED_URL:
+                urls.append(f"{finding.path}: {finding.match}")
+            else:
+                sensitive_locations.append(f"{finding.path}: {finding.preview()}...")
+        return urls, sensitive_locations
+    
+    def find_hardcoded_urls(self, data: Any) -> List[str]:
+        """Find hardcoded URLs in workflow data"""
+        return self.scan_security(data)[0]
+    
+    def find_sensitive_data(self, data: Any) -> List[str]:
+        """Find sensitive keys and token-like values under sensitive keys"""
+        return self.scan_security(data)[1]
     
     def has_error_handling(self, workflow_data: Dict) -> bool:
         """Check if workflow has error handling"""
@@ -826,6 +806,10 @@ class NuclearExcellenceUpgrader:
                     complexity=final_quality.complexity
                 )
             
+            # Back up the original content before overwriting it
+            if self.backup_run:
+                self.backup_run.add_file(workflow_path)
+            
             # Save upgraded workflow
             with open(workflow_path, 'w', encoding='utf-8') as f:
                 json.dump(workflow_data, f, indent=2, ensure_ascii=False)
@@ -873,33 +857,36 @@ class NuclearExcellenceUpgrader:
         
         print(f"💥 Found {len(workflow_files)} workflows to NUCLEAR-UPGRADE to excellence")
         
-        # Process workflows in parallel
-        upgrade_results = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_workflow = {
-                executor.submit(self.upgrade_single_workflow, workflow_file): workflow_file 
-                for workflow_file in workflow_files
-            }
+        with self.backup_store.begin_run('nuclear_excellence', self.workflows_dir) as self.backup_run:
+            # Process workflows in parallel
+            upgrade_results = []
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                future_to_workflow = {
+                    executor.submit(self.upgrade_single_workflow, workflow_file): workflow_file 
+                    for workflow_file in workflow_files
+                }
             
-            completed = 0
-            for future in concurrent.futures.as_completed(future_to_workflow):
-                workflow_file = future_to_workflow[future]
-                try:
-                    result = future.result()
-                    upgrade_results.append(result)
-                    completed += 1
+                completed = 0
+                for future in concurrent.futures.as_completed(future_to_workflow):
+                    workflow_file = future_to_workflow[future]
+                    try:
+                        result = future.result()
+                        upgrade_results.append(result)
+                        completed += 1
                     
-                    if completed % 100 == 0:
-                        print(f"💥 NUCLEAR-UPGRADING {completed}/{len(workflow_files)} workflows to excellence...")
+                        if completed % 100 == 0:
+                            print(f"💥 NUCLEAR-UPGRADING {completed}/{len(workflow_files)} workflows to excellence...")
                         
-                except Exception as e:
-                    print(f"❌ Error processing {workflow_file.name}: {e}")
-                    upgrade_results.append({
-                        'filename': workflow_file.name,
-                        'category': workflow_file.parent.name,
-                        'error': str(e),
-                        'success': False
-                    })
+                    except Exception as e:
+                        print(f"❌ Error processing {workflow_file.name}: {e}")
+                        upgrade_results.append({
+                            'filename': workflow_file.name,
+                            'category': workflow_file.parent.name,
+                            'error': str(e),
+                            'success': False
+                        })
+        
+        print(f"📦 Originals backed up as run {self.backup_run.run_id} (restore: python backup_store.py restore {self.backup_run.run_id})")
         
         # Calculate final statistics
         successful_upgrades = sum(1 for r in upgrade_results if r.get('success', False))
@@ -7,9 +7,9 @@ Error-free, fast, and reliable operation
 import os
 import sys
 import time
-import sqlite3
 import json
 import hashlib
+import sqlite3
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
@@ -20,6 +20,8 @@ import uvicorn
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
+from metrics_registry import connect
+
 class OptimizedWorkflowServer:
     """Optimized server with error handling and performance optimization"""
     
@@ -57,7 +59,7 @@ class OptimizedWorkflowServer:
             return False
         
         # Optimize database for performance
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         # Enable WAL mode for better concurrency
@@ -108,7 +110,7 @@ class OptimizedWorkflowServer:
             
             try:
                 # Test database connection
-                conn = sqlite3.connect(self.db_path)
+                conn = connect(self.db_path)
                 cursor = conn.cursor()
                 
                 # Quick database test
@@ -151,7 +153,7 @@ class OptimizedWorkflowServer:
         async def get_stats():
             """Get optimized platform statistics"""
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = connect(self.db_path)
                 cursor = conn.cursor()
                 
                 # Get basic stats
@@ -213,7 +215,8 @@ class OptimizedWorkflowServer:
         ):
             """Get workflows with optimized search"""
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = connect(self.db_path)
+                conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
                 # Build optimized query
@@ -257,19 +260,20 @@ class OptimizedWorkflowServer:
                 workflows = []
                 for row in cursor.fetchall():
                     workflows.append({
-                        "id": row[0],
-                        "filename": row[1],
-                        "name": row[2],
-                        "workflow_id": row[3],
-                        "active": bool(row[4]),
-                        "description": row[5],
-                        "trigger_type": row[6],
-                        "complexity": row[7],
-                        "node_count": row[8],
-                        "integrations": json.loads(row[9]) if row[9] else [],
-                        "tags": json.loads(row[10]) if row[10] else [],
-                        "created_at": row[11],
-                        "updated_at": row[12]
+                        "id": row["id"],
+                        "filename": row["filename"],
+                        "name": row["name"],
+                        "workflow_id": row["workflow_id"],
+                        "active": bool(row["active"]),
+                        "description": row["description"],
+                        "trigger_type": row["trigger_type"],
+                        "complexity": row["complexity"],
+                        "node_count": row["node_count"],
+                        "integrations": json.loads(row["integrations"]) if row["integrations"] else [],
+                        "tags": json.loads(row["tags"]) if row["tags"] else [],
+                        "category": row["category"],
+                        "created_at": row["created_at"],
+                        "updated_at": row["updated_at"]
                     })
                 
                 # Get total count for pagination
@@ -305,7 +309,8 @@ class OptimizedWorkflowServer:
         async def get_workflow(filename: str):
             """Get specific workflow details"""
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = connect(self.db_path)
+                conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
                 cursor.execute("SELECT * FROM workflows WHERE filename = ?", (filename,))
@@ -317,22 +322,23 @@ class OptimizedWorkflowServer:
                 conn.close()
                 
                 return {
-                    "id": row[0],
-                    "filename": row[1],
-                    "name": row[2],
-                    "workflow_id": row[3],
-                    "active": bool(row[4]),
-                    "description": row[5],
-                    "trigger_type": row[6],
-                    "complexity": row[7],
-                    "node_count": row[8],
-                    "integrations": json.loads(row[9]) if row[9] else [],
-                    "tags": json.loads(row[10]) if row[10] else [],
-                    "created_at": row[11],
-                    "updated_at": row[12],
-                    "file_hash": row[13],
-                    "file_size": row[14],
-                    "analyzed_at": row[15]
+                    "id": row["id"],
+                    "filename": row["filename"],
+                    "name": row["name"],
+                    "workflow_id": row["workflow_id"],
+                    "active": bool(row["active"]),
+                    "description": row["description"],
+                    "trigger_type": row["trigger_type"],
+                    "complexity": row["complexity"],
+                    "node_count": row["node_count"],
+                    "integrations": json.loads(row["integrations"]) if row["integrations"] else [],
+                    "tags": json.loads(row["tags"]) if row["tags"] else [],
+                    "category": row["category"],
+                    "created_at": row["created_at"],
+                    "updated_at": row["updated_at"],
+                    "file_hash": row["file_hash"],
+                    "file_size": row["file_size"],
+                    "analyzed_at": row["analyzed_at"]
                 }
                 
             except HTTPException:
@@ -369,7 +375,7 @@ class OptimizedWorkflowServer:
         async def get_categories():
             """Get workflow categories"""
             try:
-                conn = sqlite3.connect(self.db_path)
+                conn = connect(self.db_path)
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -397,15 +403,34 @@ class OptimizedWorkflowServer:
         print(f"📚 Documentation: http://{host}:{port}/docs")
         print("⚡ Optimized for speed and reliability")
         
+        if workers > 1:
+            # uvicorn can only fork workers from an import string; each one rebuilds the app
+            os.environ['WORKFLOW_DB_PATH'] = self.db_path
+            uvicorn.run(
+                "optimized_server:create_app",
+                factory=True,
+                host=host,
+                port=port,
+                workers=workers,
+                log_level="info",
+                access_log=True
+            )
+            return
+        
         uvicorn.run(
             self.app,
             host=host,
             port=port,
-            workers=workers,
             log_level="info",
             access_log=True
         )
 
+
+def create_app() -> FastAPI:
+    """App factory for worker processes (see OptimizedWorkflowServer.run)."""
+    return OptimizedWorkflowServer(os.environ.get('WORKFLOW_DB_PATH', 'workflows.db')).app
+
+
 if __name__ == "__main__":
     server = OptimizedWorkflowServer()
     server.run()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Query Profiler
+Opt-in, statement-level profiling of every SQLite query made through
+metrics_registry.connect() (WorkflowDatabase and the src/ services).
+
+When enabled, connections are opened with ProfilingConnection, whose
+cursors time execute() plus every fetch, count the rows returned (or the
+rows changed, for writes) and report each finished statement to the
+profiler. Statements are grouped by their normalized SQL (whitespace
+collapsed, literals replaced by ?), so f-string LIMIT/OFFSET values do
+not split one query into thousands of entries.
+
+Statements slower than the threshold are written as JSON lines to a
+rotating slow-query log, together with their parameters, the
+QUERY_METRICS operation they ran under (e.g. "search_workflows") and
+their EXPLAIN QUERY PLAN, captured on the same connection.
+
+When disabled (the default) connect() hands out plain TrackedConnections
+and nothing here is on the query path.
+
+Configuration:
+  QUERY_PROFILING=1           enable at import time
+  SLOW_QUERY_MS=50            slow-query threshold in milliseconds
+  SLOW_QUERY_LOG=logs/slow_queries.log
+
+Usage:
+  python query_profiler.py                      # summarize the slow-query log
+  python query_profiler.py --top 20 --log path
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import defaultdict
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from metrics_registry import CURRENT_QUERY, TrackedConnection, set_connection_factory
+
+DEFAULT_SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', 'logs/slow_queries.log')
+DEFAULT_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_MS', '50'))
+MAX_STATEMENTS = 1000            # distinct normalized statements kept in memory
+MAX_LOGGED_SQL = 2000
+MAX_LOGGED_PARAM = 200
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and replace literals so equivalent statements share one key."""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class StatementStats:
+    """Accumulated timings for one normalized statement."""
+
+    __slots__ = ('sql', 'calls', 'total_seconds', 'max_seconds', 'rows', 'slow_calls',
+                 'operations', 'plan', 'last_seen')
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.slow_calls = 0
+        self.operations: Dict[str, int] = {}
+        self.plan: Optional[List[str]] = None
+        self.last_seen = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'sql': self.sql,
+            'calls': self.calls,
+            'total_ms': round(self.total_seconds * 1000, 3),
+            'mean_ms': round(self.total_seconds * 1000 / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_seconds * 1000, 3),
+            'rows': self.rows,
+            'rows_per_call': round(self.rows / self.calls, 1) if self.calls else 0.0,
+            'slow_calls': self.slow_calls,
+            'operations': dict(sorted(self.operations.items(), key=lambda item: -item[1])),
+            'plan': self.plan,
+        }
+
+
+class QueryProfiler:
+    """Per-statement timing aggregates plus a rotating slow-query log."""
+
+    ORDERINGS = {
+        'total': lambda s: s.total_seconds,
+        'mean': lambda s: s.total_seconds / s.calls if s.calls else 0.0,
+        'max': lambda s: s.max_seconds,
+        'calls': lambda s: s.calls,
+        'rows': lambda s: s.rows,
+    }
+
+    def __init__(self, threshold_ms: float = DEFAULT_THRESHOLD_MS,
+                 log_path: Optional[str] = DEFAULT_SLOW_QUERY_LOG,
+                 max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3):
+        self.enabled = False
+        self.threshold_ms = threshold_ms
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.statements: Dict[str, StatementStats] = {}
+        self.started_at = time.time()
+        self.slow_logged = 0
+        self._lock = threading.Lock()
+        self._logger: Optional[logging.Logger] = None
+
+    def enable(self, threshold_ms: Optional[float] = None):
+        """Profile connections opened from now on."""
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        self.enabled = True
+        set_connection_factory(ProfilingConnection)
+
+    def disable(self):
+        self.enabled = False
+        set_connection_factory(TrackedConnection)
+
+    def reset(self):
+        with self._lock:
+            self.statements = {}
+            self.started_at = time.time()
+            self.slow_logged = 0
+
+    def record(self, sql: str, params: Any, seconds: float, rows: int,
+               conn: Optional[sqlite3.Connection] = None):
+        """Account one finished statement; log and explain it if it was slow."""
+        key = normalize_sql(sql)
+        operation = CURRENT_QUERY.get() or 'adhoc'
+        slow = seconds * 1000 >= self.threshold_ms
+
+        with self._lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                if len(self.statements) >= MAX_STATEMENTS:
+                    key = '<other statements>'
+                    stats = self.statements.get(key)
+                if stats is None:
+                    stats = self.statements[key] = StatementStats(key)
+            stats.calls += 1
+            stats.total_seconds += seconds
+            stats.rows += rows
+            stats.last_seen = time.time()
+            if seconds > stats.max_seconds:
+                stats.max_seconds = seconds
+            stats.operations[operation] = stats.operations.get(operation, 0) + 1
+            if slow:
+                stats.slow_calls += 1
+            needs_plan = slow and stats.plan is None
+
+        if not slow:
+            return
+        plan = explain(conn, sql, params) if needs_plan else stats.plan
+        if needs_plan and plan is not None:
+            stats.plan = plan
+        self._log_slow({
+            'timestamp': round(time.time(), 3),
+            'duration_ms': round(seconds * 1000, 3),
+            'rows': rows,
+            'operation': operation,
+            'sql': sql.strip()[:MAX_LOGGED_SQL],
+            'params': _loggable_params(params),
+            'plan': plan,
+        })
+
+    def _log_slow(self, entry: Dict[str, Any]):
+        if not self.log_path:
+            return
+        if self._logger is None:
+            self._logger = self._make_logger()
+        self._logger.warning(json.dumps(entry, default=str))
+        self.slow_logged += 1
+
+    def _make_logger(self) -> logging.Logger:
+        Path(self.log_path).parent.mkdir(parents=True, exist_ok=True)
+        logger = logging.getLogger(f"n8n.slow_queries.{id(self)}")
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+        handler = RotatingFileHandler(self.log_path, maxBytes=self.max_bytes,
+                                      backupCount=self.backup_count, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        return logger
+
+    def top(self, limit: int = 20, order_by: str = 'total') -> List[Dict[str, Any]]:
+        """Statement summaries, most expensive first."""
+        key = self.ORDERINGS.get(order_by, self.ORDERINGS['total'])
+        with self._lock:
+            statements = list(self.statements.values())
+        statements.sort(key=key, reverse=True)
+        return [stats.summary() for stats in statements[:limit]]
+
+    def report(self, limit: int = 20, order_by: str = 'total') -> Dict[str, Any]:
+        with self._lock:
+            statements = list(self.statements.values())
+        return {
+            'enabled': self.enabled,
+            'threshold_ms': self.threshold_ms,
+            'slow_query_log': self.log_path,
+            'since': self.started_at,
+            'distinct_statements': len(statements),
+            'calls': sum(s.calls for s in statements),
+            'total_ms': round(sum(s.total_seconds for s in statements) * 1000, 3),
+            'slow_calls': sum(s.slow_calls for s in statements),
+            'order_by': order_by if order_by in self.ORDERINGS else 'total',
+            'statements': self.top(limit, order_by),
+        }
+
+
+QUERY_PROFILER = QueryProfiler()
+
+
+def explain(conn: Optional[sqlite3.Connection], sql: str, params: Any) -> Optional[List[str]]:
+    """EXPLAIN QUERY PLAN detail lines for a read statement, or None if not explainable."""
+    if conn is None or not sql.lstrip()[:6].upper().startswith(('SELECT', 'WITH')):
+        return None
+    try:
+        cursor = sqlite3.Connection.cursor(conn, sqlite3.Cursor)
+        cursor.row_factory = None
+        rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params if params is not None else ()).fetchall()
+        cursor.close()
+        return [row[3] for row in rows]
+    except (sqlite3.Error, ValueError, TypeError):
+        return None  # closed connection, unsupported statement or odd params
+
+
+def _loggable_params(params: Any) -> Any:
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {key: _truncate(value) for key, value in params.items()}
+    try:
+        return [_truncate(value) for value in params]
+    except TypeError:
+        return _truncate(params)
+
+
+def _truncate(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str) and len(value) > MAX_LOGGED_PARAM:
+        return value[:MAX_LOGGED_PARAM] + '...'
+    return value
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor that times its statement from execute() through the last fetch."""
+
+    _statement = None  # [sql, params, seconds, rows]
+
+    def _finish(self):
+        statement = self._statement
+        if statement is None:
+            return
+        self._statement = None
+        sql, params, seconds, rows = statement
+        if rows == 0 and self.rowcount > 0:
+            rows = self.rowcount  # INSERT/UPDATE/DELETE
+        try:
+            conn = self.connection
+        except sqlite3.Error:
+            conn = None
+        QUERY_PROFILER.record(sql, params, seconds, rows, conn)
+
+    def _run(self, method, sql, params):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            result = method(self, sql, params) if params is not None else method(self, sql)
+        finally:
+            self._statement = [sql, params, time.perf_counter() - start, 0]
+        return result
+
+    def execute(self, sql, parameters=None):
+        return self._run(sqlite3.Cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._run(sqlite3.Cursor.executemany, sql, seq_of_parameters)
+        self._statement[1] = None  # do not keep (or explain with) a whole batch
+        self._finish()
+        return self
+
+    def executescript(self, sql_script):
+        self._run(sqlite3.Cursor.executescript, sql_script, None)
+        self._statement[1] = None
+        self._finish()
+        return self
+
+    def _timed_fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(self, *args)
+        statement = self._statement
+        if statement is not None:
+            statement[2] += time.perf_counter() - start
+        return result
+
+    def fetchone(self):
+        row = self._timed_fetch(sqlite3.Cursor.fetchone)
+        if row is None:
+            self._finish()
+        elif self._statement is not None:
+            self._statement[3] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed_fetch(sqlite3.Cursor.fetchmany, size if size is not None else self.arraysize)
+        if self._statement is not None:
+            self._statement[3] += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(sqlite3.Cursor.fetchall)
+        if self._statement is not None:
+            self._statement[3] += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class ProfilingConnection(TrackedConnection):
+    """TrackedConnection whose cursors report to QUERY_PROFILER.
+
+    Open cursors are finished on close(), while EXPLAIN can still run on
+    the connection.
+    """
+
+    def cursor(self, factory=ProfilingCursor):
+        cursor = super().cursor(factory)
+        if isinstance(cursor, ProfilingCursor):
+            cursors = self.__dict__.setdefault('_profiling_cursors', weakref.WeakSet())
+            cursors.add(cursor)
+        return cursor
+
+    # sqlite3.Connection's shortcuts build a plain Cursor internally, so route them explicitly
+    def execute(self, sql, parameters=None):
+        cursor = self.cursor()
+        return cursor.execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def close(self):
+        for cursor in list(self.__dict__.get('_profiling_cursors', ())):
+            cursor._finish()
+        super().close()
+
+
+def summarize_log(log_path: str) -> List[Dict[str, Any]]:
+    """Group slow-query log entries (including rotated files) by normalized SQL."""
+    groups: Dict[str, Dict[str, Any]] = defaultdict(lambda: {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+    paths = sorted(Path(log_path).parent.glob(Path(log_path).name + '*'))
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                group = groups[normalize_sql(entry.get('sql', ''))]
+                group['count'] += 1
+                group['total_ms'] += entry.get('duration_ms', 0.0)
+                group['max_ms'] = max(group['max_ms'], entry.get('duration_ms', 0.0))
+                group['operation'] = entry.get('operation')
+                group['plan'] = entry.get('plan') or group.get('plan')
+    summary = [{'sql': sql, **values} for sql, values in groups.items()]
+    summary.sort(key=lambda item: item['total_ms'], reverse=True)
+    return summary
+
+
+if os.environ.get('QUERY_PROFILING', '').lower() in ('1', 'true', 'yes'):
+    QUERY_PROFILER.enable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize the slow-query log')
+    parser.add_argument('--log', default=DEFAULT_SLOW_QUERY_LOG, help='Slow-query log path')
+    parser.add_argument('--top', type=int, default=10, help='Number of statements to show')
+    args = parser.parse_args()
+
+    if not Path(args.log).exists():
+        print(f"❌ No slow-query log at {args.log} (run the API with QUERY_PROFILING=1)")
+        return
+
+    summary = summarize_log(args.log)
+    print(f"🐢 {sum(item['count'] for item in summary)} slow queries, {len(summary)} distinct statements")
+    for item in summary[:args.top]:
+        print(f"\n⏱️  {item['total_ms']:.1f}ms total, {item['count']} calls, "
+              f"max {item['max_ms']:.1f}ms ({item.get('operation') or 'adhoc'})")
+        print(f"   {item['sql'][:200]}")
+        for step in item.get('plan') or []:
+            print(f"   📋 {step}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,20 +18,20 @@ Parâmetros principais:
   --workflows-dir   Diretório raiz contendo subpastas com arquivos .json (default: workflows)
   --limit           Processar apenas N arquivos (para testes)
   --infer           Habilita heurística para criar cadeia simples quando não houver conexões
-  --backup-dir      Diretório de backups (default: backups/repair_connections_<timestamp>)
+  --backup-dir      Store de backups deduplicados (default: backups/store)
   --dry-run         Não escreve alterações, apenas relata (default)
   --apply           Escreve alterações nos arquivos (cria backup antes)
 """
 
 import argparse
 import json
-import shutil
 from collections import defaultdict
-from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 import sys
 
+from backup_store import BackupRun, BackupStore, DEFAULT_STORE_DIR
+
 # Ensure UTF-8 output on Windows consoles
 try:
     sys.stdout.reconfigure(encoding="utf-8")
@@ -195,16 +195,13 @@ def normalize_connections(
     return wf, {k: int(v) for k, v in stats.items()}
 
 
-def backup_file(src: Path, backup_root: Path) -> Path:
-    backup_root.mkdir(parents=True, exist_ok=True)
-    dst = backup_root / src.relative_to(src.parents[1])
-    dst.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(src, dst)
-    return dst
+def backup_file(src: Path, backup_run: BackupRun) -> str:
+    """Guarda o conteúdo original no store deduplicado; retorna o hash do blob."""
+    return backup_run.add_file(src)
 
 
 def process_repository(
-    workflows_dir: Path, dry_run: bool, limit: int, infer_chain: bool, backup_dir: Path
+    workflows_dir: Path, dry_run: bool, limit: int, infer_chain: bool, backup_run: BackupRun
 ) -> Dict[str, int]:
     counters = defaultdict(int)
     files: List[Path] = []
@@ -231,7 +228,7 @@ def process_repository(
 
                 if not dry_run:
                     # Backup antes de escrever
-                    backup_file(wf_file, backup_dir)
+                    backup_file(wf_file, backup_run)
                     with wf_file.open("w", encoding="utf-8") as f:
                         json.dump(data, f, indent=2, ensure_ascii=False)
             else:
@@ -263,8 +260,8 @@ def main() -> None:
     mode.add_argument("--apply", action="store_true", help="Aplicar mudanças nos arquivos")
     parser.add_argument(
         "--backup-dir",
-        default=None,
-        help="Diretório para backups; padrão cria pasta com timestamp em backups/",
+        default=DEFAULT_STORE_DIR,
+        help=f"Store de backups deduplicados (default: {DEFAULT_STORE_DIR})",
     )
 
     args = parser.parse_args()
@@ -275,31 +272,26 @@ def main() -> None:
 
     dry_run = True if args.dry_run or not args.apply else False
 
-    ts = datetime.now().strftime("%Y%m%d%H%M%S")
-    backup_root = (
-        Path(args.backup_dir)
-        if args.backup_dir
-        else Path("backups") / f"repair_connections_{ts}"
-    )
-
     print(
         f"START repair | dir={workflows_dir} | dry_run={dry_run} | infer={args.infer} | limit={args.limit or 'all'}"
     )
 
-    summary = process_repository(
-        workflows_dir=workflows_dir,
-        dry_run=dry_run,
-        limit=args.limit,
-        infer_chain=args.infer,
-        backup_dir=backup_root,
-    )
+    # The manifest is written on exit even if the repair fails part-way
+    with BackupStore(args.backup_dir).begin_run("repair_connections", workflows_dir) as backup_run:
+        summary = process_repository(
+            workflows_dir=workflows_dir,
+            dry_run=dry_run,
+            limit=args.limit,
+            infer_chain=args.infer,
+            backup_run=backup_run,
+        )
 
     print("\nRESULT:")
     for k, v in sorted(summary.items()):
         print(f"  - {k}: {v}")
 
-    if not dry_run:
-        print(f"\nBackups em: {backup_root}")
+    if not dry_run and backup_run.files:
+        print(f"\nBackup run: {backup_run.run_id} (restaurar: python backup_store.py restore {backup_run.run_id})")
 
 
 if __name__ == "__main__":
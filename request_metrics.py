@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Request Metrics
+Real per-route request latency for the API servers.
+
+RequestMetricsMiddleware is a plain ASGI middleware that times every HTTP
+request and records it under its route template (e.g.
+"GET /api/workflows/{filename}", so path parameters do not explode the
+number of series) together with the response status and an in-flight
+gauge.
+
+Latencies go into LatencyHistogram, a fixed-memory HDR-style histogram:
+exact microsecond buckets below 128us, then 64 linear sub-buckets per
+power of two, so any recorded value is reported within ~1.6% and a
+histogram never grows past ~16KB however much traffic it sees.
+Percentiles (p50/p95/p99) are read by walking the bucket counts.
+
+Recording happens on the event loop thread and takes no lock; readers
+(PerformanceMonitor, metrics endpoints) copy the counters they need.
+
+Usage:
+  from request_metrics import REQUEST_METRICS, RequestMetricsMiddleware
+  app.add_middleware(RequestMetricsMiddleware, metrics=REQUEST_METRICS)
+"""
+
+import math
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+SUB_BUCKET_BITS = 6
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS          # linear sub-buckets per power of two
+LINEAR_LIMIT = SUB_BUCKET_COUNT * 2              # values below this get their own bucket
+MAX_TRACKABLE_US = (1 << 36) - 1                 # ~19 hours; larger values are clamped
+DEFAULT_PERCENTILES = (50, 95, 99)
+
+
+def bucket_index(value_us: int) -> int:
+    """Bucket for a latency in microseconds."""
+    if value_us < LINEAR_LIMIT:
+        return value_us if value_us > 0 else 0
+    if value_us > MAX_TRACKABLE_US:
+        value_us = MAX_TRACKABLE_US
+    shift = value_us.bit_length() - (SUB_BUCKET_BITS + 1)
+    return LINEAR_LIMIT + (shift - 1) * SUB_BUCKET_COUNT + (value_us >> shift) - SUB_BUCKET_COUNT
+
+
+def bucket_upper_bound(index: int) -> int:
+    """Highest microsecond value that lands in a bucket."""
+    if index < LINEAR_LIMIT:
+        return index
+    shift = (index - LINEAR_LIMIT) // SUB_BUCKET_COUNT + 1
+    mantissa = (index - LINEAR_LIMIT) % SUB_BUCKET_COUNT + SUB_BUCKET_COUNT
+    return ((mantissa + 1) << shift) - 1
+
+
+BUCKET_COUNT = bucket_index(MAX_TRACKABLE_US) + 1
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear latency histogram (microsecond resolution)."""
+
+    __slots__ = ('counts', 'total', 'sum_us', 'max_us')
+
+    def __init__(self):
+        self.counts = array('q', bytes(8 * BUCKET_COUNT))
+        self.total = 0
+        self.sum_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float):
+        value_us = int(seconds * 1_000_000)
+        self.counts[bucket_index(value_us)] += 1
+        self.total += 1
+        self.sum_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram.__new__(LatencyHistogram)
+        clone.counts = array('q', self.counts)
+        clone.total = self.total
+        clone.sum_us = self.sum_us
+        clone.max_us = self.max_us
+        return clone
+
+    def since(self, previous: Optional["LatencyHistogram"]) -> "LatencyHistogram":
+        """Histogram of the values recorded after `previous` was copied.
+
+        The max of an interval is not recoverable from cumulative counts, so
+        it is taken from the highest non-empty bucket of the difference.
+        """
+        if previous is None:
+            return self.copy()
+        delta = LatencyHistogram.__new__(LatencyHistogram)
+        delta.counts = array('q', (a - b for a, b in zip(self.counts, previous.counts)))
+        delta.total = self.total - previous.total
+        delta.sum_us = self.sum_us - previous.sum_us
+        delta.max_us = 0
+        if delta.total:
+            for index in range(BUCKET_COUNT - 1, -1, -1):
+                if delta.counts[index]:
+                    delta.max_us = min(bucket_upper_bound(index), self.max_us)
+                    break
+        return delta
+
+    def percentiles(self, quantiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[float, float]:
+        """Latency in milliseconds at each percentile, in one pass over the buckets."""
+        result = {q: 0.0 for q in quantiles}
+        if not self.total:
+            return result
+
+        targets = sorted((max(1, math.ceil(q / 100.0 * self.total)), q) for q in quantiles)
+        position = 0
+        running = 0
+        counts = self.counts
+        for index in range(BUCKET_COUNT):
+            count = counts[index]
+            if not count:
+                continue
+            running += count
+            while position < len(targets) and running >= targets[position][0]:
+                value_us = min(bucket_upper_bound(index), self.max_us)
+                result[targets[position][1]] = value_us / 1000.0
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    def mean_ms(self) -> float:
+        return (self.sum_us / self.total / 1000.0) if self.total else 0.0
+
+    def buckets(self) -> Iterable[Tuple[int, int]]:
+        """(upper bound in microseconds, count) for non-empty buckets, ascending."""
+        counts = self.counts
+        for index in range(BUCKET_COUNT):
+            if counts[index]:
+                yield bucket_upper_bound(index), counts[index]
+
+
+class RouteStats:
+    """Latency histogram and status counts for one method + route template."""
+
+    __slots__ = ('histogram', 'statuses')
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.statuses: Dict[int, int] = {}
+
+    def copy(self) -> "RouteStats":
+        clone = RouteStats.__new__(RouteStats)
+        clone.histogram = self.histogram.copy()
+        clone.statuses = dict(self.statuses)
+        return clone
+
+    def summary(self, histogram: Optional[LatencyHistogram] = None,
+                statuses: Optional[Dict[int, int]] = None) -> Dict[str, Any]:
+        histogram = histogram or self.histogram
+        statuses = self.statuses if statuses is None else statuses
+        p = histogram.percentiles()
+        errors = sum(count for status, count in statuses.items() if status >= 500)
+        return {
+            'count': histogram.total,
+            'p50_ms': round(p[50], 3),
+            'p95_ms': round(p[95], 3),
+            'p99_ms': round(p[99], 3),
+            'mean_ms': round(histogram.mean_ms(), 3),
+            'max_ms': round(histogram.max_us / 1000.0, 3),
+            'errors': errors,
+            'statuses': {str(status): count for status, count in sorted(statuses.items())}
+        }
+
+
+class RequestMetrics:
+    """Process-wide request statistics keyed by "METHOD /route/{template}"."""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteStats] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.total_requests = 0
+        self.started_at = time.time()
+
+    def request_started(self):
+        self.in_flight += 1
+        if self.in_flight > self.max_in_flight:
+            self.max_in_flight = self.in_flight
+
+    def request_finished(self, route_key: str, status: int, seconds: float):
+        self.in_flight -= 1
+        stats = self.routes.get(route_key)
+        if stats is None:
+            stats = self.routes[route_key] = RouteStats()
+        stats.histogram.record(seconds)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        self.total_requests += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Cumulative per-route summaries since process start."""
+        return {route: stats.summary() for route, stats in list(self.routes.items())}
+
+    def window(self) -> "MetricsWindow":
+        """A reader that reports what happened between successive collect() calls."""
+        return MetricsWindow(self)
+
+
+class MetricsWindow:
+    """Interval view over RequestMetrics, used for periodic sampling."""
+
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+        self._previous: Dict[str, RouteStats] = {}
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """Per-route summaries for requests finished since the previous collect()."""
+        current = {route: stats.copy() for route, stats in list(self.metrics.routes.items())}
+        interval = {}
+        for route, stats in current.items():
+            previous = self._previous.get(route)
+            if previous is not None and previous.histogram.total == stats.histogram.total:
+                continue
+            histogram = stats.histogram.since(previous.histogram if previous else None)
+            statuses = {status: count - (previous.statuses.get(status, 0) if previous else 0)
+                        for status, count in stats.statuses.items()}
+            interval[route] = stats.summary(histogram, {s: c for s, c in statuses.items() if c})
+        self._previous = current
+        return interval
+
+
+def route_key(scope: Dict[str, Any]) -> str:
+    """Method plus route template; unmatched paths share one key to bound cardinality."""
+    route = scope.get('route')
+    path = getattr(route, 'path', None) or 'unmatched'
+    return f"{scope.get('method', 'GET')} {path}"
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight count per route."""
+
+    def __init__(self, app, metrics: Optional[RequestMetrics] = None,
+                 exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.metrics = metrics or REQUEST_METRICS
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope.get('path') in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status = 500  # reported when the app raises before starting a response
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        metrics.request_started()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.request_finished(route_key(scope), status, time.perf_counter() - start)
+
+
+REQUEST_METRICS = RequestMetrics()
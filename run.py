@@ -7,9 +7,38 @@ Start the advanced search system with optimized performance.
 import sys
 import os
 import argparse
+import socket
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
 
+class StartupProfiler:
+    """Per-phase wall-clock timings of the launcher (--profile-startup / STARTUP_PROFILE=1)."""
+    
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases = []
+    
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+    
+    def report(self):
+        if not self.enabled:
+            return
+        print("⏱️  Startup profile:")
+        for name, seconds in self.phases:
+            print(f"   {name:<20} {seconds * 1000:8.1f} ms")
+        print(f"   {'total':<20} {(time.perf_counter() - self.started) * 1000:8.1f} ms")
+
+
 def print_banner():
     """Print application banner."""
     print("🚀 n8n-workflows Advanced Search Engine")
@@ -54,29 +83,81 @@ def setup_directories():
     print("✅ Directories verified")
 
 
-def setup_database(force_reindex: bool = False) -> str:
-    """Setup and initialize the database."""
-    from workflow_db import WorkflowDatabase
-    
-    # Run startup cleaner first
+def run_startup_cleaner(full: bool = False) -> dict:
+    """Run the startup cleaner, skipping files unchanged since the last run."""
     try:
         from startup_cleaner import WorkflowStartupCleaner
         print("🧹 Running startup workflow cleaner...")
         cleaner = WorkflowStartupCleaner()
-        stats = cleaner.clean_all_workflows()
-        print(f"✅ Startup cleanup complete: {stats['cleaned']} workflows cleaned")
+        stats = cleaner.clean_all_workflows(incremental=not full)
+        print(f"✅ Startup cleanup complete: {stats['cleaned']} workflows cleaned, {stats['skipped']} unchanged")
+        return stats
     except Exception as e:
         print(f"⚠️ Startup cleaner failed: {e}")
-        print("Continuing with database setup...")
+        return {'cleaned': 0, 'skipped': 0, 'errors': 1, 'total': 0}
+
+
+def wait_for_server(host: str, port: int, timeout: float = 60.0) -> bool:
+    """Wait until the server accepts TCP connections."""
+    connect_host = "127.0.0.1" if host in ("0.0.0.0", "") else host
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((connect_host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_background_cleaner(host: str, port: int, db_path: str, snapshot_path: str = None) -> threading.Thread:
+    """Run the startup cleaner once the server is accepting traffic.
+    
+    Files modified by the cleaner are picked up by an incremental reindex
+    afterwards, so the API only serves stale metadata for the cleaned files
+    and only until the reindex finishes. With snapshot_path (multi-worker
+    mode) the reindex is left to the snapshot indexer, which republishes.
+    """
+    def worker():
+        if not wait_for_server(host, port):
+            print("⚠️ Server did not come up, skipping background cleanup")
+            return
+        
+        stats = run_startup_cleaner()
+        if stats['cleaned'] > 0:
+            print("🔄 Reindexing workflows changed by the cleaner...")
+            if snapshot_path:
+                from db_snapshots import request_reindex
+                request_reindex(snapshot_path)
+            else:
+                from workflow_db import WorkflowDatabase
+                WorkflowDatabase(db_path).index_all_workflows()
+    
+    thread = threading.Thread(target=worker, name="startup-cleaner", daemon=True)
+    thread.start()
+    return thread
+
+
+def setup_database(force_reindex: bool = False, clean_mode: str = "sync") -> str:
+    """Setup and initialize the database.
+    
+    clean_mode controls the startup cleaner: "sync" runs it before indexing,
+    "background" and "off" leave it to the caller.
+    """
+    from workflow_db import WorkflowDatabase
+    
+    # Run startup cleaner first
+    if clean_mode == "sync":
+        run_startup_cleaner(full=force_reindex)
     
     db_path = "database/workflows.db"
     
     print(f"🔄 Setting up database: {db_path}")
+    # Opening migrates the schema only if its version changed
     db = WorkflowDatabase(db_path)
     
     # Check if database has data or force reindex
-    stats = db.get_stats()
-    if stats['total'] == 0 or force_reindex:
+    if not db.is_indexed() or force_reindex:
         print("📚 Indexing workflows...")
         index_stats = db.index_all_workflows(force_reindex=True)
         print(f"✅ Indexed {index_stats['processed']} workflows")
@@ -85,30 +166,59 @@ def setup_database(force_reindex: bool = False) -> str:
         final_stats = db.get_stats()
         print(f"📊 Database contains {final_stats['total']} workflows")
     else:
-        print(f"✅ Database ready: {stats['total']} workflows")
+        print("✅ Database ready")
     
     return db_path
 
 
-def start_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False):
-    """Start the FastAPI server."""
+def start_snapshot_indexer(db_path: str, interval: float = 0):
+    """Publish a read-only snapshot of db_path for the workers and keep it current.
+    
+    This process stays the only writer: it reindexes on request (POST
+    /api/reindex in any worker) or every `interval` seconds, and publishes
+    a new snapshot when anything changed.
+    """
+    from db_snapshots import SnapshotIndexer
+    
+    snapshot_path = str(Path(db_path).with_suffix('.snapshot.db'))
+    indexer = SnapshotIndexer(db_path, snapshot_path, interval=interval)
+    indexer.publish()
+    indexer.start()
+    return indexer
+
+
+def start_server(host: str = "127.0.0.1", port: int = 8000, reload: bool = False,
+                 workers: int = 1, snapshot_path: str = None):
+    """Start the FastAPI server.
+    
+    With workers > 1, each worker builds the app through api_server.create_app
+    and serves the read-only snapshot at snapshot_path.
+    """
     print(f"🌐 Starting server at http://{host}:{port}")
     print(f"📊 API Documentation: http://{host}:{port}/docs")
     print(f"🔍 Workflow Search: http://{host}:{port}/api/workflows")
+    if workers > 1:
+        print(f"👷 {workers} workers serving snapshot {snapshot_path}")
     print()
     print("Press Ctrl+C to stop the server")
     print("-" * 50)
     
-    # Configure database path
-    os.environ['WORKFLOW_DB_PATH'] = "database/workflows.db"
+    # Configure database path (inherited by worker processes)
+    if workers > 1:
+        os.environ['WORKFLOW_DB_PATH'] = snapshot_path
+        os.environ['WORKFLOW_DB_MODE'] = "snapshot"
+    else:
+        os.environ['WORKFLOW_DB_PATH'] = "database/workflows.db"
     
     # Start uvicorn with better configuration
     import uvicorn
     uvicorn.run(
-        "api_server:app", 
+        "api_server:create_app",
+        factory=True,
         host=host, 
         port=port, 
         reload=reload,
+        workers=workers,
         log_level="info",
         access_log=False  # Reduce log noise
     )
@@ -127,6 +237,10 @@ Examples:
   python run.py --host 0.0.0.0     # Accept external connections
   python run.py --reindex          # Force database reindexing
   python run.py --dev              # Development mode with auto-reload
+  python run.py --clean background # Clean workflows after the server is up
+  python run.py --workers 4        # Four worker processes on a read-only snapshot
+  python run.py --fast-boot        # Serve at once; clean in the background
+  python run.py --profile-startup  # Print per-phase startup timings
         """
     )
     
@@ -151,31 +265,92 @@ Examples:
         action="store_true", 
         help="Development mode with auto-reload"
     )
+    parser.add_argument(
+        "--clean",
+        choices=["sync", "background", "off"],
+        default=os.environ.get("STARTUP_CLEAN_MODE", "sync"),
+        help="When to run the startup cleaner (default: sync)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WEB_CONCURRENCY", "1")),
+        help="Worker processes; more than one serves a read-only DB snapshot (default: 1)"
+    )
+    parser.add_argument(
+        "--reindex-interval",
+        type=float,
+        default=0,
+        help="With --workers > 1: also reindex and republish every N seconds (default: on request only)"
+    )
+    
+    parser.add_argument(
+        "--fast-boot",
+        action="store_true",
+        default=os.environ.get("FAST_BOOT", "").lower() in ("1", "true", "yes"),
+        help="Accept traffic as soon as possible: the startup cleaner runs in the background"
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        default=os.environ.get("STARTUP_PROFILE", "").lower() in ("1", "true", "yes"),
+        help="Print per-phase startup timings before serving"
+    )
     
     args = parser.parse_args()
+    if args.fast_boot and args.clean == "sync":
+        args.clean = "background"
+    if args.dev and args.workers > 1:
+        print("⚠️ Auto-reload runs a single worker; ignoring --workers")
+        args.workers = 1
     
     print_banner()
+    profiler = StartupProfiler(args.profile_startup)
     
     # Check dependencies
-    if not check_requirements():
-        sys.exit(1)
+    with profiler.phase("dependencies"):
+        if not check_requirements():
+            sys.exit(1)
     
     # Setup directories
-    setup_directories()
+    with profiler.phase("directories"):
+        setup_directories()
     
     # Setup database
     try:
-        setup_database(force_reindex=args.reindex)
+        with profiler.phase("database"):
+            db_path = setup_database(force_reindex=args.reindex, clean_mode=args.clean)
     except Exception as e:
         print(f"❌ Database setup error: {e}")
         sys.exit(1)
     
+    snapshot_path = None
+    if args.workers > 1:
+        try:
+            with profiler.phase("snapshot"):
+                snapshot_path = start_snapshot_indexer(db_path, args.reindex_interval).snapshot_path
+        except Exception as e:
+            print(f"❌ Snapshot setup error: {e}")
+            sys.exit(1)
+    
+    if args.clean == "background":
+        start_background_cleaner(args.host, args.port, db_path, snapshot_path)
+    
+    if args.workers == 1 and not args.dev:
+        # Same process as the server, which then reuses the imported module
+        with profiler.phase("app import"):
+            import api_server  # noqa: F401
+    profiler.report()
+    
     # Start server
     try:
         start_server(
             host=args.host, 
             port=args.port, 
-            reload=args.dev
+            reload=args.dev,
+            workers=args.workers,
+            snapshot_path=snapshot_path
         )
     except KeyboardInterrupt:
         print("\n👋 Server stopped!")
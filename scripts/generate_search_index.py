@@ -2,10 +2,22 @@
 """
 Generate Static Search Index for GitHub Pages
 Creates a lightweight JSON index for client-side search functionality.
+
+search-index.json is written in a compact format (format "compact",
+decoded by docs/js/search.js):
+  dict       interned strings; workflow rows refer to them by position
+  fields     column names of the rows in "workflows"
+  workflows  one array per workflow: strings for name/description/filename,
+             integers (dict positions) for everything else
+  url        download URL template with {folder} and {filename}
+  tokens     inverted index: token -> delta-encoded workflow positions,
+             built from the same text the old "searchable_text" held
 """
 
+import argparse
 import json
 import os
+import re
 import sys
 from pathlib import Path
 from typing import Dict, List, Any
@@ -31,8 +43,9 @@ def generate_static_search_index(db_path: str, output_dir: str) -> Dict[str, Any
     # Get categories from service mapping
     categories = db.get_service_categories()
 
-    # Load existing categories from create_categories.py system
-    existing_categories = load_existing_categories()
+    # Categories stored at indexing time by the create_categories.py rules
+    existing_categories = {w['filename']: w['category'] for w in workflows
+                           if w.get('category') and w['category'] != 'Uncategorized'}
 
     # Create simplified workflow data for search
     search_workflows = []
@@ -62,7 +75,8 @@ def generate_static_search_index(db_path: str, output_dir: str) -> Dict[str, Any
             'tags': workflow['tags'],
             'category': category,
             'searchable_text': searchable_text,
-            'download_url': f"https://raw.githubusercontent.com/Zie619/n8n-workflows/main/workflows/{extract_folder_from_filename(workflow['filename'])}/{workflow['filename']}"
+            'download_url': DOWNLOAD_URL_TEMPLATE.format(folder=extract_folder_from_filename(workflow['filename']),
+                                                         filename=workflow['filename'])
         }
         search_workflows.append(search_workflow)
 
@@ -88,29 +102,11 @@ def generate_static_search_index(db_path: str, output_dir: str) -> Dict[str, Any
     return search_index
 
 
-def load_existing_categories() -> Dict[str, str]:
-    """Load existing categories from search_categories.json created by create_categories.py."""
-    try:
-        with open('context/search_categories.json', 'r', encoding='utf-8') as f:
-            categories_data = json.load(f)
-
-        # Convert to filename -> category mapping
-        category_mapping = {}
-        for item in categories_data:
-            if item.get('category'):
-                category_mapping[item['filename']] = item['category']
-
-        return category_mapping
-    except FileNotFoundError:
-        print("Warning: search_categories.json not found, using integration-based categorization")
-        return {}
-
-
 def get_workflow_category(filename: str, existing_categories: Dict[str, str],
                          integrations: List[str], service_categories: Dict[str, List[str]]) -> str:
     """Get category for workflow, preferring existing assignment over integration-based."""
 
-    # First priority: Use existing category from create_categories.py system
+    # First priority: category stored by the indexer (create_categories.py rules)
     if filename in existing_categories:
         return existing_categories[filename]
 
@@ -195,6 +191,85 @@ def get_popular_integrations(workflows: List[Dict]) -> List[Dict[str, Any]]:
     ]
 
 
+DOWNLOAD_URL_TEMPLATE = "https://raw.githubusercontent.com/Zie619/n8n-workflows/main/workflows/{folder}/{filename}"
+COMPACT_FIELDS = ['filename', 'name', 'description', 'active', 'trigger_type', 'complexity',
+                  'node_count', 'category', 'folder', 'integrations', 'tags']
+# Same definition of a token as docs/js/search.js (letters and digits, any script)
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def compact_search_index(search_index: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a search index with full workflow objects into the compact format."""
+    dictionaries: Dict[str, List[str]] = {
+        'triggers': [], 'complexities': [], 'categories': [], 'folders': [], 'integrations': [], 'tags': []
+    }
+    positions: Dict[str, Dict[str, int]] = {name: {} for name in dictionaries}
+
+    def intern(dictionary: str, value: str) -> int:
+        index = positions[dictionary].get(value)
+        if index is None:
+            index = positions[dictionary][value] = len(dictionaries[dictionary])
+            dictionaries[dictionary].append(value)
+        return index
+
+    rows = []
+    postings: Dict[str, List[int]] = {}
+    for position, workflow in enumerate(search_index['workflows']):
+        folder = workflow['download_url'].rsplit('/', 2)[-2] if workflow.get('download_url') \
+            else extract_folder_from_filename(workflow['filename'])
+        rows.append([
+            workflow['filename'],
+            workflow['name'],
+            workflow['description'],
+            1 if workflow['active'] else 0,
+            intern('triggers', workflow['trigger_type']),
+            intern('complexities', workflow['complexity']),
+            workflow['node_count'],
+            intern('categories', workflow['category']),
+            intern('folders', folder),
+            [intern('integrations', integration) for integration in workflow['integrations']],
+            [intern('tags', tag) for tag in workflow['tags'] or []],
+        ])
+
+        text = ' '.join([
+            workflow['name'],
+            workflow['description'],
+            workflow['filename'],
+            ' '.join(workflow['integrations']),
+            ' '.join(workflow['tags']) if workflow['tags'] else ''
+        ])
+        for token in set(tokenize(text)):
+            postings.setdefault(token, []).append(position)
+
+    # Positions ascend, so store gaps: mostly one- or two-digit numbers
+    tokens = {}
+    for token in sorted(postings):
+        previous = 0
+        gaps = []
+        for position in postings[token]:
+            gaps.append(position - previous)
+            previous = position
+        tokens[token] = gaps
+
+    return {
+        'version': '2.0',
+        'format': 'compact',
+        'generated_at': search_index.get('generated_at', ''),
+        'stats': search_index['stats'],
+        'categories': search_index['categories'],
+        'integrations': search_index['integrations'],
+        'url': DOWNLOAD_URL_TEMPLATE,
+        'dict': dictionaries,
+        'fields': COMPACT_FIELDS,
+        'workflows': rows,
+        'tokens': tokens,
+    }
+
+
 def extract_folder_from_filename(filename: str) -> str:
     """Extract folder name from workflow filename."""
     # Most workflows follow pattern: ID_Service_Purpose_Trigger.json
@@ -205,15 +280,19 @@ def extract_folder_from_filename(filename: str) -> str:
     return 'Misc'
 
 
-def save_search_index(search_index: Dict[str, Any], output_dir: str):
+def save_search_index(search_index: Dict[str, Any], output_dir: str, compact: bool = True):
     """Save the search index to multiple formats for different uses."""
 
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
     # Save complete index
-    with open(os.path.join(output_dir, 'search-index.json'), 'w', encoding='utf-8') as f:
-        json.dump(search_index, f, indent=2, ensure_ascii=False)
+    index_path = os.path.join(output_dir, 'search-index.json')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(compact_search_index(search_index), f, separators=(',', ':'), ensure_ascii=False)
+        else:
+            json.dump(search_index, f, indent=2, ensure_ascii=False)
 
     # Save stats only (for quick loading)
     with open(os.path.join(output_dir, 'stats.json'), 'w', encoding='utf-8') as f:
@@ -231,26 +310,38 @@ def save_search_index(search_index: Dict[str, Any], output_dir: str):
     print(f"   {search_index['stats']['total_workflows']} workflows indexed")
     print(f"   {len(search_index['categories'])} categories")
     print(f"   {len(search_index['integrations'])} popular integrations")
+    print(f"   search-index.json: {os.path.getsize(index_path) / 1024:.0f} KB ({'compact' if compact else 'legacy'} format)")
     print(f"   Files saved to: {output_dir}")
 
 
 def main():
     """Main function to generate search index."""
-
-    # Paths
-    db_path = "database/workflows.db"
-    output_dir = "docs/api"
-
-    # Check if database exists
-    if not os.path.exists(db_path):
-        print(f"Database not found: {db_path}")
-        print("Run 'python run.py --reindex' first to create the database")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Generate the static search index for GitHub Pages")
+    parser.add_argument("--db", default="database/workflows.db", help="Workflow database")
+    parser.add_argument("--output", default="docs/api", help="Output directory")
+    parser.add_argument("--legacy", action="store_true",
+                        help="Write search-index.json with full workflow objects (format 1.0)")
+    parser.add_argument("--from-json", metavar="PATH",
+                        help="Re-encode an existing format 1.0 search-index.json instead of reading the database")
+    args = parser.parse_args()
 
     try:
-        print("Generating static search index...")
-        search_index = generate_static_search_index(db_path, output_dir)
-        save_search_index(search_index, output_dir)
+        if args.from_json:
+            with open(args.from_json, 'r', encoding='utf-8') as f:
+                search_index = json.load(f)
+            if search_index.get('format') == 'compact':
+                print(f"{args.from_json} is already in the compact format")
+                sys.exit(1)
+        else:
+            # Check if database exists
+            if not os.path.exists(args.db):
+                print(f"Database not found: {args.db}")
+                print("Run 'python run.py --reindex' first to create the database")
+                sys.exit(1)
+
+            print("Generating static search index...")
+            search_index = generate_static_search_index(args.db, args.output)
+        save_search_index(search_index, args.output, compact=not args.legacy)
 
         print("Static search index ready for GitHub Pages!")
 
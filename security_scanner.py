@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Workflow Security Scanner
+Single-pass detection and redaction of secrets and hardcoded URLs.
+
+All key patterns are compiled into one case-insensitive alternation that
+acts as a prefilter, key classifications are memoized (workflow parameter
+keys repeat heavily across the corpus), and URL regexes only run on
+strings that contain "://". One walk over the workflow tree produces
+typed findings with JSON paths for every rule at once.
+
+Usage:
+  python security_scanner.py                  # report findings for all workflows
+  python security_scanner.py --output report.json
+  python security_scanner.py --node-type httpRequest   # only workflows using a node type
+"""
+
+import json
+import re
+import sys
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+SENSITIVE_KEY_PATTERNS = [
+    'password', 'token', 'key', 'secret', 'credential',
+    'api_key', 'access_token', 'refresh_token', 'bearer'
+]
+URL_PATTERN = r'https?://[^\s<>"\'{}|\\^`\[\]]+'
+URL_PLACEHOLDERS = ['{{', '${', 'YOUR_', 'PLACEHOLDER']
+TOKEN_VALUE_PATTERN = r'[A-Za-z0-9]{20,}'
+
+KIND_SENSITIVE_KEY = 'sensitive_key'
+KIND_SECRET_VALUE = 'secret_value'
+KIND_HARDCODED_URL = 'hardcoded_url'
+
+
+@dataclass
+class Finding:
+    """A single security finding inside a workflow."""
+    kind: str
+    rule: str
+    path: str
+    key: str
+    value: Any
+    match: str
+
+    def preview(self, length: int = 50) -> str:
+        return str(self.value)[:length]
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['value'] = self.preview()
+        return data
+
+
+def format_path(node: Optional[tuple]) -> str:
+    """Render a linked (parent, segment) path as nodes[0].parameters.url."""
+    segments = []
+    while node is not None:
+        node, segment = node
+        segments.append(segment)
+
+    path = ""
+    for segment in reversed(segments):
+        if isinstance(segment, int):
+            path += f"[{segment}]"
+        else:
+            path = f"{path}.{segment}" if path else segment
+    return path
+
+
+class SecretScanner:
+    """Compiled scanner for sensitive keys, token-like values and hardcoded URLs.
+
+    key_rules maps a rule name to its substring patterns; for every key the
+    first matching pattern of each rule is reported, in declaration order.
+    Scanners are meant to be built once at module level and reused.
+    """
+
+    def __init__(self,
+                 key_rules: Optional[Dict[str, Sequence[str]]] = None,
+                 scan_urls: bool = True,
+                 url_pattern: str = URL_PATTERN,
+                 url_placeholders: Sequence[str] = URL_PLACEHOLDERS,
+                 token_value_rule: Optional[str] = None,
+                 token_value_pattern: str = TOKEN_VALUE_PATTERN):
+        if key_rules is None:
+            key_rules = {'sensitive': SENSITIVE_KEY_PATTERNS}
+        self.key_rules = [(rule, [p.lower() for p in patterns]) for rule, patterns in key_rules.items()]
+        all_patterns = sorted({p for _, patterns in self.key_rules for p in patterns}, key=len, reverse=True)
+        self._key_prefilter = (re.compile("|".join(re.escape(p) for p in all_patterns), re.IGNORECASE)
+                               if all_patterns else None)
+        self._key_cache: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+
+        self.scan_urls = scan_urls
+        self._url_re = re.compile(url_pattern)
+        self._placeholder_re = (re.compile("|".join(re.escape(p) for p in url_placeholders))
+                                if url_placeholders else None)
+
+        self.token_value_rule = token_value_rule
+        self._token_re = re.compile(token_value_pattern)
+
+    def classify_key(self, key: str) -> Tuple[Tuple[str, str], ...]:
+        """Return (rule, pattern) pairs matched by a key, memoized per key."""
+        cached = self._key_cache.get(key)
+        if cached is not None:
+            return cached
+
+        matches = ()
+        if self._key_prefilter is not None and self._key_prefilter.search(key):
+            key_lower = key.lower()
+            found = []
+            for rule, patterns in self.key_rules:
+                for pattern in patterns:
+                    if pattern in key_lower:
+                        found.append((rule, pattern))
+                        break
+            matches = tuple(found)
+
+        self._key_cache[key] = matches
+        return matches
+
+    def has_url_candidate(self, text: str) -> bool:
+        """Cheap check whether a string may contain a hardcoded URL."""
+        if '://' not in text:
+            return False
+        return not (self._placeholder_re and self._placeholder_re.search(text))
+
+    def scan(self, data: Any) -> List[Finding]:
+        """Report all findings in one walk without modifying data."""
+        _, findings = self._walk(data)
+        return findings
+
+    def redact(self, data: Any,
+               key_replacement: Optional[Callable[[Finding], Any]] = None,
+               url_replacement: Optional[Callable[[str], str]] = None) -> Tuple[Any, List[Finding]]:
+        """Replace findings in place and return (data, redacted findings).
+
+        key_replacement receives a sensitive-key finding and returns the new
+        value, or None to keep it. url_replacement maps each hardcoded URL to
+        its replacement text.
+        """
+        return self._walk(data, key_replacement, url_replacement)
+
+    def _walk(self, data: Any,
+              key_replacement: Optional[Callable[[Finding], Any]] = None,
+              url_replacement: Optional[Callable[[str], str]] = None) -> Tuple[Any, List[Finding]]:
+        findings: List[Finding] = []
+        key_cache = self._key_cache
+        classify_key = self.classify_key
+        scan_urls = self.scan_urls
+        token_rule = self.token_value_rule
+        check_tokens = token_rule is not None and key_replacement is None and url_replacement is None
+        placeholder_search = self._placeholder_re.search if self._placeholder_re else None
+        token_search = self._token_re.search
+        url_re = self._url_re
+
+        def visit_str(text: str, path: tuple, key_name: str, under_token_rule: bool) -> Optional[str]:
+            """Scan a string leaf; return its replacement when redacting URLs."""
+            if check_tokens and under_token_rule:
+                token = token_search(text)
+                if token:
+                    findings.append(Finding(KIND_SECRET_VALUE, token_rule, format_path(path),
+                                            key_name, text, token.group()))
+
+            if not scan_urls or '://' not in text or (placeholder_search and placeholder_search(text)):
+                return None
+            urls = url_re.findall(text)
+            if not urls:
+                return None
+            location = format_path(path)
+            for url in urls:
+                findings.append(Finding(KIND_HARDCODED_URL, 'url', location, key_name, text, url))
+            if url_replacement is not None:
+                return url_re.sub(lambda m: url_replacement(m.group()), text)
+            return None
+
+        def visit(value: Any, path: Optional[tuple], key_name: str, under_token_rule: bool):
+            if type(value) is dict:
+                for key, child in value.items():
+                    matches = key_cache.get(key)
+                    if matches is None:
+                        matches = classify_key(key)
+
+                    child_under = under_token_rule
+                    for rule, pattern in matches:
+                        if rule == token_rule:
+                            child_under = True
+                        if isinstance(child, str):
+                            if not child.strip():
+                                continue
+                        elif not child:
+                            continue
+                        finding = Finding(KIND_SENSITIVE_KEY, rule, format_path((path, key)), key, child, pattern)
+                        if key_replacement is not None:
+                            replacement = key_replacement(finding)
+                            if replacement is None:
+                                continue
+                            value[key] = child = replacement
+                        findings.append(finding)
+
+                    child_type = type(child)
+                    if child_type is str:
+                        if (check_tokens and child_under) or (scan_urls and '://' in child):
+                            replaced = visit_str(child, (path, key), key, child_under)
+                            if replaced is not None:
+                                value[key] = replaced
+                    elif child_type is dict or child_type is list:
+                        visit(child, (path, key), key, child_under)
+
+            elif type(value) is list:
+                for i, item in enumerate(value):
+                    item_type = type(item)
+                    if item_type is str:
+                        if (check_tokens and under_token_rule) or (scan_urls and '://' in item):
+                            replaced = visit_str(item, (path, i), key_name, under_token_rule)
+                            if replaced is not None:
+                                value[i] = replaced
+                    elif item_type is dict or item_type is list:
+                        visit(item, (path, i), key_name, under_token_rule)
+
+        if isinstance(data, str):
+            replaced = visit_str(data, None, "", False)
+            return (data if replaced is None else replaced), findings
+
+        visit(data, None, "", False)
+        return data, findings
+
+def main():
+    """Scan every workflow and report findings."""
+    import argparse
+    import time
+    from collections import Counter
+
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+    parser = argparse.ArgumentParser(description='Scan workflows for secrets and hardcoded URLs')
+    parser.add_argument('--workflows-dir', default='workflows')
+    parser.add_argument('--output', help='Write findings as JSON to this file')
+    parser.add_argument('--node-type', action='append', default=[],
+                        help='Only scan workflows using this node type (byte prefilter, repeatable)')
+    args = parser.parse_args()
+
+    scanner = SecretScanner(token_value_rule='sensitive')
+    report = {}
+    counts = Counter()
+    files = sorted(Path(args.workflows_dir).rglob("*.json"))
+
+    start = time.perf_counter()
+    prefilter = None
+    if args.node_type:
+        from workflow_prefilter import PrefilterRule, WorkflowPrefilter, node_types_used
+        prefilter = WorkflowPrefilter([PrefilterRule.node_type(t) for t in args.node_type])
+        files = list(prefilter.candidates(files))
+
+    scanned = 0
+    for path in files:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+            print(f"❌ Error reading {path.name}: {e}", file=sys.stderr)
+            continue
+        # Prefilter hits are candidates; confirm the node type on the parsed nodes
+        if prefilter and not node_types_used(data, args.node_type):
+            continue
+        scanned += 1
+        findings = scanner.scan(data)
+        if findings:
+            report[str(path)] = [f.to_dict() for f in findings]
+            counts.update(f.kind for f in findings)
+    elapsed = time.perf_counter() - start
+
+    print(f"🔍 Scanned {scanned} workflows in {elapsed:.2f}s")
+    print(f"   Files with findings: {len(report)}")
+    if prefilter:
+        print(f"   {prefilter.report()}")
+    for kind, count in counts.most_common():
+        print(f"   {kind}: {count}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📄 Findings saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,14 @@ import asyncio
 import sqlite3
 from datetime import datetime
 import re
+import sys
+from pathlib import Path
+
+try:
+    from metrics_registry import connect
+except ImportError:  # started from src/, metrics_registry lives at the repository root
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from metrics_registry import connect
 
 class ChatMessage(BaseModel):
     message: str
@@ -30,7 +38,7 @@ class WorkflowAssistant:
         self.conversation_history = {}
         
     def get_db_connection(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -12,6 +12,14 @@ import json
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 import statistics
+import sys
+from pathlib import Path
+
+try:
+    from metrics_registry import connect
+except ImportError:  # started from src/, metrics_registry lives at the repository root
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from metrics_registry import connect
 
 class AnalyticsResponse(BaseModel):
     overview: Dict[str, Any]
@@ -25,7 +33,7 @@ class WorkflowAnalytics:
         self.db_path = db_path
     
     def get_db_connection(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -4,12 +4,19 @@ Community Features Module for n8n Workflows Repository
 Implements rating, review, and social features
 """
 
-import sqlite3
 import json
 import hashlib
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+import sys
+from pathlib import Path
+
+try:
+    from metrics_registry import connect
+except ImportError:  # started from src/, metrics_registry lives at the repository root
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from metrics_registry import connect
 
 @dataclass
 class WorkflowRating:
@@ -43,7 +50,7 @@ class CommunityFeatures:
     
     def init_community_tables(self):
         """Initialize community feature database tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         # Workflow ratings and reviews
@@ -126,7 +133,7 @@ class CommunityFeatures:
         if not (1 <= rating <= 5):
             raise ValueError("Rating must be between 1 and 5")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -151,7 +158,7 @@ class CommunityFeatures:
     
     def get_workflow_ratings(self, workflow_id: str, limit: int = 10) -> List[WorkflowRating]:
         """Get ratings and reviews for a workflow"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -179,7 +186,7 @@ class CommunityFeatures:
     
     def get_workflow_stats(self, workflow_id: str) -> Optional[WorkflowStats]:
         """Get comprehensive statistics for a workflow"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -206,7 +213,7 @@ class CommunityFeatures:
     
     def increment_view(self, workflow_id: str):
         """Increment view count for a workflow"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -225,7 +232,7 @@ class CommunityFeatures:
     
     def increment_download(self, workflow_id: str):
         """Increment download count for a workflow"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -244,7 +251,7 @@ class CommunityFeatures:
     
     def get_top_rated_workflows(self, limit: int = 10) -> List[Dict]:
         """Get top-rated workflows"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -271,7 +278,7 @@ class CommunityFeatures:
     
     def get_most_popular_workflows(self, limit: int = 10) -> List[Dict]:
         """Get most popular workflows by views and downloads"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -298,7 +305,7 @@ class CommunityFeatures:
     def create_collection(self, user_id: str, collection_name: str, workflow_ids: List[str], 
                          is_public: bool = False, description: str = None) -> bool:
         """Create a workflow collection"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -319,7 +326,7 @@ class CommunityFeatures:
     
     def get_user_collections(self, user_id: str) -> List[Dict]:
         """Get collections for a user"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -345,7 +352,7 @@ class CommunityFeatures:
     
     def _update_workflow_stats(self, workflow_id: str):
         """Update workflow statistics after rating changes"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         # Calculate new statistics
@@ -4,8 +4,8 @@ Enhanced API Module for n8n Workflows Repository
 Advanced features, analytics, and performance optimizations
 """
 
-import sqlite3
 import json
+import sqlite3
 import time
 import hashlib
 from datetime import datetime, timedelta
@@ -18,6 +18,14 @@ import uvicorn
 
 # Import community features
 from community_features import CommunityFeatures, create_community_api_endpoints
+import sys
+from pathlib import Path
+
+try:
+    from metrics_registry import connect
+except ImportError:  # started from src/, metrics_registry lives at the repository root
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from metrics_registry import connect
 
 class WorkflowSearchRequest(BaseModel):
     """Workflow search request model"""
@@ -226,7 +234,8 @@ class EnhancedAPI:
     
     def _search_workflows_enhanced(self, **kwargs) -> List[Dict]:
         """Enhanced workflow search with multiple filters"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         # Build dynamic query
@@ -282,25 +291,9 @@ class EnhancedAPI:
         
         workflows = []
         for row in cursor.fetchall():
-            workflows.append({
-                'filename': row[0],
-                'name': row[1],
-                'workflow_id': row[2],
-                'active': bool(row[3]),
-                'description': row[4],
-                'trigger_type': row[5],
-                'complexity': row[6],
-                'node_count': row[7],
-                'integrations': row[8],
-                'tags': row[9],
-                'created_at': row[10],
-                'updated_at': row[11],
-                'file_hash': row[12],
-                'file_size': row[13],
-                'analyzed_at': row[14],
-                'average_rating': row[15],
-                'total_ratings': row[16]
-            })
+            workflow = dict(row)
+            workflow['active'] = bool(workflow['active'])
+            workflows.append(workflow)
         
         conn.close()
         return workflows
@@ -321,7 +314,8 @@ class EnhancedAPI:
     def _get_workflow_details(self, workflow_id: str, include_stats: bool, 
                             include_ratings: bool, include_related: bool) -> Dict:
         """Get detailed workflow information"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         # Get basic workflow data
@@ -332,23 +326,8 @@ class EnhancedAPI:
             conn.close()
             return None
         
-        workflow_data = {
-            'filename': workflow_row[0],
-            'name': workflow_row[1],
-            'workflow_id': workflow_row[2],
-            'active': bool(workflow_row[3]),
-            'description': workflow_row[4],
-            'trigger_type': workflow_row[5],
-            'complexity': workflow_row[6],
-            'node_count': workflow_row[7],
-            'integrations': workflow_row[8],
-            'tags': workflow_row[9],
-            'created_at': workflow_row[10],
-            'updated_at': workflow_row[11],
-            'file_hash': workflow_row[12],
-            'file_size': workflow_row[13],
-            'analyzed_at': workflow_row[14]
-        }
+        workflow_data = dict(workflow_row)
+        workflow_data['active'] = bool(workflow_data['active'])
         
         # Add statistics if requested
         if include_stats:
@@ -372,23 +351,24 @@ class EnhancedAPI:
         """Get personalized workflow recommendations"""
         # Implementation for recommendation algorithm
         # This would use collaborative filtering, content-based filtering, etc.
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         # Simple recommendation based on user interests
         recommendations = []
         for interest in request.user_interests:
             cursor.execute("""
-                SELECT * FROM workflows 
+                SELECT filename, name, description FROM workflows 
                 WHERE integrations LIKE ? OR name LIKE ? OR description LIKE ?
                 LIMIT 5
             """, (f"%{interest}%", f"%{interest}%", f"%{interest}%"))
             
             for row in cursor.fetchall():
                 recommendations.append({
-                    'filename': row[0],
-                    'name': row[1],
-                    'description': row[4],
+                    'filename': row['filename'],
+                    'name': row['name'],
+                    'description': row['description'],
                     'reason': f"Matches your interest in {interest}"
                 })
         
@@ -401,7 +381,7 @@ class EnhancedAPI:
     
     def _get_analytics_overview(self) -> Dict:
         """Get analytics overview"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         # Total workflows
@@ -413,7 +393,7 @@ class EnhancedAPI:
         active_workflows = cursor.fetchone()[0]
         
         # Categories
-        cursor.execute("SELECT category, COUNT(*) FROM workflows GROUP BY category")
+        cursor.execute("SELECT COALESCE(category, 'Uncategorized'), COUNT(*) FROM workflows GROUP BY 1")
         categories = dict(cursor.fetchall())
         
         # Integrations
@@ -442,7 +422,7 @@ class EnhancedAPI:
     
     def _get_health_status(self) -> Dict:
         """Get health status and performance metrics"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         # Database health
@@ -474,7 +454,7 @@ class EnhancedAPI:
     
     def _get_related_workflows(self, workflow_id: str, limit: int = 5) -> List[Dict]:
         """Get related workflows based on similar integrations or categories"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         # Get current workflow details
@@ -2,15 +2,29 @@
 """
 Integration Hub for N8N Workflows
 Connect with external platforms and services.
+
+All outgoing calls share one pooled httpx.AsyncClient (keep-alive, so a
+large export reuses a few connections instead of a handshake per call).
+Requests to each host pass through a token-bucket RateLimiter set to
+that API's published limit, and 429/5xx responses and transport errors
+are retried with jittered exponential backoff, honoring Retry-After.
+Airtable and Notion exports submit their batches/pages concurrently
+(at most max_concurrency at a time) and report failures per batch
+instead of stopping at the first one.
 """
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.responses import HTMLResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Tuple
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 import httpx
 import json
 import asyncio
-from datetime import datetime
+import random
+import time
+from datetime import datetime, timezone
 import os
 
 class IntegrationConfig(BaseModel):
@@ -24,10 +38,138 @@ class WebhookPayload(BaseModel):
     data: Dict[str, Any]
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
 
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Delay requested by a Retry-After header (seconds or HTTP date), if any."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
 class IntegrationHub:
-    def __init__(self):
+    # Requests per second by host, from each API's documented limits
+    RATE_LIMITS = {
+        "api.airtable.com": 5,
+        "api.notion.com": 3,
+        "api.github.com": 10,
+    }
+    DEFAULT_RATE_LIMIT = 10
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    
+    def __init__(self, max_concurrency: int = 4, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 airtable_url: str = "https://api.airtable.com/v0",
+                 notion_url: str = "https://api.notion.com/v1"):
         self.integrations = {}
         self.webhook_endpoints = {}
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limits = {**self.RATE_LIMITS, **(rate_limits or {})}
+        self.airtable_url = airtable_url.rstrip("/")
+        self.notion_url = notion_url.rstrip("/")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self._limiters: Dict[str, RateLimiter] = {}
+    
+    def client(self) -> httpx.AsyncClient:
+        """The shared pooled client, created on first use in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # Pooled connections and limiter locks belong to one event loop
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                limits=httpx.Limits(max_connections=self.max_concurrency * 2,
+                                    max_keepalive_connections=self.max_concurrency),
+            )
+            self._client_loop = loop
+            self._limiters = {}
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared client (on application shutdown)."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    def _limiter(self, url: str) -> RateLimiter:
+        host = urlsplit(url).hostname or ""
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = RateLimiter(self.rate_limits.get(host, self.DEFAULT_RATE_LIMIT))
+        return limiter
+    
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Rate-limited request on the shared client, retrying 429/5xx and transport errors.
+        
+        Returns the last response (possibly still an error status); raises the
+        transport error if every attempt failed to connect.
+        """
+        client = self.client()
+        limiter = self._limiter(url)
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            delay = retry_after_seconds(response)
+            await asyncio.sleep(min(self.backoff_max, delay) if delay is not None else self._backoff(attempt))
+        return response
+    
+    async def _submit_all(self, jobs: List[Callable[[], Awaitable[Tuple[int, Optional[str]]]]]) -> Tuple[int, List[str]]:
+        """Run jobs with at most max_concurrency in flight; (items done, error messages)."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run(job):
+            async with semaphore:
+                try:
+                    return await job()
+                except Exception as e:
+                    return 0, str(e)
+        
+        results = await asyncio.gather(*(run(job) for job in jobs))
+        return sum(done for done, _ in results), [error for _, error in results if error]
     
     def register_integration(self, config: IntegrationConfig):
         """Register a new integration."""
@@ -36,174 +178,166 @@ class IntegrationHub:
     async def sync_with_github(self, repo: str, token: str) -> Dict[str, Any]:
         """Sync workflows with GitHub repository."""
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"token {token}"}
+            headers = {"Authorization": f"token {token}"}
+            
+            # Get repository contents
+            response = await self.request(
+                "GET",
+                f"https://api.github.com/repos/{repo}/contents/workflows",
+                headers=headers
+            )
+            
+            if response.status_code == 200:
+                files = response.json()
+                workflow_files = [f for f in files if f['name'].endswith('.json')]
                 
-                # Get repository contents
-                response = await client.get(
-                    f"https://api.github.com/repos/{repo}/contents/workflows",
-                    headers=headers
-                )
+                return {
+                    "status": "success",
+                    "repository": repo,
+                    "workflow_files": len(workflow_files),
+                    "files": [f['name'] for f in workflow_files]
+                }
+            else:
+                return {"status": "error", "message": "Failed to access repository"}
                 
-                if response.status_code == 200:
-                    files = response.json()
-                    workflow_files = [f for f in files if f['name'].endswith('.json')]
-                    
-                    return {
-                        "status": "success",
-                        "repository": repo,
-                        "workflow_files": len(workflow_files),
-                        "files": [f['name'] for f in workflow_files]
-                    }
-                else:
-                    return {"status": "error", "message": "Failed to access repository"}
-                    
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
     async def sync_with_slack(self, webhook_url: str, message: str) -> Dict[str, Any]:
         """Send notification to Slack."""
         try:
-            async with httpx.AsyncClient() as client:
-                payload = {
-                    "text": message,
-                    "username": "N8N Workflows Bot",
-                    "icon_emoji": ":robot_face:"
-                }
-                
-                response = await client.post(webhook_url, json=payload)
+            payload = {
+                "text": message,
+                "username": "N8N Workflows Bot",
+                "icon_emoji": ":robot_face:"
+            }
+            
+            response = await self.request("POST", webhook_url, json=payload)
+            
+            if response.status_code == 200:
+                return {"status": "success", "message": "Notification sent to Slack"}
+            else:
+                return {"status": "error", "message": "Failed to send to Slack"}
                 
-                if response.status_code == 200:
-                    return {"status": "success", "message": "Notification sent to Slack"}
-                else:
-                    return {"status": "error", "message": "Failed to send to Slack"}
-                    
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
     async def sync_with_discord(self, webhook_url: str, message: str) -> Dict[str, Any]:
         """Send notification to Discord."""
         try:
-            async with httpx.AsyncClient() as client:
-                payload = {
-                    "content": message,
-                    "username": "N8N Workflows Bot"
-                }
-                
-                response = await client.post(webhook_url, json=payload)
+            payload = {
+                "content": message,
+                "username": "N8N Workflows Bot"
+            }
+            
+            response = await self.request("POST", webhook_url, json=payload)
+            
+            if response.status_code == 204:
+                return {"status": "success", "message": "Notification sent to Discord"}
+            else:
+                return {"status": "error", "message": "Failed to send to Discord"}
                 
-                if response.status_code == 204:
-                    return {"status": "success", "message": "Notification sent to Discord"}
-                else:
-                    return {"status": "error", "message": "Failed to send to Discord"}
-                    
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
+    @staticmethod
+    def _export_result(target: str, verb: str, done: int, total: int, errors: List[str]) -> Dict[str, Any]:
+        if not errors:
+            return {"status": "success", "message": f"{verb} {done} workflows to {target}"}
+        return {
+            "status": "partial" if done else "error",
+            "message": f"{verb} {done} of {total} workflows to {target}; {len(errors)} requests failed",
+            "errors": errors[:10]
+        }
+    
     async def export_to_airtable(self, base_id: str, table_name: str, api_key: str, workflows: List[Dict]) -> Dict[str, Any]:
-        """Export workflows to Airtable."""
+        """Export workflows to Airtable (10-record batches, submitted concurrently)."""
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"Bearer {api_key}"}
-                
-                records = []
-                for workflow in workflows:
-                    record = {
-                        "fields": {
-                            "Name": workflow.get('name', ''),
-                            "Description": workflow.get('description', ''),
-                            "Trigger Type": workflow.get('trigger_type', ''),
-                            "Complexity": workflow.get('complexity', ''),
-                            "Node Count": workflow.get('node_count', 0),
-                            "Active": workflow.get('active', False),
-                            "Integrations": ", ".join(workflow.get('integrations', [])),
-                            "Last Updated": datetime.now().isoformat()
-                        }
+            headers = {"Authorization": f"Bearer {api_key}"}
+            url = f"{self.airtable_url}/{base_id}/{table_name}"
+            
+            records = []
+            for workflow in workflows:
+                record = {
+                    "fields": {
+                        "Name": workflow.get('name', ''),
+                        "Description": workflow.get('description', ''),
+                        "Trigger Type": workflow.get('trigger_type', ''),
+                        "Complexity": workflow.get('complexity', ''),
+                        "Node Count": workflow.get('node_count', 0),
+                        "Active": workflow.get('active', False),
+                        "Integrations": ", ".join(workflow.get('integrations', [])),
+                        "Last Updated": datetime.now().isoformat()
                     }
-                    records.append(record)
-                
-                # Create records in batches
-                batch_size = 10
-                created_records = 0
-                
-                for i in range(0, len(records), batch_size):
-                    batch = records[i:i + batch_size]
-                    
-                    response = await client.post(
-                        f"https://api.airtable.com/v0/{base_id}/{table_name}",
-                        headers=headers,
-                        json={"records": batch}
-                    )
-                    
-                    if response.status_code == 200:
-                        created_records += len(batch)
-                    else:
-                        return {"status": "error", "message": f"Failed to create records: {response.text}"}
-                
-                return {
-                    "status": "success",
-                    "message": f"Exported {created_records} workflows to Airtable"
                 }
-                
+                records.append(record)
+            
+            # Airtable creates at most 10 records per request
+            batch_size = 10
+            
+            def create(batch):
+                async def job():
+                    response = await self.request("POST", url, headers=headers, json={"records": batch})
+                    if response.status_code == 200:
+                        return len(batch), None
+                    return 0, f"Failed to create records: {response.text}"
+                return job
+            
+            created_records, errors = await self._submit_all(
+                [create(records[i:i + batch_size]) for i in range(0, len(records), batch_size)]
+            )
+            return self._export_result("Airtable", "Exported", created_records, len(records), errors)
+            
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
     async def sync_with_notion(self, database_id: str, token: str, workflows: List[Dict]) -> Dict[str, Any]:
-        """Sync workflows with Notion database."""
+        """Sync workflows with Notion database (one page per workflow, created concurrently)."""
         try:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                    "Notion-Version": "2022-06-28"
-                }
-                
-                created_pages = 0
-                
-                for workflow in workflows:
-                    page_data = {
-                        "parent": {"database_id": database_id},
-                        "properties": {
-                            "Name": {
-                                "title": [{"text": {"content": workflow.get('name', '')}}]
-                            },
-                            "Description": {
-                                "rich_text": [{"text": {"content": workflow.get('description', '')}}]
-                            },
-                            "Trigger Type": {
-                                "select": {"name": workflow.get('trigger_type', '')}
-                            },
-                            "Complexity": {
-                                "select": {"name": workflow.get('complexity', '')}
-                            },
-                            "Node Count": {
-                                "number": workflow.get('node_count', 0)
-                            },
-                            "Active": {
-                                "checkbox": workflow.get('active', False)
-                            },
-                            "Integrations": {
-                                "multi_select": [{"name": integration} for integration in workflow.get('integrations', [])]
-                            }
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+                "Notion-Version": "2022-06-28"
+            }
+            
+            def create(workflow):
+                page_data = {
+                    "parent": {"database_id": database_id},
+                    "properties": {
+                        "Name": {
+                            "title": [{"text": {"content": workflow.get('name', '')}}]
+                        },
+                        "Description": {
+                            "rich_text": [{"text": {"content": workflow.get('description', '')}}]
+                        },
+                        "Trigger Type": {
+                            "select": {"name": workflow.get('trigger_type', '')}
+                        },
+                        "Complexity": {
+                            "select": {"name": workflow.get('complexity', '')}
+                        },
+                        "Node Count": {
+                            "number": workflow.get('node_count', 0)
+                        },
+                        "Active": {
+                            "checkbox": workflow.get('active', False)
+                        },
+                        "Integrations": {
+                            "multi_select": [{"name": integration} for integration in workflow.get('integrations', [])]
                         }
                     }
-                    
-                    response = await client.post(
-                        "https://api.notion.com/v1/pages",
-                        headers=headers,
-                        json=page_data
-                    )
-                    
-                    if response.status_code == 200:
-                        created_pages += 1
-                    else:
-                        return {"status": "error", "message": f"Failed to create page: {response.text}"}
-                
-                return {
-                    "status": "success",
-                    "message": f"Synced {created_pages} workflows to Notion"
                 }
                 
+                async def job():
+                    response = await self.request("POST", f"{self.notion_url}/pages", headers=headers, json=page_data)
+                    if response.status_code == 200:
+                        return 1, None
+                    return 0, f"Failed to create page: {response.text}"
+                return job
+            
+            created_pages, errors = await self._submit_all([create(workflow) for workflow in workflows])
+            return self._export_result("Notion", "Synced", created_pages, len(workflows), errors)
+            
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
@@ -224,6 +358,10 @@ integration_hub = IntegrationHub()
 # FastAPI app for Integration Hub
 integration_app = FastAPI(title="N8N Integration Hub", version="1.0.0")
 
+@integration_app.on_event("shutdown")
+async def close_integration_client():
+    await integration_hub.aclose()
+
 @integration_app.post("/integrations/github/sync")
 async def sync_github(repo: str, token: str):
     """Sync workflows with GitHub repository."""
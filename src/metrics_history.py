@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Metrics History for the Performance Monitor
+Fixed-memory ring buffers with tiered rollups and SQLite persistence.
+
+Samples land in a raw 5-second tier; each coarser tier (1 minute, 1 hour)
+is fed by rolling up the samples of its bucket as the bucket closes. Every
+tier is an array-backed ring of fixed capacity, so memory stays constant
+no matter how long the monitor runs, and a 24-hour query is answered from
+the 1-minute tier instead of 17,280 raw samples.
+
+Closed rollup points are written to SQLite in batches and reloaded on
+start, so history survives restarts. The database file is only created
+by the first flush, so constructing a MetricsHistory (e.g. at import of
+performance_monitor) touches no files.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Field name -> how samples are combined when rolled up into a coarser tier
+# avg: mean of the samples; sum: total over the bucket; max: peak; last: latest value
+HISTORY_FIELDS: Dict[str, str] = {
+    'cpu_usage': 'avg',
+    'memory_usage': 'avg',
+    'disk_usage': 'avg',
+    'active_connections': 'avg',
+    'database_size': 'last',
+    'workflow_executions': 'sum',
+    'error_rate': 'avg',
+    'requests_in_interval': 'sum',
+    'in_flight_requests': 'max',
+    'api_p95_max_ms': 'max',
+    'bytes_sent': 'last',
+    'bytes_recv': 'last',
+}
+
+# (name, resolution in seconds, capacity): 1h of 5s samples, 24h of minutes, 30 days of hours
+DEFAULT_TIERS: Tuple[Tuple[str, int, int], ...] = (
+    ('5s', 5, 720),
+    ('1m', 60, 1440),
+    ('1h', 3600, 720),
+)
+
+
+class RingBuffer:
+    """Array-backed ring of timestamped rows with a fixed set of float fields."""
+
+    def __init__(self, capacity: int, fields: Sequence[str]):
+        self.capacity = capacity
+        self.fields = list(fields)
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.columns = {name: array('d', bytes(8 * capacity)) for name in self.fields}
+        self.start = 0
+        self.size = 0
+
+    def append(self, timestamp: float, values: Dict[str, float]):
+        if self.size < self.capacity:
+            index = (self.start + self.size) % self.capacity
+            self.size += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.timestamps[index] = timestamp
+        for name in self.fields:
+            self.columns[name][index] = values.get(name, 0.0)
+
+    def _index(self, position: int) -> int:
+        return (self.start + position) % self.capacity
+
+    def first_position_at_or_after(self, timestamp: float) -> int:
+        """Binary search over the (time-ordered) ring."""
+        low, high = 0, self.size
+        while low < high:
+            mid = (low + high) // 2
+            if self.timestamps[self._index(mid)] < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def rows(self, since: float = 0.0) -> List[Dict[str, float]]:
+        result = []
+        for position in range(self.first_position_at_or_after(since), self.size):
+            index = self._index(position)
+            row = {'timestamp': self.timestamps[index]}
+            for name in self.fields:
+                row[name] = self.columns[name][index]
+            result.append(row)
+        return result
+
+    def last(self, count: int) -> List[Dict[str, float]]:
+        if not self.size:
+            return []
+        since_position = max(0, self.size - count)
+        return self.rows(self.timestamps[self._index(since_position)])
+
+    def oldest(self) -> Optional[float]:
+        return self.timestamps[self.start] if self.size else None
+
+
+class Rollup:
+    """Accumulates samples for the currently open bucket of a tier."""
+
+    __slots__ = ('bucket_start', 'count', 'values')
+
+    def __init__(self):
+        self.bucket_start: Optional[float] = None
+        self.count = 0
+        self.values: Dict[str, float] = {}
+
+    def add(self, values: Dict[str, float]):
+        for name, mode in HISTORY_FIELDS.items():
+            value = values.get(name, 0.0)
+            if self.count == 0:
+                self.values[name] = value
+            elif mode == 'avg' or mode == 'sum':
+                self.values[name] += value
+            elif mode == 'max':
+                self.values[name] = max(self.values[name], value)
+            else:
+                self.values[name] = value
+        self.count += 1
+
+    def close(self) -> Dict[str, float]:
+        row = dict(self.values)
+        for name, mode in HISTORY_FIELDS.items():
+            if mode == 'avg' and self.count:
+                row[name] /= self.count
+        self.count = 0
+        self.values = {}
+        return row
+
+
+class MetricsHistory:
+    """Tiered, fixed-memory metrics history with optional SQLite persistence."""
+
+    def __init__(self, db_path: Optional[str] = "database/metrics_history.db",
+                 tiers: Sequence[Tuple[str, int, int]] = DEFAULT_TIERS):
+        self.db_path = db_path
+        self.tiers = [(name, resolution, RingBuffer(capacity, HISTORY_FIELDS))
+                      for name, resolution, capacity in tiers]
+        self._rollups = {name: Rollup() for name, _, _ in self.tiers[1:]}
+        self._pending: List[Tuple[str, float, str]] = []
+        self._lock = threading.Lock()
+        self._db_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection to the store, creating the file and table on first use."""
+        if not self._db_ready and self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        if not self._db_ready or self.db_path == ':memory:':
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metrics_history (
+                    tier TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    metrics TEXT NOT NULL,
+                    PRIMARY KEY (tier, timestamp)
+                )
+            """)
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def add(self, values: Dict[str, float], timestamp: Optional[float] = None):
+        """Record one raw sample and close any rollup buckets it moves past."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            raw_name, _, raw = self.tiers[0]
+            raw.append(timestamp, values)
+            if self.db_path:
+                self._pending.append((raw_name, timestamp, values))
+
+            for name, resolution, ring in self.tiers[1:]:
+                rollup = self._rollups[name]
+                bucket_start = timestamp - (timestamp % resolution)
+                if rollup.bucket_start is not None and bucket_start != rollup.bucket_start and rollup.count:
+                    row = rollup.close()
+                    ring.append(rollup.bucket_start, row)
+                    if self.db_path:
+                        self._pending.append((name, rollup.bucket_start, row))
+                rollup.bucket_start = bucket_start
+                rollup.add(values)
+
+    def latest(self, count: int = 1) -> List[Dict[str, float]]:
+        with self._lock:
+            return self.tiers[0][2].last(count)
+
+    def query(self, hours: float = 24, max_points: Optional[int] = None) -> Tuple[int, List[Dict[str, float]]]:
+        """(resolution seconds, points) for the last `hours`, from the finest tier covering them."""
+        since = time.time() - hours * 3600
+        with self._lock:
+            chosen = self.tiers[-1]
+            for tier in self.tiers:
+                oldest = tier[2].oldest()
+                span = tier[1] * tier[2].capacity
+                if span >= hours * 3600 or (oldest is not None and oldest <= since):
+                    chosen = tier
+                    break
+            _, resolution, ring = chosen
+            points = ring.rows(since)
+
+        if max_points and len(points) > max_points:
+            resolution, points = self._downsample(points, resolution, max_points)
+        return resolution, points
+
+    @staticmethod
+    def _downsample(points: List[Dict[str, float]], resolution: int,
+                    max_points: int) -> Tuple[int, List[Dict[str, float]]]:
+        """Merge adjacent points so at most max_points remain."""
+        group = -(-len(points) // max_points)
+        merged = []
+        for offset in range(0, len(points), group):
+            rollup = Rollup()
+            chunk = points[offset:offset + group]
+            for point in chunk:
+                rollup.add(point)
+            row = rollup.close()
+            row['timestamp'] = chunk[0]['timestamp']
+            merged.append(row)
+        return resolution * group, merged
+
+    def flush(self) -> int:
+        """Write pending points to SQLite and drop rows older than each tier's retention."""
+        if not self.db_path:
+            return 0
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO metrics_history (tier, timestamp, metrics) VALUES (?, ?, ?)",
+                [(tier, timestamp, json.dumps(values)) for tier, timestamp, values in pending])
+            now = time.time()
+            for name, resolution, ring in self.tiers:
+                conn.execute("DELETE FROM metrics_history WHERE tier = ? AND timestamp < ?",
+                             (name, now - resolution * ring.capacity))
+            conn.commit()
+        finally:
+            conn.close()
+        return len(pending)
+
+    def load(self) -> int:
+        """Refill the rings from SQLite after a restart."""
+        if not self.db_path:
+            return 0
+        if self.db_path != ':memory:' and not Path(self.db_path).exists():
+            return 0  # nothing persisted yet
+        conn = self._connect()
+        loaded = 0
+        try:
+            with self._lock:
+                for name, resolution, ring in self.tiers:
+                    rows = conn.execute(
+                        "SELECT timestamp, metrics FROM metrics_history WHERE tier = ? "
+                        "ORDER BY timestamp DESC LIMIT ?", (name, ring.capacity)).fetchall()
+                    for timestamp, metrics in reversed(rows):
+                        ring.append(timestamp, json.loads(metrics))
+                        loaded += 1
+        finally:
+            conn.close()
+        return loaded
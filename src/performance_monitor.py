@@ -4,10 +4,12 @@ Performance Monitoring System for N8N Workflows
 Real-time metrics, monitoring, and alerting.
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import asyncio
+import os
+import sys
 import time
 import psutil
 import sqlite3
@@ -15,6 +17,16 @@ from datetime import datetime, timedelta
 import json
 import threading
 import queue
+from pathlib import Path
+
+from metrics_history import MetricsHistory
+
+try:
+    from request_metrics import REQUEST_METRICS, RequestMetrics, RequestMetricsMiddleware
+except ImportError:  # started from src/, request_metrics lives at the repository root
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from request_metrics import REQUEST_METRICS, RequestMetrics, RequestMetricsMiddleware
+from broadcast_hub import BROADCAST_HUB, BroadcastHub
 
 class PerformanceMetrics(BaseModel):
     timestamp: str
@@ -27,6 +39,9 @@ class PerformanceMetrics(BaseModel):
     database_size: int
     workflow_executions: int
     error_rate: float
+    api_latency: Dict[str, Dict[str, Any]] = {}
+    requests_in_interval: int = 0
+    in_flight_requests: int = 0
 
 class Alert(BaseModel):
     id: str
@@ -37,31 +52,51 @@ class Alert(BaseModel):
     resolved: bool = False
 
 class PerformanceMonitor:
-    def __init__(self, db_path: str = "workflows.db"):
+    def __init__(self, db_path: str = "workflows.db", request_metrics: Optional[RequestMetrics] = None,
+                 connections_interval: float = 60.0, history_db_path: Optional[str] = "database/metrics_history.db"):
         self.db_path = db_path
-        self.metrics_history = []
+        self.latest_metrics: Optional[PerformanceMetrics] = None
+        # Fixed-memory 5s/1m/1h history, persisted so it survives restarts
+        self.metrics_history = MetricsHistory(history_db_path)
+        self.history_flush_every = 12  # ticks, i.e. once a minute
         self.alerts = []
-        self.websocket_connections = []
+        # Shared with the API so index events reach the same dashboard clients
+        self.hub: BroadcastHub = BROADCAST_HUB
         self.monitoring_active = False
         self.metrics_queue = queue.Queue()
         
+        # Real request latency recorded by RequestMetricsMiddleware
+        self.request_metrics = request_metrics or REQUEST_METRICS
+        self.request_window = self.request_metrics.window()
+        
+        # net_connections() walks every socket on the host; sample it sparingly
+        self.connections_interval = connections_interval
+        self._connections_sample = (0, 0.0)
+        
     def start_monitoring(self):
         """Start performance monitoring in background thread."""
         if not self.monitoring_active:
             self.monitoring_active = True
+            psutil.cpu_percent(interval=None)  # prime the non-blocking CPU sampler
+            try:
+                self.metrics_history.load()
+            except sqlite3.Error as e:
+                print(f"Could not load metrics history: {e}")
             monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
             monitor_thread.start()
     
     def _monitor_loop(self):
         """Main monitoring loop."""
+        ticks = 0
         while self.monitoring_active:
             try:
                 metrics = self._collect_metrics()
-                self.metrics_history.append(metrics)
+                self.latest_metrics = metrics
+                self.metrics_history.add(self._history_values(metrics))
                 
-                # Keep only last 1000 metrics
-                if len(self.metrics_history) > 1000:
-                    self.metrics_history = self.metrics_history[-1000:]
+                ticks += 1
+                if ticks % self.history_flush_every == 0:
+                    self.metrics_history.flush()
                 
                 # Check for alerts
                 self._check_alerts(metrics)
@@ -77,8 +112,8 @@ class PerformanceMonitor:
     
     def _collect_metrics(self) -> PerformanceMetrics:
         """Collect current system metrics."""
-        # CPU and Memory
-        cpu_usage = psutil.cpu_percent(interval=1)
+        # CPU and Memory (CPU usage since the previous call, without blocking)
+        cpu_usage = psutil.cpu_percent(interval=None)
         memory = psutil.virtual_memory()
         memory_usage = memory.percent
         
@@ -95,27 +130,29 @@ class PerformanceMonitor:
             "packets_recv": network.packets_recv
         }
         
-        # API response times (simulated)
-        api_response_times = {
-            "/api/stats": self._measure_api_time("/api/stats"),
-            "/api/workflows": self._measure_api_time("/api/workflows"),
-            "/api/search": self._measure_api_time("/api/workflows?q=test")
-        }
+        # API latency per route for requests finished since the last sample
+        api_latency = self.request_window.collect()
+        api_response_times = {route: stats['p95_ms'] for route, stats in api_latency.items()}
+        requests_in_interval = sum(stats['count'] for stats in api_latency.values())
         
         # Active connections
-        active_connections = len(psutil.net_connections())
+        active_connections = self._count_connections()
         
         # Database size
         try:
             db_size = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
-        except:
+        except OSError:
             db_size = 0
         
-        # Workflow executions (simulated)
-        workflow_executions = self._get_workflow_executions()
+        # Workflow API requests served (search, detail, download, diagram) since the last sample
+        workflow_executions = sum(
+            stats['count'] for route, stats in api_latency.items()
+            if '/workflows' in route
+        )
         
-        # Error rate (simulated)
-        error_rate = self._calculate_error_rate()
+        # Error rate: share of 5xx responses since the last sample
+        errors = sum(stats['errors'] for stats in api_latency.values())
+        error_rate = round(errors / requests_in_interval * 100, 2) if requests_in_interval else 0.0
         
         return PerformanceMetrics(
             timestamp=datetime.now().isoformat(),
@@ -127,26 +164,41 @@ class PerformanceMonitor:
             active_connections=active_connections,
             database_size=db_size,
             workflow_executions=workflow_executions,
-            error_rate=error_rate
+            error_rate=error_rate,
+            api_latency=api_latency,
+            requests_in_interval=requests_in_interval,
+            in_flight_requests=self.request_metrics.in_flight
         )
     
-    def _measure_api_time(self, endpoint: str) -> float:
-        """Measure API response time (simulated)."""
-        # In a real implementation, this would make actual HTTP requests
-        import random
-        return round(random.uniform(10, 100), 2)
-    
-    def _get_workflow_executions(self) -> int:
-        """Get number of workflow executions (simulated)."""
-        # In a real implementation, this would query execution logs
-        import random
-        return random.randint(0, 50)
+    def _history_values(self, metrics: PerformanceMetrics) -> Dict[str, float]:
+        """Numeric fields kept in the metrics history."""
+        return {
+            'cpu_usage': metrics.cpu_usage,
+            'memory_usage': metrics.memory_usage,
+            'disk_usage': metrics.disk_usage,
+            'active_connections': metrics.active_connections,
+            'database_size': metrics.database_size,
+            'workflow_executions': metrics.workflow_executions,
+            'error_rate': metrics.error_rate,
+            'requests_in_interval': metrics.requests_in_interval,
+            'in_flight_requests': metrics.in_flight_requests,
+            'api_p95_max_ms': max(metrics.api_response_times.values(), default=0.0),
+            'bytes_sent': metrics.network_io.get('bytes_sent', 0),
+            'bytes_recv': metrics.network_io.get('bytes_recv', 0)
+        }
     
-    def _calculate_error_rate(self) -> float:
-        """Calculate error rate (simulated)."""
-        # In a real implementation, this would analyze error logs
-        import random
-        return round(random.uniform(0, 5), 2)
+    def _count_connections(self) -> int:
+        """Number of inet connections, refreshed at most every connections_interval seconds."""
+        count, sampled_at = self._connections_sample
+        now = time.monotonic()
+        if sampled_at and now - sampled_at < self.connections_interval:
+            return count
+        try:
+            count = len(psutil.net_connections(kind='inet'))
+        except (psutil.AccessDenied, OSError):
+            pass
+        self._connections_sample = (count, now)
+        return count
     
     def _check_alerts(self, metrics: PerformanceMetrics):
         """Check metrics against alert thresholds."""
@@ -162,10 +214,10 @@ class PerformanceMonitor:
         if metrics.disk_usage > 90:
             self._create_alert("high_disk", "critical", f"High disk usage: {metrics.disk_usage}%")
         
-        # API response time alert
+        # API response time alert (p95 over the last interval)
         for endpoint, response_time in metrics.api_response_times.items():
             if response_time > 1000:  # 1 second
-                self._create_alert("slow_api", "warning", f"Slow API response: {endpoint} ({response_time}ms)")
+                self._create_alert("slow_api", "warning", f"Slow API response: {endpoint} (p95 {response_time}ms)")
         
         # Error rate alert
         if metrics.error_rate > 10:
@@ -188,43 +240,29 @@ class PerformanceMonitor:
             self._broadcast_alert(alert)
     
     def _broadcast_metrics(self, metrics: PerformanceMetrics):
-        """Broadcast metrics to all websocket connections."""
-        if self.websocket_connections:
-            message = {
+        """Broadcast metrics to dashboard clients (serialized once per tick)."""
+        if self.hub.has_subscribers("metrics"):
+            self.hub.publish("metrics", {
                 "type": "metrics",
                 "data": metrics.dict()
-            }
-            self._broadcast_to_websockets(message)
+            })
     
     def _broadcast_alert(self, alert: Alert):
-        """Broadcast alert to all websocket connections."""
-        message = {
+        """Broadcast alert to dashboard clients."""
+        self.hub.publish("alerts", {
             "type": "alert",
             "data": alert.dict()
-        }
-        self._broadcast_to_websockets(message)
-    
-    def _broadcast_to_websockets(self, message: dict):
-        """Broadcast message to all websocket connections."""
-        disconnected = []
-        for websocket in self.websocket_connections:
-            try:
-                asyncio.create_task(websocket.send_text(json.dumps(message)))
-            except:
-                disconnected.append(websocket)
-        
-        # Remove disconnected connections
-        for ws in disconnected:
-            self.websocket_connections.remove(ws)
+        })
     
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Get performance metrics summary."""
-        if not self.metrics_history:
+        latest = self.latest_metrics
+        if latest is None:
             return {"message": "No metrics available"}
         
-        latest = self.metrics_history[-1]
-        avg_cpu = sum(m.cpu_usage for m in self.metrics_history[-10:]) / min(10, len(self.metrics_history))
-        avg_memory = sum(m.memory_usage for m in self.metrics_history[-10:]) / min(10, len(self.metrics_history))
+        recent = self.metrics_history.latest(10)
+        avg_cpu = sum(m['cpu_usage'] for m in recent) / len(recent)
+        avg_memory = sum(m['memory_usage'] for m in recent) / len(recent)
         
         return {
             "current": latest.dict(),
@@ -236,15 +274,13 @@ class PerformanceMonitor:
             "status": "healthy" if latest.cpu_usage < 80 and latest.memory_usage < 85 else "warning"
         }
     
-    def get_historical_metrics(self, hours: int = 24) -> List[Dict]:
-        """Get historical metrics for specified hours."""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        cutoff_timestamp = cutoff_time.isoformat()
-        
-        return [
-            metrics.dict() for metrics in self.metrics_history
-            if metrics.timestamp >= cutoff_timestamp
-        ]
+    def get_historical_metrics(self, hours: int = 24, max_points: Optional[int] = 500) -> List[Dict]:
+        """Get historical metrics for specified hours, downsampled to at most max_points."""
+        resolution, points = self.metrics_history.query(hours, max_points)
+        for point in points:
+            point['timestamp'] = datetime.fromtimestamp(point['timestamp']).isoformat()
+            point['resolution_seconds'] = resolution
+        return points
     
     def resolve_alert(self, alert_id: str) -> bool:
         """Resolve an alert."""
@@ -256,10 +292,26 @@ class PerformanceMonitor:
 
 # Initialize performance monitor
 performance_monitor = PerformanceMonitor()
-performance_monitor.start_monitoring()
 
 # FastAPI app for Performance Monitoring
 monitor_app = FastAPI(title="N8N Performance Monitor", version="1.0.0")
+monitor_app.add_middleware(RequestMetricsMiddleware, metrics=performance_monitor.request_metrics)
+
+@monitor_app.on_event("startup")
+async def start_performance_monitor():
+    """Start sampling once the server is up."""
+    performance_monitor.start_monitoring()
+
+@monitor_app.get("/monitor/latency")
+async def get_request_latency():
+    """Cumulative per-route latency percentiles and status counts."""
+    metrics = performance_monitor.request_metrics
+    return {
+        "in_flight": metrics.in_flight,
+        "max_in_flight": metrics.max_in_flight,
+        "total_requests": metrics.total_requests,
+        "routes": metrics.snapshot()
+    }
 
 @monitor_app.get("/monitor/metrics")
 async def get_current_metrics():
@@ -267,9 +319,9 @@ async def get_current_metrics():
     return performance_monitor.get_metrics_summary()
 
 @monitor_app.get("/monitor/history")
-async def get_historical_metrics(hours: int = 24):
-    """Get historical performance metrics."""
-    return performance_monitor.get_historical_metrics(hours)
+async def get_historical_metrics(hours: float = 24, max_points: int = 500):
+    """Get historical performance metrics (5s, 1min or 1h resolution depending on the range)."""
+    return performance_monitor.get_historical_metrics(hours, max_points)
 
 @monitor_app.get("/monitor/alerts")
 async def get_alerts():
@@ -286,17 +338,15 @@ async def resolve_alert(alert_id: str):
         return {"message": "Alert not found"}
 
 @monitor_app.websocket("/monitor/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time metrics."""
-    await websocket.accept()
-    performance_monitor.websocket_connections.append(websocket)
-    
-    try:
-        while True:
-            # Keep connection alive
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        performance_monitor.websocket_connections.remove(websocket)
+async def websocket_endpoint(websocket: WebSocket, channels: Optional[str] = None):
+    """WebSocket endpoint for real-time metrics, alerts and index events (?channels=metrics,alerts)."""
+    wanted = channels.split(",") if channels else None
+    await performance_monitor.hub.serve(websocket, wanted)
+
+@monitor_app.get("/monitor/ws/stats")
+async def websocket_stats():
+    """Connected clients, queued and dropped messages."""
+    return performance_monitor.hub.stats()
 
 @monitor_app.get("/monitor/dashboard")
 async def get_monitoring_dashboard():
@@ -492,7 +542,7 @@ async def get_monitoring_dashboard():
             
             function connectWebSocket() {
                 const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-                const wsUrl = `${protocol}//${window.location.host}/monitor/ws`;
+                const wsUrl = `${protocol}//${window.location.host}/monitor/ws?channels=metrics,alerts`;
                 
                 ws = new WebSocket(wsUrl);
                 
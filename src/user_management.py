@@ -8,12 +8,19 @@ from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 from typing import List, Dict, Any, Optional
-import sqlite3
 import hashlib
 import secrets
 import jwt
 from datetime import datetime, timedelta
 import json
+import sys
+from pathlib import Path
+
+try:
+    from metrics_registry import connect
+except ImportError:  # started from src/, metrics_registry lives at the repository root
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from metrics_registry import connect
 
 # Configuration
 SECRET_KEY = "your-secret-key-change-in-production"
@@ -61,7 +68,7 @@ class UserManager:
     
     def init_database(self):
         """Initialize user database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -108,7 +115,7 @@ class UserManager:
     
     def create_default_admin(self):
         """Create default admin user if none exists."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
@@ -138,7 +145,7 @@ class UserManager:
     
     def create_user(self, user_data: UserCreate) -> User:
         """Create a new user."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -177,7 +184,7 @@ class UserManager:
     
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Authenticate user and return user data."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -232,7 +239,7 @@ class UserManager:
     
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -258,7 +265,7 @@ class UserManager:
     
     def get_all_users(self) -> List[User]:
         """Get all users."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -283,7 +290,7 @@ class UserManager:
     
     def update_user(self, user_id: int, update_data: UserUpdate) -> Optional[User]:
         """Update user data."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -326,7 +333,7 @@ class UserManager:
     
     def delete_user(self, user_id: int) -> bool:
         """Delete user (soft delete by setting active=False)."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -7,16 +7,90 @@ Automatically cleans and organizes workflows on startup
 import json
 import os
 import sys
+import hashlib
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import re
 from collections import defaultdict
 
+# Bump whenever the cleaning rules change so previously cleaned files are rechecked
+CLEANER_VERSION = 1
+DEFAULT_MANIFEST_PATH = "database/startup_cleaner_manifest.json"
+
 class WorkflowStartupCleaner:
-    def __init__(self, workflows_dir="workflows"):
+    def __init__(self, workflows_dir="workflows", manifest_path: Optional[str] = DEFAULT_MANIFEST_PATH):
         self.workflows_dir = Path(workflows_dir)
+        self.manifest_path = Path(manifest_path) if manifest_path else None
         self.cleaned_count = 0
+        self.skipped_count = 0
         self.errors = 0
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+    
+    def get_file_hash(self, file_path: Path) -> str:
+        """Get MD5 hash of file for change detection."""
+        hash_md5 = hashlib.md5()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                hash_md5.update(chunk)
+        return hash_md5.hexdigest()
+    
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Load the manifest of already-cleaned files (empty if missing or stale)."""
+        self.manifest = {}
+        if not self.manifest_path or not self.manifest_path.exists():
+            return self.manifest
+        
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️ Ignoring unreadable cleaner manifest: {e}")
+            return self.manifest
+        
+        if data.get('version') == CLEANER_VERSION and isinstance(data.get('files'), dict):
+            self.manifest = data['files']
+        return self.manifest
+    
+    def save_manifest(self):
+        """Atomically write the manifest next to the database."""
+        if not self.manifest_path:
+            return
+        
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(self.manifest_path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CLEANER_VERSION, 'files': self.manifest}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path)
+    
+    def is_unchanged(self, file_path: Path, key: str) -> bool:
+        """Check whether a file matches its manifest entry.
+        
+        Size and mtime are compared first so unchanged files cost a single
+        stat() call; the hash is only computed when the stat data differs.
+        """
+        entry = self.manifest.get(key)
+        if not entry:
+            return False
+        
+        stat = file_path.stat()
+        if entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+        
+        if entry.get('size') == stat.st_size and entry.get('hash') == self.get_file_hash(file_path):
+            # Content is identical (e.g. touched or checked out again), refresh stat data
+            entry['mtime_ns'] = stat.st_mtime_ns
+            return True
+        
+        return False
+    
+    def record_clean(self, file_path: Path, key: str):
+        """Remember the current state of a file that is known to be clean."""
+        stat = file_path.stat()
+        self.manifest[key] = {
+            'hash': self.get_file_hash(file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        }
         
     def clean_workflow_file(self, file_path: Path) -> bool:
         """Clean a single workflow file."""
@@ -249,40 +323,85 @@ class WorkflowStartupCleaner:
         
         return False
     
-    def clean_all_workflows(self) -> Dict[str, int]:
-        """Clean all workflow files."""
+    def clean_all_workflows(self, incremental: bool = True) -> Dict[str, int]:
+        """Clean all workflow files.
+        
+        With incremental=True, files whose size/mtime/hash match the manifest
+        from a previous run are skipped without being parsed.
+        """
         print("🧹 Starting workflow cleanup...")
         
         if not self.workflows_dir.exists():
             print(f"❌ Workflows directory not found: {self.workflows_dir}")
-            return {'cleaned': 0, 'errors': 0, 'total': 0}
+            return {'cleaned': 0, 'skipped': 0, 'errors': 0, 'total': 0}
         
         json_files = list(self.workflows_dir.rglob("*.json"))
         total_files = len(json_files)
         
         print(f"📁 Found {total_files} workflow files")
         
+        if incremental:
+            self.load_manifest()
+        else:
+            self.manifest = {}
+        
+        seen_keys = set()
         for file_path in json_files:
+            key = file_path.relative_to(self.workflows_dir).as_posix()
+            seen_keys.add(key)
+            
+            try:
+                if incremental and self.is_unchanged(file_path, key):
+                    self.skipped_count += 1
+                    continue
+            except OSError:
+                pass
+            
+            errors_before = self.errors
             self.clean_workflow_file(file_path)
+            if self.errors == errors_before:
+                self.record_clean(file_path, key)
+            else:
+                self.manifest.pop(key, None)
+        
+        # Drop entries for files that no longer exist
+        for key in list(self.manifest):
+            if key not in seen_keys:
+                del self.manifest[key]
+        
+        try:
+            self.save_manifest()
+        except OSError as e:
+            print(f"⚠️ Could not save cleaner manifest: {e}")
         
         print(f"\n🎉 Cleanup complete!")
         print(f"   ✅ Cleaned: {self.cleaned_count} workflows")
+        print(f"   ⏭️ Skipped (unchanged): {self.skipped_count} workflows")
         print(f"   ❌ Errors: {self.errors} workflows")
         print(f"   📊 Total: {total_files} workflows")
         
         return {
             'cleaned': self.cleaned_count,
+            'skipped': self.skipped_count,
             'errors': self.errors,
             'total': total_files
         }
 
 def main():
     """Main cleanup function."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='N8N Workflow Startup Cleaner')
+    parser.add_argument('--workflows-dir', default='workflows', help='Workflows directory')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST_PATH, help='Path of the cleaned-files manifest')
+    parser.add_argument('--full', action='store_true', help='Ignore the manifest and recheck every file')
+    args = parser.parse_args()
+    
     print("🚀 N8N Workflow Startup Cleaner")
     print("=" * 50)
     
-    cleaner = WorkflowStartupCleaner()
-    stats = cleaner.clean_all_workflows()
+    cleaner = WorkflowStartupCleaner(args.workflows_dir, manifest_path=args.manifest)
+    stats = cleaner.clean_all_workflows(incremental=not args.full)
     
     if stats['cleaned'] > 0:
         print(f"\n✨ {stats['cleaned']} workflows have been cleaned and organized!")
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Synthetic Workflow Generator
+Deterministic, realistic n8n workflow JSON at arbitrary scale (10k-1M files)
+for load-testing the indexer, graph analyzers and API.
+
+Workflow i of a corpus is generated from its own Random(seed, i), so the
+corpus is byte-identical on every run for the same seed and spec, any
+single file can be regenerated on its own, and generation parallelizes
+across processes without changing the output. Each corpus gets a
+manifest.json with its parameters and a content digest.
+
+Realism:
+  - integrations are drawn from node_classifier.SERVICE_MAPPINGS (the same
+    table analyze_nodes classifies with), with a Zipf-like popularity
+    skew so a few services dominate, as in the real collection
+  - node counts follow a log-normal distribution between --min-nodes and
+    --max-nodes around --mean-nodes
+  - connection topologies: plain chains, IF branches that re-merge,
+    diamonds (split -> parallel arms -> merge), fan-out, and rare large
+    fan-out (hundreds of targets from one node)
+  - typical parameters, credentials, Code node bodies and sticky notes
+
+Files are laid out like the real collection:
+  <root>/workflows/<Service>/<NNNNNN>_<Service>_<Other>_<Action>_<Trigger>.json
+
+Usage:
+  python synthetic_workflows.py --count 100000 --output /tmp/corpus --workers 8
+  python synthetic_workflows.py --count 10000 --output /tmp/c --topologies chain=1,large_fan_out=1
+  python synthetic_workflows.py --count 1000000 --output /tmp/c --dry-run   # digest only
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from node_classifier import SERVICE_MAPPINGS
+
+# Services most often seen in the real corpus; they head the popularity ranking
+POPULAR_SERVICES = ['googlesheets', 'slack', 'telegram', 'gmail', 'openai', 'notion', 'airtable',
+                    'postgres', 'discord', 'github', 'googledrive', 'hubspot', 'stripe']
+# Mapped names that are triggers or generic nodes rather than integrations
+NON_INTEGRATIONS = {'webhook', 'form', 'sse', 'graphql'}
+
+INTEGRATIONS: List[Tuple[str, str]] = sorted(
+    ((key, name) for key, name in SERVICE_MAPPINGS.items()
+     if name and key == key.lower() and key not in NON_INTEGRATIONS),
+    key=lambda item: POPULAR_SERVICES.index(item[0]) if item[0] in POPULAR_SERVICES else len(POPULAR_SERVICES)
+)
+
+UTILITY_NODES = ['set', 'code', 'httpRequest', 'filter', 'dateTime', 'aggregate', 'noOp', 'wait',
+                 'splitInBatches', 'removeDuplicates']
+# (node type template, filename trigger label, weight); {service} is the primary integration
+TRIGGERS: List[Tuple[str, str, int]] = [
+    ('n8n-nodes-base.webhook', 'Webhook', 30),
+    ('n8n-nodes-base.scheduleTrigger', 'Scheduled', 25),
+    ('n8n-nodes-base.manualTrigger', 'Triggered', 25),
+    ('n8n-nodes-base.{service}Trigger', 'Triggered', 20),
+]
+ACTIONS = ['Create', 'Update', 'Send', 'Sync', 'Monitor', 'Process', 'Automate', 'Import', 'Export', 'Notify']
+OPERATIONS = ['create', 'update', 'get', 'getAll', 'delete', 'send', 'append', 'upsert']
+WORDS = ('data record customer order invoice lead message report summary item payload status '
+         'update sync notify channel sheet row table contact ticket event schedule result').split()
+
+DEFAULT_TOPOLOGIES = {'chain': 45, 'branch': 25, 'diamond': 15, 'fan_out': 13, 'large_fan_out': 2}
+CHUNK_SIZE = 1000  # digest granularity; fixed so the digest does not depend on --workers
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of the generated workflows."""
+    min_nodes: int = 2
+    max_nodes: int = 60
+    mean_nodes: float = 12.0
+    topologies: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_TOPOLOGIES))
+    skew: float = 1.1                      # Zipf exponent of service popularity
+    large_fan_out: Tuple[int, int] = (100, 800)
+    sticky_note_rate: float = 0.3
+
+
+@dataclass
+class CorpusInfo:
+    """What write_corpus() produced."""
+    root: str
+    seed: int = 42
+    files: int = 0
+    bytes: int = 0
+    nodes: int = 0
+    seconds: float = 0.0
+    digest: str = ''
+    topologies: Dict[str, int] = field(default_factory=dict)
+    filenames: List[str] = field(default_factory=list)
+    services: List[str] = field(default_factory=list)
+    search_terms: List[str] = field(default_factory=list)
+
+
+class _GraphBuilder:
+    """Accumulates nodes and edges of one workflow, tracking depth for layout."""
+
+    def __init__(self, rng: random.Random, primary: Tuple[str, str], secondary: Tuple[str, str],
+                 weights: List[float]):
+        self.rng = rng
+        self.primary = primary
+        self.secondary = secondary
+        self.weights = weights
+        self.nodes: List[Dict[str, Any]] = []
+        self.depths: List[int] = []
+        self.edges: List[Tuple[int, int, int]] = []  # (source, output index, target)
+        self.names: Counter = Counter()
+
+    def _unique(self, name: str) -> str:
+        self.names[name] += 1
+        return name if self.names[name] == 1 else f"{name} {self.names[name]}"
+
+    def add(self, node_type: str, name: str, depth: int, parameters: Optional[Dict] = None,
+            credentials: Optional[Dict] = None) -> int:
+        node = {
+            'id': str(uuid.UUID(int=self.rng.getrandbits(128), version=4)),
+            'name': self._unique(name),
+            'type': node_type,
+            'typeVersion': 1,
+            'position': [0, 0],
+            'parameters': parameters or {},
+        }
+        if credentials:
+            node['credentials'] = credentials
+        self.nodes.append(node)
+        self.depths.append(depth)
+        return len(self.nodes) - 1
+
+    def link(self, source: int, target: int, output: int = 0):
+        self.edges.append((source, output, target))
+
+    def service_node(self, depth: int) -> int:
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.45:
+            key, name = self.primary
+        elif roll < 0.75:
+            key, name = self.secondary
+        else:
+            key, name = rng.choices(INTEGRATIONS, weights=self.weights)[0]
+        operation = rng.choice(OPERATIONS)
+        parameters = {'operation': operation, 'resource': rng.choice(WORDS)}
+        if rng.random() < 0.5:
+            parameters['additionalFields'] = {rng.choice(WORDS): f"={{{{ $json.{rng.choice(WORDS)} }}}}"}
+        credentials = {f"{key}Api": {'id': str(rng.randint(1, 9999)), 'name': f"{name} account"}}
+        return self.add(f"n8n-nodes-base.{key}", f"{operation.title()} {name}", depth, parameters, credentials)
+
+    def utility_node(self, depth: int) -> int:
+        rng = self.rng
+        utility = rng.choice(UTILITY_NODES)
+        parameters: Dict[str, Any] = {}
+        if utility == 'code':
+            lines = [f"const {rng.choice(WORDS)}{i} = $input.item.json.{rng.choice(WORDS)};"
+                     for i in range(rng.randint(3, 40))]
+            parameters['jsCode'] = "\n".join(lines + ["return $input.all();"])
+        elif utility == 'httpRequest':
+            parameters = {'url': f"https://api.example.com/{rng.choice(WORDS)}/{rng.randint(1, 999)}",
+                          'method': rng.choice(['GET', 'POST', 'PUT'])}
+        elif utility == 'set':
+            parameters = {'values': {'string': [{'name': rng.choice(WORDS), 'value': rng.choice(WORDS)}]}}
+        return self.add(f"n8n-nodes-base.{utility}", utility[0].upper() + utility[1:], depth, parameters)
+
+    def step(self, depth: int) -> int:
+        return self.service_node(depth) if self.rng.random() < 0.55 else self.utility_node(depth)
+
+    def chain(self, source: int, length: int, output: int = 0) -> int:
+        """Append `length` nodes after `source`; returns the last one."""
+        last = source
+        for position in range(length):
+            node = self.step(self.depths[last] + 1)
+            self.link(last, node, output if position == 0 else 0)
+            last = node
+        return last
+
+    def merge(self, sources: List[Tuple[int, int]]) -> int:
+        depth = max(self.depths[source] for source, _ in sources) + 1
+        node = self.add('n8n-nodes-base.merge', 'Merge', depth, {'mode': 'combine'})
+        for source, _ in sources:
+            self.link(source, node)
+        return node
+
+    def branch(self, source: int, budget: int) -> int:
+        """IF node with a true and a false arm that usually merge again."""
+        condition = self.add('n8n-nodes-base.if', 'If', self.depths[source] + 1,
+                             {'conditions': {'string': [{'value1': f"={{{{ $json.{self.rng.choice(WORDS)} }}}}",
+                                                         'operation': 'isNotEmpty'}]}})
+        self.link(source, condition)
+        arm = max(1, (budget - 2) // 2)
+        ends = [(self.chain(condition, self.rng.randint(1, arm), output), output) for output in (0, 1)]
+        if self.rng.random() < 0.7:
+            return self.merge(ends)
+        return ends[0][0]
+
+    def diamond(self, source: int, budget: int) -> int:
+        """Parallel arms from one node joined by a Merge."""
+        width = min(self.rng.randint(2, 4), max(2, budget - 2))
+        arm = max(1, (budget - 1) // width)
+        ends = [(self.chain(source, self.rng.randint(1, min(arm, 3))), 0) for _ in range(width)]
+        return self.merge(ends)
+
+    def fan_out(self, source: int, width: int) -> int:
+        """One node feeding `width` independent leaf nodes."""
+        targets = [self.step(self.depths[source] + 1) for _ in range(width)]
+        for target in targets:
+            self.link(source, target)
+        return targets[0]
+
+    def layout(self):
+        """Columns by depth, rows in order of appearance within a column."""
+        rows: Counter = Counter()
+        for node, depth in zip(self.nodes, self.depths):
+            node['position'] = [240 + 220 * depth, 300 + 160 * rows[depth]]
+            rows[depth] += 1
+
+    def connections(self) -> Dict[str, Any]:
+        connections: Dict[str, Any] = {}
+        for source, output, target in self.edges:
+            outputs = connections.setdefault(self.nodes[source]['name'], {'main': []})['main']
+            while len(outputs) <= output:
+                outputs.append([])
+            outputs[output].append({'node': self.nodes[target]['name'], 'type': 'main', 'index': 0})
+        return connections
+
+
+def _node_count(rng: random.Random, spec: CorpusSpec) -> int:
+    sigma = 0.6
+    mu = math.log(max(spec.mean_nodes, 1.0)) - sigma * sigma / 2
+    return max(spec.min_nodes, min(spec.max_nodes, int(round(rng.lognormvariate(mu, sigma)))))
+
+
+def _popularity(spec: CorpusSpec) -> List[float]:
+    return [1.0 / (rank + 1) ** spec.skew for rank in range(len(INTEGRATIONS))]
+
+
+def generate_workflow(index: int, seed: int = 42, spec: Optional[CorpusSpec] = None,
+                      weights: Optional[List[float]] = None,
+                      index_width: int = 6) -> Tuple[str, str, Dict[str, Any], str]:
+    """(folder, filename, workflow JSON, topology) for workflow `index` of a corpus."""
+    spec = spec or CorpusSpec()
+    weights = weights or _popularity(spec)
+    rng = random.Random(f"{seed}:{index}")
+
+    primary = rng.choices(INTEGRATIONS, weights=weights)[0]
+    secondary = primary
+    while secondary == primary:
+        secondary = rng.choices(INTEGRATIONS, weights=weights)[0]
+    topology = rng.choices(list(spec.topologies), weights=list(spec.topologies.values()))[0]
+    budget = _node_count(rng, spec)
+    trigger_template, trigger_label, _ = rng.choices(TRIGGERS, weights=[t[2] for t in TRIGGERS])[0]
+    action = rng.choice(ACTIONS)
+
+    graph = _GraphBuilder(rng, primary, secondary, weights)
+    trigger_type = trigger_template.format(service=primary[0])
+    trigger_parameters = {'path': uuid.UUID(int=rng.getrandbits(128)).hex} if 'webhook' in trigger_type else {}
+    last = graph.add(trigger_type, 'Trigger' if 'Trigger' in trigger_type else trigger_label, 0, trigger_parameters)
+
+    if topology == 'large_fan_out':
+        last = graph.chain(last, rng.randint(0, 2))
+        graph.fan_out(last, rng.randint(*spec.large_fan_out))
+    elif topology == 'fan_out':
+        head = rng.randint(0, max(0, budget // 3))
+        last = graph.chain(last, head)
+        graph.fan_out(last, max(2, budget - head - 1))
+    else:
+        while len(graph.nodes) < budget:
+            remaining = budget - len(graph.nodes)
+            if topology == 'branch' and remaining >= 4 and rng.random() < 0.35:
+                last = graph.branch(last, min(remaining, 12))
+            elif topology == 'diamond' and remaining >= 4 and rng.random() < 0.4:
+                last = graph.diamond(last, min(remaining, 12))
+            else:
+                last = graph.chain(last, min(remaining, rng.randint(1, 4)))
+
+    if rng.random() < spec.sticky_note_rate:
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(15, 250)))
+        graph.add('n8n-nodes-base.stickyNote', 'Sticky Note', 0, {'content': f"## {action} flow\n{text}"})
+
+    graph.layout()
+    primary_folder = primary[0].title()
+    filename = (f"{index:0{index_width}d}_{primary_folder}_{secondary[0].title()}_"
+                f"{action}_{trigger_label}.json")
+    workflow: Dict[str, Any] = {
+        'id': index,
+        'name': f"{action} {secondary[1]} {rng.choice(WORDS)}s from {primary[1]}",
+        'nodes': graph.nodes,
+        'connections': graph.connections(),
+        'active': rng.random() < 0.2,
+        'settings': {'executionOrder': 'v1'},
+        'tags': [{'id': str(rng.randint(1, 99)), 'name': rng.choice(WORDS)}
+                 for _ in range(rng.choice((0, 0, 0, 1, 2)))],
+        'createdAt': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00.000Z",
+        'updatedAt': '2025-01-01T00:00:00.000Z',
+    }
+    if rng.random() < 0.1:
+        workflow['description'] = f"{action} {secondary[1]} data whenever {primary[1]} changes."
+    return primary_folder, filename, workflow, topology
+
+
+def _write_chunk(task: Tuple[str, int, int, int, CorpusSpec, int, bool, bool]) -> Dict[str, Any]:
+    """Generate indexes [start, stop); returns counts and the chunk digest."""
+    root, start, stop, seed, spec, width, write, collect_filenames = task
+    base = Path(root) / 'workflows'
+    weights = _popularity(spec)
+    digest = hashlib.sha256()
+    result = {'files': 0, 'bytes': 0, 'nodes': 0, 'topologies': Counter(), 'filenames': []}
+    created = set()
+    for index in range(start, stop):
+        folder, filename, workflow, topology = generate_workflow(index, seed, spec, weights, width)
+        data = json.dumps(workflow, indent=2).encode('utf-8')
+        digest.update(filename.encode('utf-8'))
+        digest.update(data)
+        if write:
+            directory = base / folder
+            if folder not in created:
+                directory.mkdir(parents=True, exist_ok=True)
+                created.add(folder)
+            (directory / filename).write_bytes(data)
+        result['files'] += 1
+        result['bytes'] += len(data)
+        result['nodes'] += len(workflow['nodes'])
+        result['topologies'][topology] += 1
+        if collect_filenames:
+            result['filenames'].append(filename)
+    result['digest'] = digest.hexdigest()
+    return result
+
+
+def write_corpus(root: str, count: int, seed: int = 42, spec: Optional[CorpusSpec] = None,
+                 workers: int = 1, write: bool = True, collect_filenames: bool = True) -> CorpusInfo:
+    """Generate `count` workflows under <root>/workflows/ and write <root>/manifest.json."""
+    spec = spec or CorpusSpec()
+    info = CorpusInfo(root=str(root), seed=seed,
+                      services=[name for _, name in INTEGRATIONS],
+                      search_terms=[key for key, _ in INTEGRATIONS[:20]])
+    width = max(6, len(str(count - 1)))
+    tasks = [(str(root), start, min(start + CHUNK_SIZE, count), seed, spec, width, write, collect_filenames)
+             for start in range(0, count, CHUNK_SIZE)]
+
+    started = time.perf_counter()
+    digest = hashlib.sha256()
+    topologies: Counter = Counter()
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_write_chunk, tasks)
+            for result in results:
+                _accumulate(info, result, digest, topologies)
+    else:
+        for task in tasks:
+            _accumulate(info, _write_chunk(task), digest, topologies)
+    info.seconds = time.perf_counter() - started
+    info.digest = digest.hexdigest()
+    info.topologies = dict(topologies)
+
+    if write:
+        Path(root).mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'seed': seed, 'count': count, 'spec': asdict(spec), 'digest': info.digest,
+            'files': info.files, 'bytes': info.bytes, 'nodes': info.nodes, 'topologies': info.topologies,
+        }
+        with open(Path(root) / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    return info
+
+
+def _accumulate(info: CorpusInfo, result: Dict[str, Any], digest, topologies: Counter):
+    info.files += result['files']
+    info.bytes += result['bytes']
+    info.nodes += result['nodes']
+    info.filenames.extend(result['filenames'])
+    topologies.update(result['topologies'])
+    digest.update(result['digest'].encode('ascii'))
+
+
+def parse_topologies(text: str) -> Dict[str, float]:
+    """'chain=3,diamond=1' -> {'chain': 3.0, 'diamond': 1.0}."""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_TOPOLOGIES:
+            raise argparse.ArgumentTypeError(f"unknown topology '{name}' (choose from {', '.join(DEFAULT_TOPOLOGIES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic n8n workflow corpus')
+    parser.add_argument('--count', type=int, default=1000, help='Number of workflows')
+    parser.add_argument('--output', required=True, help='Corpus root (workflows/ is created inside)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Generator processes')
+    parser.add_argument('--min-nodes', type=int, default=CorpusSpec.min_nodes)
+    parser.add_argument('--max-nodes', type=int, default=CorpusSpec.max_nodes)
+    parser.add_argument('--mean-nodes', type=float, default=CorpusSpec.mean_nodes)
+    parser.add_argument('--topologies', type=parse_topologies,
+                        help=f"Topology weights, default {','.join(f'{k}={v}' for k, v in DEFAULT_TOPOLOGIES.items())}")
+    parser.add_argument('--skew', type=float, default=CorpusSpec.skew, help='Service popularity skew')
+    parser.add_argument('--large-fan-out', default='100-800', help='Target range for large fan-out, e.g. 100-800')
+    parser.add_argument('--dry-run', action='store_true', help='Generate and digest without writing files')
+    args = parser.parse_args()
+
+    low, _, high = args.large_fan_out.partition('-')
+    spec = CorpusSpec(min_nodes=args.min_nodes, max_nodes=args.max_nodes, mean_nodes=args.mean_nodes,
+                      topologies=args.topologies or dict(DEFAULT_TOPOLOGIES), skew=args.skew,
+                      large_fan_out=(int(low), int(high or low)))
+
+    print(f"🏭 Generating {args.count:,} workflows (seed {args.seed}, {args.workers} workers)...")
+    info = write_corpus(args.output, args.count, args.seed, spec, workers=args.workers,
+                        write=not args.dry_run, collect_filenames=False)
+    rate = info.files / info.seconds if info.seconds else 0
+    print(f"✅ {info.files:,} workflows, {info.nodes:,} nodes, {info.bytes / 1024 / 1024:.1f} MB "
+          f"in {info.seconds:.1f}s ({rate:,.0f} files/s)")
+    print(f"🕸️  Topologies: {', '.join(f'{name} {count:,}' for name, count in sorted(info.topologies.items()))}")
+    print(f"🔑 Digest: {info.digest}")
+    if not args.dry_run:
+        print(f"📁 {Path(args.output) / 'workflows'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Workflow Blobs
+Compressed copies of workflow files stored in SQLite (workflow_blobs table).
+
+With WORKFLOW_STORE_BLOBS=1 the indexer keeps each file's bytes, keyed by
+its file_hash, so the API can serve details, raw JSON and downloads with one
+indexed row fetch instead of a directory walk, and a deployment needs only
+the database file. Identical files share one blob.
+
+Blobs are compressed with zstd when the zstandard package is installed and
+with zlib otherwise; every row records its codec, so a database written
+with either can be read wherever that codec is available.
+"""
+
+import os
+import zlib
+from typing import Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC = 'zstd' if zstandard is not None else 'zlib'
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+CHUNK_SIZE = 64 * 1024
+
+
+def blobs_enabled() -> bool:
+    """Whether indexing stores workflow blobs (env WORKFLOW_STORE_BLOBS)."""
+    return os.environ.get('WORKFLOW_STORE_BLOBS', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def can_decode(codec: str) -> bool:
+    return codec in ('zlib', 'identity') or (codec == 'zstd' and zstandard is not None)
+
+
+def compress_blob(data: bytes) -> Tuple[str, bytes]:
+    """(codec, compressed bytes) using the best available codec."""
+    if CODEC == 'zstd':
+        return CODEC, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return CODEC, zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress_blob(codec: str, data: bytes) -> bytes:
+    if codec == 'identity':
+        return data
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("workflow blob is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def iter_decompressed(codec: str, data: bytes, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Decompress incrementally, for streaming responses."""
+    if codec == 'identity':
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+        return
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("workflow blob is zstd-compressed but zstandard is not installed")
+        reader = zstandard.ZstdDecompressor().stream_reader(data)
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    decompressor = zlib.decompressobj()
+    for start in range(0, len(data), chunk_size):
+        chunk = decompressor.decompress(data[start:start + chunk_size])
+        if chunk:
+            yield chunk
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+class WorkflowBlob:
+    """A stored workflow file: its hash, size and compressed bytes."""
+
+    def __init__(self, file_hash: str, size: int, codec: str, data: bytes):
+        self.file_hash = file_hash
+        self.size = size
+        self.codec = codec
+        self.data = data
+
+    def read(self) -> bytes:
+        return decompress_blob(self.codec, self.data)
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        return iter_decompressed(self.codec, self.data)
+
+    @classmethod
+    def from_file(cls, file_hash: str, data: bytes) -> 'WorkflowBlob':
+        """Uncompressed stand-in for a file read from disk (no stored blob)."""
+        return cls(file_hash, len(data), 'identity', data)
+
+    def __repr__(self) -> str:
+        return f"WorkflowBlob({self.file_hash!r}, size={self.size}, codec={self.codec!r})"
+
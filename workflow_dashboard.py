@@ -12,6 +12,8 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 import time
 
+from analysis_store import AnalysisRecord, AnalysisStore, workflow_files
+
 @dataclass
 class WorkflowStats:
     """Workflow statistics and health metrics"""
@@ -32,98 +34,97 @@ class WorkflowStats:
 class WorkflowDashboard:
     """Real-time workflow monitoring dashboard"""
     
-    def __init__(self, workflows_dir: str = "workflows"):
+    ANALYZER_NAME = "dashboard"
+    ANALYZER_VERSION = 1  # bump when the quality score changes so stored results are recomputed
+    QUALITY_BANDS = [
+        ('excellent (90-100)', 90, None),
+        ('good (70-89)', 70, 90),
+        ('fair (50-69)', 50, 70),
+        ('poor (0-49)', None, 50)
+    ]
+    
+    def __init__(self, workflows_dir: str = "workflows", analysis_db: Optional[str] = None):
         self.workflows_dir = Path(workflows_dir)
+        self.store = AnalysisStore(analysis_db)
         self.stats: Dict[str, WorkflowStats] = {}
         self.categories = {}
         self.last_scan = None
         
-    def scan_workflows(self) -> Dict[str, Any]:
-        """Scan all workflows and collect statistics"""
+    def scan_workflow_file(self, workflow_file: Path) -> AnalysisRecord:
+        """Score one workflow file for the analysis store"""
+        try:
+            with open(workflow_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error processing {workflow_file}: {e}")
+            return AnalysisRecord(result={'error': str(e)}, status='unreadable')
+        
+        # Calculate quality score (simplified)
+        quality_score = self._calculate_quality_score(data)
+        
+        # Determine status
+        status = self._determine_status(data, quality_score)
+        
+        workflow_name = data.get('name', workflow_file.stem)
+        return AnalysisRecord(
+            result={
+                'name': workflow_name,
+                'connections': len(data.get('connections', {}))
+            },
+            workflow_name=workflow_name,
+            score=quality_score,
+            status=status,
+            node_count=len(data.get('nodes', []))
+        )
+    
+    def scan_workflows(self, force: bool = False) -> Dict[str, Any]:
+        """Scan changed workflows and collect statistics from the analysis store"""
         print("🔍 Scanning workflows for dashboard...")
         
-        self.stats = {}
-        self.categories = {}
+        run_stats = self.store.run(
+            self.ANALYZER_NAME, self.ANALYZER_VERSION, workflow_files(self.workflows_dir),
+            self.scan_workflow_file, force=force,
+            root=self.workflows_dir
+        )
+        print(run_stats.summary())
         
-        total_workflows = 0
-        total_nodes = 0
-        total_connections = 0
-        total_size = 0
+        name = self.ANALYZER_NAME
+        readable = "status != 'unreadable'"
         
-        for category_path in self.workflows_dir.iterdir():
-            if category_path.is_dir():
-                category = category_path.name
-                self.categories[category] = {
-                    'count': 0,
-                    'nodes': 0,
-                    'connections': 0,
-                    'size': 0,
-                    'active': 0,
-                    'inactive': 0,
-                    'errors': 0
-                }
-                
-                for workflow_file in category_path.glob('*.json'):
-                    try:
-                        with open(workflow_file, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                        
-                        # Get file stats
-                        file_stat = workflow_file.stat()
-                        last_modified = datetime.fromtimestamp(file_stat.st_mtime)
-                        file_size = file_stat.st_size
-                        
-                        # Calculate quality score (simplified)
-                        quality_score = self._calculate_quality_score(data)
-                        
-                        # Determine status
-                        status = self._determine_status(data, quality_score)
-                        
-                        # Create workflow stats
-                        workflow_name = data.get('name', workflow_file.stem)
-                        stats = WorkflowStats(
-                            name=workflow_name,
-                            category=category,
-                            nodes=len(data.get('nodes', [])),
-                            connections=len(data.get('connections', {})),
-                            last_modified=last_modified,
-                            file_size=file_size,
-                            quality_score=quality_score,
-                            status=status
-                        )
-                        
-                        self.stats[workflow_name] = stats
-                        
-                        # Update category stats
-                        self.categories[category]['count'] += 1
-                        self.categories[category]['nodes'] += stats.nodes
-                        self.categories[category]['connections'] += stats.connections
-                        self.categories[category]['size'] += file_size
-                        
-                        if status == 'active':
-                            self.categories[category]['active'] += 1
-                        elif status == 'error':
-                            self.categories[category]['errors'] += 1
-                        else:
-                            self.categories[category]['inactive'] += 1
-                        
-                        # Update totals
-                        total_workflows += 1
-                        total_nodes += stats.nodes
-                        total_connections += stats.connections
-                        total_size += file_size
-                        
-                    except Exception as e:
-                        print(f"⚠️ Error processing {workflow_file}: {e}")
-                        continue
+        self.stats = {}
+        for row in self.store.rows(name, ('workflow_name', 'category', 'node_count', 'score', 'status',
+                                          'file_size', 'file_mtime_ns', 'result'), where=readable):
+            self.stats[row['workflow_name']] = WorkflowStats(
+                name=row['workflow_name'],
+                category=row['category'],
+                nodes=row['node_count'],
+                connections=row['result']['connections'],
+                last_modified=datetime.fromtimestamp(row['file_mtime_ns'] / 1e9),
+                file_size=row['file_size'],
+                quality_score=int(row['score']),
+                status=row['status']
+            )
+        
+        # Category and overall totals are aggregated in SQL
+        totals = {
+            'count': 'COUNT(*)',
+            'nodes': 'COALESCE(SUM(node_count), 0)',
+            'connections': "COALESCE(SUM(json_extract(result, '$.connections')), 0)",
+            'size': 'COALESCE(SUM(file_size), 0)',
+            'active': "SUM(status = 'active')",
+            'inactive': "SUM(status = 'inactive')",
+            'errors': "SUM(status = 'error')"
+        }
+        self.categories = self.store.totals(name, totals, group_by='category', where=readable)
+        overall = self.store.totals(name, totals, where=readable)
         
         self.last_scan = datetime.now()
         
         return {
-            'total_workflows': total_workflows,
-            'total_nodes': total_nodes,
-            'total_connections': total_connections,
-            'total_size_mb': round(total_size / (1024 * 1024), 2),
+            'total_workflows': overall['count'],
+            'total_nodes': overall['nodes'],
+            'total_connections': overall['connections'],
+            'total_size_mb': round(overall['size'] / (1024 * 1024), 2),
             'categories': self.categories,
             'last_scan': self.last_scan.isoformat()
         }
@@ -180,31 +181,30 @@ class WorkflowDashboard:
         else:
             return 'error'
     
-    def get_dashboard_data(self) -> Dict[str, Any]:
+    def get_dashboard_data(self, force: bool = False) -> Dict[str, Any]:
         """Get comprehensive dashboard data"""
-        scan_data = self.scan_workflows()
+        scan_data = self.scan_workflows(force=force)
+        name = self.ANALYZER_NAME
         
         # Calculate health metrics
-        active_workflows = sum(1 for stats in self.stats.values() if stats.status == 'active')
-        error_workflows = sum(1 for stats in self.stats.values() if stats.status == 'error')
-        inactive_workflows = sum(1 for stats in self.stats.values() if stats.status == 'inactive')
+        status_counts = self.store.status_counts(name)
+        active_workflows = status_counts.get('active', 0)
+        error_workflows = status_counts.get('error', 0)
+        inactive_workflows = status_counts.get('inactive', 0)
         
-        total_workflows = len(self.stats)
+        total_workflows = scan_data['total_workflows']
         health_percentage = (active_workflows / total_workflows * 100) if total_workflows > 0 else 0
         
-        # Top categories by workflow count
-        top_categories = sorted(
-            self.categories.items(),
-            key=lambda x: x[1]['count'],
-            reverse=True
-        )[:5]
+        # Top categories by workflow count (already ordered by the aggregate query)
+        top_categories = list(self.categories.items())[:5]
         
         # Recent activity (workflows modified in last 7 days)
-        recent_cutoff = datetime.now() - timedelta(days=7)
-        recent_workflows = [
-            stats for stats in self.stats.values()
-            if stats.last_modified > recent_cutoff
-        ]
+        recent_cutoff_ns = int((datetime.now() - timedelta(days=7)).timestamp() * 1e9)
+        recent_where = "status != 'unreadable' AND file_mtime_ns > ?"
+        recent_workflows = self.store.rows(
+            name, ('workflow_name', 'category', 'file_mtime_ns', 'score'),
+            order_by="file_mtime_ns DESC", limit=10, where=recent_where, params=(recent_cutoff_ns,)
+        )
         
         return {
             'overview': {
@@ -219,15 +219,15 @@ class WorkflowDashboard:
             },
             'categories': top_categories,
             'recent_activity': {
-                'count': len(recent_workflows),
+                'count': self.store.count(name, recent_where, (recent_cutoff_ns,)),
                 'workflows': [
                     {
-                        'name': wf.name,
-                        'category': wf.category,
-                        'last_modified': wf.last_modified.isoformat(),
-                        'quality_score': wf.quality_score
+                        'name': wf['workflow_name'],
+                        'category': wf['category'],
+                        'last_modified': datetime.fromtimestamp(wf['file_mtime_ns'] / 1e9).isoformat(),
+                        'quality_score': int(wf['score'])
                     }
-                    for wf in recent_workflows[:10]  # Top 10 recent
+                    for wf in recent_workflows  # Top 10 recent
                 ]
             },
             'quality_distribution': self._get_quality_distribution(),
@@ -236,28 +236,12 @@ class WorkflowDashboard:
     
     def _get_quality_distribution(self) -> Dict[str, int]:
         """Get quality score distribution"""
-        distribution = {
-            'excellent (90-100)': 0,
-            'good (70-89)': 0,
-            'fair (50-69)': 0,
-            'poor (0-49)': 0
-        }
-        
-        for stats in self.stats.values():
-            if stats.quality_score >= 90:
-                distribution['excellent (90-100)'] += 1
-            elif stats.quality_score >= 70:
-                distribution['good (70-89)'] += 1
-            elif stats.quality_score >= 50:
-                distribution['fair (50-69)'] += 1
-            else:
-                distribution['poor (0-49)'] += 1
-        
-        return distribution
+        return self.store.score_distribution(self.ANALYZER_NAME, self.QUALITY_BANDS)
     
-    def display_dashboard(self):
+    def display_dashboard(self, data: Optional[Dict[str, Any]] = None):
         """Display the dashboard in console"""
-        data = self.get_dashboard_data()
+        if data is None:
+            data = self.get_dashboard_data()
         
         print("\n" + "="*80)
         print("🚀 N8N WORKFLOW DASHBOARD")
@@ -296,11 +280,19 @@ class WorkflowDashboard:
 
 def main():
     """Main dashboard function"""
-    dashboard = WorkflowDashboard()
-    dashboard.display_dashboard()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Show the workflow dashboard')
+    parser.add_argument('--workflows-dir', default='workflows')
+    parser.add_argument('--analysis-db', help='Analysis store path (default: database/analysis.db)')
+    parser.add_argument('--force', action='store_true', help='Re-score every workflow, ignoring stored results')
+    args = parser.parse_args()
+    
+    dashboard = WorkflowDashboard(args.workflows_dir, args.analysis_db)
+    data = dashboard.get_dashboard_data(force=args.force)
+    dashboard.display_dashboard(data)
     
     # Save dashboard data to file
-    data = dashboard.get_dashboard_data()
     with open('dashboard_data.json', 'w') as f:
         json.dump(data, f, indent=2, default=str)
     
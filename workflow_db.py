@@ -10,96 +10,108 @@ import os
 import glob
 import datetime
 import hashlib
+import time
+import urllib.parse
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
+from category_engine import CategoryEngine, load_category_engine
+from db_migrations import LATEST_VERSION, migrate, schema_version
+from metrics_registry import CACHE_METRICS, INDEX_METRICS, QUERY_METRICS, connect
+from node_classifier import NODE_CLASSIFIER
+from workflow_blobs import WorkflowBlob, blobs_enabled, can_decode, compress_blob
+from workflow_diagrams import (DIAGRAM_VERSION, compact_graph, compress_diagram, decompress_diagram,
+                               diagram_etag, generate_mermaid_diagram)
+
+# Cached per workflow in workflow_diagrams
+DIAGRAM_VARIANTS = {
+    'mermaid': generate_mermaid_diagram,
+    'graph': compact_graph,
+}
+
+# See WorkflowDatabase.__init__
+DB_MODES = ('rw', 'ro', 'snapshot')
+
+# Stored in workflows.category for workflows no rule matches
+UNCATEGORIZED = 'Uncategorized'
+
+# Stored in PRAGMA user_version; see db_migrations
+SCHEMA_VERSION = LATEST_VERSION
+
+
 class WorkflowDatabase:
     """High-performance SQLite database for workflow metadata and search."""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, store_blobs: Optional[bool] = None, mode: Optional[str] = None):
+        """mode (env WORKFLOW_DB_MODE):
+          rw        read-write; creates and migrates the schema (default)
+          ro        read-only connections (mode=ro, query_only) to a live database
+          snapshot  read-only and immutable=1: for published snapshots (db_snapshots),
+                    which are replaced by rename but never written in place
+        """
         # Use environment variable if no path provided
         if db_path is None:
             db_path = os.environ.get('WORKFLOW_DB_PATH', 'workflows.db')
         self.db_path = db_path
         self.workflows_dir = "workflows"
-        self.init_database()
+        # Keep compressed copies of the files in workflow_blobs (env WORKFLOW_STORE_BLOBS)
+        self.store_blobs = blobs_enabled() if store_blobs is None else store_blobs
+        self.mode = mode or os.environ.get('WORKFLOW_DB_MODE', 'rw')
+        if self.mode not in DB_MODES:
+            raise ValueError(f"Unknown database mode {self.mode!r} (expected one of {', '.join(DB_MODES)})")
+        self.read_only = self.mode != 'rw'
+        self._category_engine: Optional[CategoryEngine] = None
+        if self.read_only:
+            uri_path = urllib.parse.quote(os.path.abspath(db_path))
+            self._uri = f"file:{uri_path}?mode=ro" + ("&immutable=1" if self.mode == 'snapshot' else "")
+        elif self.schema_version() != SCHEMA_VERSION:
+            self.init_database()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """A connection in this database's mode (read-only ones refuse writes)."""
+        if not self.read_only:
+            return connect(self.db_path)
+        conn = connect(self._uri, uri=True)
+        conn.execute("PRAGMA query_only=1")
+        return conn
+    
+    def schema_version(self) -> int:
+        """PRAGMA user_version of the database (0 for a new or pre-versioning file)."""
+        if not self.read_only and not os.path.exists(self.db_path):
+            return 0
+        conn = self._connect()
+        try:
+            return schema_version(conn)
+        finally:
+            conn.close()
     
     def init_database(self):
-        """Initialize SQLite database with optimized schema and indexes."""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA journal_mode=WAL")  # Write-ahead logging for performance
-        conn.execute("PRAGMA synchronous=NORMAL")
-        conn.execute("PRAGMA cache_size=10000")
-        conn.execute("PRAGMA temp_store=MEMORY")
-        
-        # Create main workflows table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS workflows (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                filename TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                workflow_id TEXT,
-                active BOOLEAN DEFAULT 0,
-                description TEXT,
-                trigger_type TEXT,
-                complexity TEXT,
-                node_count INTEGER DEFAULT 0,
-                integrations TEXT,  -- JSON array
-                tags TEXT,         -- JSON array
-                created_at TEXT,
-                updated_at TEXT,
-                file_hash TEXT,
-                file_size INTEGER,
-                analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create FTS5 table for full-text search
-        conn.execute("""
-            CREATE VIRTUAL TABLE IF NOT EXISTS workflows_fts USING fts5(
-                filename,
-                name,
-                description,
-                integrations,
-                tags,
-                content=workflows,
-                content_rowid=id
-            )
-        """)
-        
-        # Create indexes for fast filtering
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_trigger_type ON workflows(trigger_type)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_complexity ON workflows(complexity)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_active ON workflows(active)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_node_count ON workflows(node_count)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_filename ON workflows(filename)")
-        
-        # Create triggers to keep FTS table in sync
-        conn.execute("""
-            CREATE TRIGGER IF NOT EXISTS workflows_ai AFTER INSERT ON workflows BEGIN
-                INSERT INTO workflows_fts(rowid, filename, name, description, integrations, tags)
-                VALUES (new.id, new.filename, new.name, new.description, new.integrations, new.tags);
-            END
-        """)
-        
-        conn.execute("""
-            CREATE TRIGGER IF NOT EXISTS workflows_ad AFTER DELETE ON workflows BEGIN
-                INSERT INTO workflows_fts(workflows_fts, rowid, filename, name, description, integrations, tags)
-                VALUES ('delete', old.id, old.filename, old.name, old.description, old.integrations, old.tags);
-            END
-        """)
-        
-        conn.execute("""
-            CREATE TRIGGER IF NOT EXISTS workflows_au AFTER UPDATE ON workflows BEGIN
-                INSERT INTO workflows_fts(workflows_fts, rowid, filename, name, description, integrations, tags)
-                VALUES ('delete', old.id, old.filename, old.name, old.description, old.integrations, old.tags);
-                INSERT INTO workflows_fts(rowid, filename, name, description, integrations, tags)
-                VALUES (new.id, new.filename, new.name, new.description, new.integrations, new.tags);
-            END
-        """)
-        
-        conn.commit()
-        conn.close()
+        """Bring the schema up to date with the pending db_migrations.
+        
+        Runs from __init__ only when the stored schema version differs from
+        SCHEMA_VERSION, so opening an up-to-date database costs one PRAGMA.
+        """
+        # Autocommit mode: migrate() runs each migration in its own transaction
+        conn = connect(self.db_path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")  # Write-ahead logging for performance
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = schema_version(conn)
+            if version > SCHEMA_VERSION:
+                raise RuntimeError(f"{self.db_path} has schema version {version}, newer than this code ({SCHEMA_VERSION})")
+            migrate(conn)
+        finally:
+            conn.close()
+    
+    def categorize(self, filename: str) -> str:
+        """Category stored for a workflow file (create_categories rules, context/def_categories.json)."""
+        if self._category_engine is None:
+            try:
+                self._category_engine = load_category_engine()
+            except (OSError, ValueError) as e:
+                print(f"Warning: category definitions unavailable, using filename patterns only: {e}")
+                self._category_engine = CategoryEngine({})
+        return self._category_engine.categorize(filename) or UNCATEGORIZED
     
     def get_file_hash(self, file_path: str) -> str:
         """Get MD5 hash of file for change detection."""
@@ -172,7 +184,8 @@ class WorkflowDatabase:
             'created_at': data.get('createdAt', ''),
             'updated_at': data.get('updatedAt', ''),
             'file_hash': file_hash,
-            'file_size': file_size
+            'file_size': file_size,
+            'category': self.categorize(filename)
         }
         
         # Use JSON name if available and meaningful, otherwise use formatted filename
@@ -210,188 +223,7 @@ class WorkflowDatabase:
     
     def analyze_nodes(self, nodes: List[Dict]) -> Tuple[str, set]:
         """Analyze nodes to determine trigger type and integrations."""
-        trigger_type = 'Manual'
-        integrations = set()
-        
-        # Enhanced service mapping for better recognition
-        service_mappings = {
-            # Messaging & Communication
-            'telegram': 'Telegram',
-            'telegramTrigger': 'Telegram',
-            'discord': 'Discord',
-            'slack': 'Slack', 
-            'whatsapp': 'WhatsApp',
-            'mattermost': 'Mattermost',
-            'teams': 'Microsoft Teams',
-            'rocketchat': 'Rocket.Chat',
-            
-            # Email
-            'gmail': 'Gmail',
-            'mailjet': 'Mailjet',
-            'emailreadimap': 'Email (IMAP)',
-            'emailsendsmt': 'Email (SMTP)',
-            'outlook': 'Outlook',
-            
-            # Cloud Storage
-            'googledrive': 'Google Drive',
-            'googledocs': 'Google Docs',
-            'googlesheets': 'Google Sheets',
-            'dropbox': 'Dropbox',
-            'onedrive': 'OneDrive',
-            'box': 'Box',
-            
-            # Databases
-            'postgres': 'PostgreSQL',
-            'mysql': 'MySQL',
-            'mongodb': 'MongoDB',
-            'redis': 'Redis',
-            'airtable': 'Airtable',
-            'notion': 'Notion',
-            
-            # Project Management
-            'jira': 'Jira',
-            'github': 'GitHub',
-            'gitlab': 'GitLab',
-            'trello': 'Trello',
-            'asana': 'Asana',
-            'mondaycom': 'Monday.com',
-            
-            # AI/ML Services
-            'openai': 'OpenAI',
-            'anthropic': 'Anthropic',
-            'huggingface': 'Hugging Face',
-            
-            # Social Media
-            'linkedin': 'LinkedIn',
-            'twitter': 'Twitter/X',
-            'facebook': 'Facebook',
-            'instagram': 'Instagram',
-            
-            # E-commerce
-            'shopify': 'Shopify',
-            'stripe': 'Stripe',
-            'paypal': 'PayPal',
-            
-            # Analytics
-            'googleanalytics': 'Google Analytics',
-            'mixpanel': 'Mixpanel',
-            
-            # Calendar & Tasks
-            'googlecalendar': 'Google Calendar', 
-            'googletasks': 'Google Tasks',
-            'cal': 'Cal.com',
-            'calendly': 'Calendly',
-            
-            # Forms & Surveys
-            'typeform': 'Typeform',
-            'googleforms': 'Google Forms',
-            'form': 'Form Trigger',
-            
-            # Development Tools
-            'webhook': 'Webhook',
-            'httpRequest': 'HTTP Request',
-            'graphql': 'GraphQL',
-            'sse': 'Server-Sent Events',
-            
-            # Utility nodes (exclude from integrations)
-            'set': None,
-            'function': None,
-            'code': None,
-            'if': None,
-            'switch': None,
-            'merge': None,
-            'split': None,
-            'stickynote': None,
-            'stickyNote': None,
-            'wait': None,
-            'schedule': None,
-            'cron': None,
-            'manual': None,
-            'stopanderror': None,
-            'noop': None,
-            'noOp': None,
-            'error': None,
-            'limit': None,
-            'aggregate': None,
-            'summarize': None,
-            'filter': None,
-            'sort': None,
-            'removeDuplicates': None,
-            'dateTime': None,
-            'extractFromFile': None,
-            'convertToFile': None,
-            'readBinaryFile': None,
-            'readBinaryFiles': None,
-            'executionData': None,
-            'executeWorkflow': None,
-            'executeCommand': None,
-            'respondToWebhook': None,
-        }
-        
-        for node in nodes:
-            node_type = node.get('type', '')
-            node_name = node.get('name', '').lower()
-            
-            # Determine trigger type
-            if 'webhook' in node_type.lower() or 'webhook' in node_name:
-                trigger_type = 'Webhook'
-            elif 'cron' in node_type.lower() or 'schedule' in node_type.lower():
-                trigger_type = 'Scheduled'
-            elif 'trigger' in node_type.lower() and trigger_type == 'Manual':
-                if 'manual' not in node_type.lower():
-                    trigger_type = 'Webhook'
-            
-            # Extract integrations with enhanced mapping
-            service_name = None
-            
-            # Handle n8n-nodes-base nodes
-            if node_type.startswith('n8n-nodes-base.'):
-                raw_service = node_type.replace('n8n-nodes-base.', '').lower()
-                raw_service = raw_service.replace('trigger', '')
-                service_name = service_mappings.get(raw_service, raw_service.title() if raw_service else None)
-            
-            # Handle @n8n/ namespaced nodes
-            elif node_type.startswith('@n8n/'):
-                raw_service = node_type.split('.')[-1].lower() if '.' in node_type else node_type.lower()
-                raw_service = raw_service.replace('trigger', '')
-                service_name = service_mappings.get(raw_service, raw_service.title() if raw_service else None)
-            
-            # Handle custom nodes
-            elif '-' in node_type or '@' in node_type:
-                # Try to extract service name from custom node names like "n8n-nodes-youtube-transcription-kasha.youtubeTranscripter"
-                parts = node_type.lower().split('.')
-                for part in parts:
-                    if 'youtube' in part:
-                        service_name = 'YouTube'
-                        break
-                    elif 'telegram' in part:
-                        service_name = 'Telegram'
-                        break
-                    elif 'discord' in part:
-                        service_name = 'Discord'
-                        break
-                    elif 'calcslive' in part:
-                        service_name = 'CalcsLive'
-                        break
-            
-            # Also check node names for service hints (but avoid false positives)
-            for service_key, service_value in service_mappings.items():
-                if service_key in node_name and service_value:
-                    # Avoid false positive: "cal" in calcslive-related terms should not match "Cal.com"
-                    if service_key == 'cal' and any(term in node_name.lower() for term in ['calcslive', 'calc', 'calculation']):
-                        continue
-                    service_name = service_value
-                    break
-            
-            # Add to integrations if valid service found
-            if service_name and service_name not in ['None', None]:
-                integrations.add(service_name)
-        
-        # Determine if complex based on node variety and count
-        if len(nodes) > 10 and len(integrations) > 3:
-            trigger_type = 'Complex'
-        
-        return trigger_type, integrations
+        return NODE_CLASSIFIER.analyze(nodes)
     
     def generate_description(self, workflow: Dict, trigger_type: str, integrations: set) -> str:
         """Generate a descriptive summary of the workflow."""
@@ -439,8 +271,11 @@ class WorkflowDatabase:
         
         return desc + "."
     
+    @QUERY_METRICS.timed("index_all_workflows")
     def index_all_workflows(self, force_reindex: bool = False) -> Dict[str, int]:
         """Index all workflow files. Only reprocesses changed files unless force_reindex=True."""
+        if self.read_only:
+            raise RuntimeError(f"Cannot index into a {self.mode} database ({self.db_path})")
         if not os.path.exists(self.workflows_dir):
             print(f"Warning: Workflows directory '{self.workflows_dir}' not found.")
             return {'processed': 0, 'skipped': 0, 'errors': 0}
@@ -454,191 +289,383 @@ class WorkflowDatabase:
         
         print(f"Indexing {len(json_files)} workflow files...")
         
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
         
-        stats = {'processed': 0, 'skipped': 0, 'errors': 0}
+            stats = {'processed': 0, 'skipped': 0, 'errors': 0}
+            started = time.perf_counter()
+            bytes_read = 0
         
-        for file_path in json_files:
-            filename = os.path.basename(file_path)
+            for file_path in json_files:
+                filename = os.path.basename(file_path)
             
-            try:
-                # Check if file needs to be reprocessed
-                if not force_reindex:
-                    current_hash = self.get_file_hash(file_path)
-                    cursor = conn.execute(
-                        "SELECT file_hash FROM workflows WHERE filename = ?", 
-                        (filename,)
-                    )
-                    row = cursor.fetchone()
-                    if row and row['file_hash'] == current_hash:
-                        stats['skipped'] += 1
+                try:
+                    bytes_read += os.path.getsize(file_path)
+                
+                    # Check if file needs to be reprocessed
+                    if not force_reindex:
+                        current_hash = self.get_file_hash(file_path)
+                        cursor = conn.execute("""
+                            SELECT w.file_hash, b.file_hash IS NOT NULL AS has_blob
+                            FROM workflows w LEFT JOIN workflow_blobs b ON b.file_hash = w.file_hash
+                            WHERE w.filename = ?
+                        """, (filename,))
+                        row = cursor.fetchone()
+                        if row and row['file_hash'] == current_hash:
+                            # Unchanged, but blobs may have been switched on since it was indexed
+                            if self.store_blobs and not row['has_blob']:
+                                self._store_blob(conn, current_hash, file_path)
+                            stats['skipped'] += 1
+                            continue
+                
+                    # Analyze workflow
+                    workflow_data = self.analyze_workflow_file(file_path)
+                    if not workflow_data:
+                        stats['errors'] += 1
                         continue
                 
-                # Analyze workflow
-                workflow_data = self.analyze_workflow_file(file_path)
-                if not workflow_data:
-                    stats['errors'] += 1
-                    continue
+                    # Insert or update in database
+                    conn.execute("""
+                        INSERT OR REPLACE INTO workflows (
+                            filename, name, workflow_id, active, description, trigger_type,
+                            complexity, node_count, integrations, tags, created_at, updated_at,
+                            file_hash, file_size, category, analyzed_at
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    """, (
+                        workflow_data['filename'],
+                        workflow_data['name'],
+                        workflow_data['workflow_id'],
+                        workflow_data['active'],
+                        workflow_data['description'],
+                        workflow_data['trigger_type'],
+                        workflow_data['complexity'],
+                        workflow_data['node_count'],
+                        json.dumps(workflow_data['integrations']),
+                        json.dumps(workflow_data['tags']),
+                        workflow_data['created_at'],
+                        workflow_data['updated_at'],
+                        workflow_data['file_hash'],
+                        workflow_data['file_size'],
+                        workflow_data['category']
+                    ))
                 
-                # Insert or update in database
-                conn.execute("""
-                    INSERT OR REPLACE INTO workflows (
-                        filename, name, workflow_id, active, description, trigger_type,
-                        complexity, node_count, integrations, tags, created_at, updated_at,
-                        file_hash, file_size, analyzed_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """, (
-                    workflow_data['filename'],
-                    workflow_data['name'],
-                    workflow_data['workflow_id'],
-                    workflow_data['active'],
-                    workflow_data['description'],
-                    workflow_data['trigger_type'],
-                    workflow_data['complexity'],
-                    workflow_data['node_count'],
-                    json.dumps(workflow_data['integrations']),
-                    json.dumps(workflow_data['tags']),
-                    workflow_data['created_at'],
-                    workflow_data['updated_at'],
-                    workflow_data['file_hash'],
-                    workflow_data['file_size']
-                ))
+                    # Pre-render the diagram; one that fails here is retried (and reported) on request
+                    try:
+                        for variant, render in DIAGRAM_VARIANTS.items():
+                            text = render(workflow_data['nodes'], workflow_data['connections'])
+                            self._store_diagram(conn, filename, variant, workflow_data['file_hash'], text)
+                    except Exception as e:
+                        print(f"Warning: no diagram for {filename}: {e}")
                 
-                stats['processed'] += 1
+                    if self.store_blobs:
+                        self._store_blob(conn, workflow_data['file_hash'], file_path)
                 
-            except Exception as e:
-                print(f"Error processing {file_path}: {str(e)}")
-                stats['errors'] += 1
-                continue
+                    stats['processed'] += 1
+                
+                except Exception as e:
+                    print(f"Error processing {file_path}: {str(e)}")
+                    stats['errors'] += 1
+                    continue
+        
+            if self.store_blobs:
+                conn.execute("DELETE FROM workflow_blobs WHERE file_hash NOT IN (SELECT file_hash FROM workflows)")
+            # Rows indexed before the category column existed
+            self._update_categories(conn, only_missing=True)
+            conn.commit()
+        finally:
+            conn.close()
         
-        conn.commit()
-        conn.close()
+        INDEX_METRICS.record_run(len(json_files), bytes_read, stats['processed'], stats['skipped'],
+                                 stats['errors'], time.perf_counter() - started)
         
         print(f"✅ Indexing complete: {stats['processed']} processed, {stats['skipped']} skipped, {stats['errors']} errors")
         return stats
     
+    def _update_categories(self, conn: sqlite3.Connection, only_missing: bool = False) -> int:
+        sql = "SELECT filename, category FROM workflows" + (" WHERE category IS NULL" if only_missing else "")
+        updates = []
+        for filename, current in conn.execute(sql).fetchall():
+            category = self.categorize(filename)
+            if category != current:
+                updates.append((category, filename))
+        conn.executemany("UPDATE workflows SET category = ? WHERE filename = ?", updates)
+        return len(updates)
+    
+    def update_categories(self) -> int:
+        """Recompute every stored category (after editing context/def_categories.json); returns rows changed."""
+        if self.read_only:
+            raise RuntimeError(f"Cannot update categories in a {self.mode} database ({self.db_path})")
+        self._category_engine = None
+        conn = self._connect()
+        try:
+            changed = self._update_categories(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        return changed
+    
+    @QUERY_METRICS.timed("get_categories")
+    def get_categories(self) -> List[str]:
+        """Categories with at least one workflow, sorted, always including Uncategorized."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT DISTINCT category FROM workflows WHERE category IS NOT NULL").fetchall()
+        finally:
+            conn.close()
+        return sorted({row[0] for row in rows} | {UNCATEGORIZED})
+    
+    @QUERY_METRICS.timed("get_category_mappings")
+    def get_category_mappings(self) -> Dict[str, str]:
+        """filename -> category for every indexed workflow."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT filename, COALESCE(category, ?) FROM workflows ORDER BY filename",
+                                (UNCATEGORIZED,)).fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
+    
+    @QUERY_METRICS.timed("search_workflows")
     def search_workflows(self, query: str = "", trigger_filter: str = "all", 
                         complexity_filter: str = "all", active_only: bool = False,
-                        limit: int = 50, offset: int = 0) -> Tuple[List[Dict], int]:
+                        limit: int = 50, offset: int = 0, category_filter: str = "all") -> Tuple[List[Dict], int]:
         """Fast search with filters and pagination."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        
-        # Build WHERE clause
-        where_conditions = []
-        params = []
-        
-        if active_only:
-            where_conditions.append("w.active = 1")
-        
-        if trigger_filter != "all":
-            where_conditions.append("w.trigger_type = ?")
-            params.append(trigger_filter)
-        
-        if complexity_filter != "all":
-            where_conditions.append("w.complexity = ?")
-            params.append(complexity_filter)
-        
-        # Use FTS search if query provided
-        if query.strip():
-            # FTS search with ranking
-            base_query = """
-                SELECT w.*, rank
-                FROM workflows_fts fts
-                JOIN workflows w ON w.id = fts.rowid
-                WHERE workflows_fts MATCH ?
-            """
-            params.insert(0, query)
-        else:
-            # Regular query without FTS
-            base_query = """
-                SELECT w.*, 0 as rank
-                FROM workflows w
-                WHERE 1=1
-            """
-        
-        if where_conditions:
-            base_query += " AND " + " AND ".join(where_conditions)
-        
-        # Count total results
-        count_query = f"SELECT COUNT(*) as total FROM ({base_query}) t"
-        cursor = conn.execute(count_query, params)
-        total = cursor.fetchone()['total']
-        
-        # Get paginated results
-        if query.strip():
-            base_query += " ORDER BY rank"
-        else:
-            base_query += " ORDER BY w.analyzed_at DESC"
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+        
+            # Build WHERE clause
+            where_conditions = []
+            params = []
+        
+            if active_only:
+                where_conditions.append("w.active = 1")
+        
+            if trigger_filter != "all":
+                where_conditions.append("w.trigger_type = ?")
+                params.append(trigger_filter)
+        
+            if complexity_filter != "all":
+                where_conditions.append("w.complexity = ?")
+                params.append(complexity_filter)
+        
+            if category_filter != "all":
+                where_conditions.append("w.category = ?")
+                params.append(category_filter)
+        
+            # Use FTS search if query provided
+            if query.strip():
+                # FTS search with ranking
+                base_query = """
+                    SELECT w.*, rank
+                    FROM workflows_fts fts
+                    JOIN workflows w ON w.id = fts.rowid
+                    WHERE workflows_fts MATCH ?
+                """
+                params.insert(0, query)
+            else:
+                # Regular query without FTS
+                base_query = """
+                    SELECT w.*, 0 as rank
+                    FROM workflows w
+                    WHERE 1=1
+                """
+        
+            if where_conditions:
+                base_query += " AND " + " AND ".join(where_conditions)
+        
+            # Count total results
+            count_query = f"SELECT COUNT(*) as total FROM ({base_query}) t"
+            cursor = conn.execute(count_query, params)
+            total = cursor.fetchone()['total']
+        
+            # Get paginated results
+            if query.strip():
+                base_query += " ORDER BY rank"
+            else:
+                base_query += " ORDER BY w.analyzed_at DESC"
         
-        base_query += f" LIMIT {limit} OFFSET {offset}"
+            base_query += f" LIMIT {limit} OFFSET {offset}"
         
-        cursor = conn.execute(base_query, params)
-        rows = cursor.fetchall()
+            cursor = conn.execute(base_query, params)
+            rows = cursor.fetchall()
         
-        # Convert to dictionaries and parse JSON fields
-        results = []
-        for row in rows:
-            workflow = dict(row)
-            workflow['integrations'] = json.loads(workflow['integrations'] or '[]')
+            # Convert to dictionaries and parse JSON fields
+            results = []
+            for row in rows:
+                workflow = dict(row)
+                workflow['integrations'] = json.loads(workflow['integrations'] or '[]')
             
-            # Parse tags and convert dict tags to strings
-            raw_tags = json.loads(workflow['tags'] or '[]')
-            clean_tags = []
-            for tag in raw_tags:
-                if isinstance(tag, dict):
-                    # Extract name from tag dict if available
-                    clean_tags.append(tag.get('name', str(tag.get('id', 'tag'))))
-                else:
-                    clean_tags.append(str(tag))
-            workflow['tags'] = clean_tags
+                # Parse tags and convert dict tags to strings
+                raw_tags = json.loads(workflow['tags'] or '[]')
+                clean_tags = []
+                for tag in raw_tags:
+                    if isinstance(tag, dict):
+                        # Extract name from tag dict if available
+                        clean_tags.append(tag.get('name', str(tag.get('id', 'tag'))))
+                    else:
+                        clean_tags.append(str(tag))
+                workflow['tags'] = clean_tags
             
-            results.append(workflow)
-        
-        conn.close()
+                results.append(workflow)
+        finally:
+            conn.close()
         return results, total
     
+    def _store_diagram(self, conn: sqlite3.Connection, filename: str, variant: str, file_hash: str, text: str):
+        conn.execute(
+            "INSERT OR REPLACE INTO workflow_diagrams (filename, variant, file_hash, version, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (filename, variant, file_hash, DIAGRAM_VERSION, compress_diagram(text))
+        )
+    
+    def _store_blob(self, conn: sqlite3.Connection, file_hash: str, file_path: str):
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        codec, compressed = compress_blob(data)
+        conn.execute(
+            "INSERT OR IGNORE INTO workflow_blobs (file_hash, size, codec, data) VALUES (?, ?, ?, ?)",
+            (file_hash, len(data), codec, compressed)
+        )
+    
+    @QUERY_METRICS.timed("get_workflow_blob")
+    def get_workflow_blob(self, filename: str) -> Optional[WorkflowBlob]:
+        """The workflow file's bytes: from workflow_blobs in one indexed read, else from disk.
+        
+        None if the file is neither stored nor found under workflows_dir.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("""
+                SELECT w.file_hash, b.size, b.codec, b.data
+                FROM workflows w LEFT JOIN workflow_blobs b ON b.file_hash = w.file_hash
+                WHERE w.filename = ?
+            """, (filename,)).fetchone()
+        finally:
+            conn.close()
+        if row is not None and row[3] is not None and can_decode(row[2]):
+            CACHE_METRICS.hit('blob')
+            return WorkflowBlob(*row)
+        
+        CACHE_METRICS.miss('blob')
+        file_path = self.find_workflow_file(filename)
+        if file_path is None:
+            return None
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        return WorkflowBlob.from_file(hashlib.md5(data).hexdigest(), data)
+    
+    def load_workflow_json(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Parsed workflow JSON (see get_workflow_blob), or None if not found."""
+        blob = self.get_workflow_blob(filename)
+        return json.loads(blob.read()) if blob is not None else None
+    
+    def find_workflow_file(self, filename: str) -> Optional[Path]:
+        """Locate a workflow file anywhere under workflows_dir."""
+        return next(Path(self.workflows_dir).rglob(glob.escape(filename)), None)
+    
+    def _cached_variant(self, filename: str, variant: str) -> Optional[Tuple[str, str]]:
+        """(file_hash, text) of a diagram variant, or None if the workflow is not indexed.
+        
+        Served from workflow_diagrams when the stored copy matches the indexed
+        file_hash; otherwise the file is rendered once and the cache refreshed.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("""
+                SELECT w.file_hash, d.file_hash, d.version, d.data
+                FROM workflows w LEFT JOIN workflow_diagrams d ON d.filename = w.filename AND d.variant = ?
+                WHERE w.filename = ?
+            """, (variant, filename)).fetchone()
+            if row is None:
+                return None
+            file_hash, cached_hash, version, blob = row
+            if blob is not None and cached_hash == file_hash and version == DIAGRAM_VERSION:
+                CACHE_METRICS.hit('diagram')
+                return file_hash, decompress_diagram(blob)
+            
+            CACHE_METRICS.miss('diagram')
+            data = self.load_workflow_json(filename)
+            if data is None:
+                raise FileNotFoundError(filename)
+            text = DIAGRAM_VARIANTS[variant](data.get('nodes', []), data.get('connections', {}))
+            if not self.read_only:
+                self._store_diagram(conn, filename, variant, file_hash, text)
+                conn.commit()
+            return file_hash, text
+        finally:
+            conn.close()
+    
+    @QUERY_METRICS.timed("get_diagram")
+    def get_diagram(self, filename: str) -> Optional[Tuple[str, str]]:
+        """(etag, full Mermaid diagram) for an indexed workflow, or None if it is not indexed."""
+        cached = self._cached_variant(filename, 'mermaid')
+        if cached is None:
+            return None
+        file_hash, diagram = cached
+        return diagram_etag(file_hash), diagram
+    
+    @QUERY_METRICS.timed("get_workflow_graph")
+    def get_workflow_graph(self, filename: str) -> Optional[Tuple[str, List[Dict], Dict]]:
+        """(file_hash, nodes, connections) reduced to what diagrams need, or None if not indexed."""
+        cached = self._cached_variant(filename, 'graph')
+        if cached is None:
+            return None
+        file_hash, text = cached
+        graph = json.loads(text)
+        return file_hash, graph['nodes'], graph['connections']
+    
+    @QUERY_METRICS.timed("get_stats")
+    def is_indexed(self) -> bool:
+        """Whether any workflow is indexed (a cheap readiness check, unlike get_stats)."""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT 1 FROM workflows LIMIT 1").fetchone() is not None
+        finally:
+            conn.close()
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        
-        # Basic counts
-        cursor = conn.execute("SELECT COUNT(*) as total FROM workflows")
-        total = cursor.fetchone()['total']
-        
-        cursor = conn.execute("SELECT COUNT(*) as active FROM workflows WHERE active = 1")
-        active = cursor.fetchone()['active']
-        
-        # Trigger type breakdown
-        cursor = conn.execute("""
-            SELECT trigger_type, COUNT(*) as count 
-            FROM workflows 
-            GROUP BY trigger_type
-        """)
-        triggers = {row['trigger_type']: row['count'] for row in cursor.fetchall()}
-        
-        # Complexity breakdown
-        cursor = conn.execute("""
-            SELECT complexity, COUNT(*) as count 
-            FROM workflows 
-            GROUP BY complexity
-        """)
-        complexity = {row['complexity']: row['count'] for row in cursor.fetchall()}
-        
-        # Node stats
-        cursor = conn.execute("SELECT SUM(node_count) as total_nodes FROM workflows")
-        total_nodes = cursor.fetchone()['total_nodes'] or 0
-        
-        # Unique integrations count
-        cursor = conn.execute("SELECT integrations FROM workflows WHERE integrations != '[]'")
-        all_integrations = set()
-        for row in cursor.fetchall():
-            integrations = json.loads(row['integrations'])
-            all_integrations.update(integrations)
-        
-        conn.close()
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+        
+            # Basic counts
+            cursor = conn.execute("SELECT COUNT(*) as total FROM workflows")
+            total = cursor.fetchone()['total']
+        
+            cursor = conn.execute("SELECT COUNT(*) as active FROM workflows WHERE active = 1")
+            active = cursor.fetchone()['active']
+        
+            # Trigger type breakdown
+            cursor = conn.execute("""
+                SELECT trigger_type, COUNT(*) as count 
+                FROM workflows 
+                GROUP BY trigger_type
+            """)
+            triggers = {row['trigger_type']: row['count'] for row in cursor.fetchall()}
+        
+            # Complexity breakdown
+            cursor = conn.execute("""
+                SELECT complexity, COUNT(*) as count 
+                FROM workflows 
+                GROUP BY complexity
+            """)
+            complexity = {row['complexity']: row['count'] for row in cursor.fetchall()}
+        
+            # Node stats
+            cursor = conn.execute("SELECT SUM(node_count) as total_nodes FROM workflows")
+            total_nodes = cursor.fetchone()['total_nodes'] or 0
+        
+            # Unique integrations count
+            cursor = conn.execute("SELECT integrations FROM workflows WHERE integrations != '[]'")
+            all_integrations = set()
+            for row in cursor.fetchall():
+                integrations = json.loads(row['integrations'])
+                all_integrations.update(integrations)
+        finally:
+            conn.close()
         
         return {
             'total': total,
@@ -651,6 +678,19 @@ class WorkflowDatabase:
             'last_indexed': datetime.datetime.now().isoformat()
         }
 
+    @QUERY_METRICS.timed("corpus_totals")
+    def get_corpus_totals(self) -> Dict[str, int]:
+        """Size of the indexed corpus: workflow count, source bytes and nodes."""
+        conn = self._connect()
+        try:
+            row = conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(file_size), 0), COALESCE(SUM(node_count), 0)
+                FROM workflows
+            """).fetchone()
+        finally:
+            conn.close()
+        return {'workflows': row[0], 'bytes': row[1], 'nodes': row[2]}
+
     def get_service_categories(self) -> Dict[str, List[str]]:
         """Get service categories for enhanced filtering."""
         return {
@@ -668,6 +708,7 @@ class WorkflowDatabase:
             'development': ['Webhook', 'HTTP Request', 'GraphQL', 'Server-Sent Events', 'YouTube']
         }
 
+    @QUERY_METRICS.timed("search_by_category")
     def search_by_category(self, category: str, limit: int = 50, offset: int = 0) -> Tuple[List[Dict], int]:
         """Search workflows by service category."""
         categories = self.get_service_categories()
@@ -675,50 +716,51 @@ class WorkflowDatabase:
             return [], 0
         
         services = categories[category]
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        
-        # Build OR conditions for all services in category
-        service_conditions = []
-        params = []
-        for service in services:
-            service_conditions.append("integrations LIKE ?")
-            params.append(f'%"{service}"%')
-        
-        where_clause = " OR ".join(service_conditions)
-        
-        # Count total results
-        count_query = f"SELECT COUNT(*) as total FROM workflows WHERE {where_clause}"
-        cursor = conn.execute(count_query, params)
-        total = cursor.fetchone()['total']
-        
-        # Get paginated results
-        query = f"""
-            SELECT * FROM workflows 
-            WHERE {where_clause}
-            ORDER BY analyzed_at DESC
-            LIMIT {limit} OFFSET {offset}
-        """
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+        
+            # Build OR conditions for all services in category
+            service_conditions = []
+            params = []
+            for service in services:
+                service_conditions.append("integrations LIKE ?")
+                params.append(f'%"{service}"%')
+        
+            where_clause = " OR ".join(service_conditions)
+        
+            # Count total results
+            count_query = f"SELECT COUNT(*) as total FROM workflows WHERE {where_clause}"
+            cursor = conn.execute(count_query, params)
+            total = cursor.fetchone()['total']
+        
+            # Get paginated results
+            query = f"""
+                SELECT * FROM workflows 
+                WHERE {where_clause}
+                ORDER BY analyzed_at DESC
+                LIMIT {limit} OFFSET {offset}
+            """
         
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
-        
-        # Convert to dictionaries and parse JSON fields
-        results = []
-        for row in rows:
-            workflow = dict(row)
-            workflow['integrations'] = json.loads(workflow['integrations'] or '[]')
-            raw_tags = json.loads(workflow['tags'] or '[]')
-            clean_tags = []
-            for tag in raw_tags:
-                if isinstance(tag, dict):
-                    clean_tags.append(tag.get('name', str(tag.get('id', 'tag'))))
-                else:
-                    clean_tags.append(str(tag))
-            workflow['tags'] = clean_tags
-            results.append(workflow)
-        
-        conn.close()
+            cursor = conn.execute(query, params)
+            rows = cursor.fetchall()
+        
+            # Convert to dictionaries and parse JSON fields
+            results = []
+            for row in rows:
+                workflow = dict(row)
+                workflow['integrations'] = json.loads(workflow['integrations'] or '[]')
+                raw_tags = json.loads(workflow['tags'] or '[]')
+                clean_tags = []
+                for tag in raw_tags:
+                    if isinstance(tag, dict):
+                        clean_tags.append(tag.get('name', str(tag.get('id', 'tag'))))
+                    else:
+                        clean_tags.append(str(tag))
+                workflow['tags'] = clean_tags
+                results.append(workflow)
+        finally:
+            conn.close()
         return results, total
 
 
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Workflow Diagrams
+Mermaid.js flowcharts for workflow JSON, plus the compressed form they are
+cached in (workflow_diagrams table, keyed by the workflow's file_hash).
+
+A diagram depends only on the file contents, so WorkflowDatabase renders
+it once while indexing and the API serves the stored copy with an ETag.
+DIAGRAM_VERSION is part of the cache key: bump it whenever the output of
+generate_mermaid_diagram changes and cached diagrams are re-rendered on
+their next request.
+
+Big workflows (hundreds of nodes) are unreadable drawn node by node, so
+generate_lod_diagram offers coarser levels of detail: linear chains folded
+into one box, and nodes grouped into clusters by layer or by type that the
+client can expand one at a time. Those renderings depend on request
+parameters and are built from the cached compact graph instead.
+"""
+
+import hashlib
+import json
+import zlib
+from collections import Counter, defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DIAGRAM_VERSION = 2
+
+DETAIL_LEVELS = ('full', 'auto', 'clustered')
+CLUSTER_MODES = ('layer', 'type')
+DEFAULT_MAX_NODES = 60
+MIN_CHAIN_LENGTH = 3
+
+# Node style by class; a type's class is decided once and remembered in _STYLE_CLASSES
+NODE_STYLES: Dict[str, str] = {
+    'trigger': "fill:#b3e0ff,stroke:#0066cc",      # Blue for triggers
+    'conditional': "fill:#ffffb3,stroke:#e6e600",  # Yellow for conditional nodes
+    'code': "fill:#d9b3ff,stroke:#6600cc",         # Purple for code nodes
+    'error': "fill:#ffb3b3,stroke:#cc0000",        # Red for error handlers
+    'default': "fill:#d9d9d9,stroke:#666666",      # Gray for other nodes
+    'chain': "fill:#f1f5f9,stroke:#64748b",        # Collapsed linear chains
+    'cluster': "fill:#e8f0fe,stroke:#3b82f6,stroke-dasharray:4 2",  # Collapsed clusters
+}
+# Checked in order; the first class with a matching substring wins
+_STYLE_RULES = (
+    ('trigger', ('trigger', 'webhook', 'cron')),
+    ('conditional', ('if', 'switch')),
+    ('code', ('function', 'code')),
+    ('error', ('error',)),
+)
+_STYLE_CLASSES: Dict[str, str] = {}
+
+
+def node_style_class(node_type: str) -> str:
+    """Style class for a node type (without the n8n-nodes-base. prefix)."""
+    style_class = _STYLE_CLASSES.get(node_type)
+    if style_class is None:
+        lowered = node_type.lower()
+        style_class = next((name for name, needles in _STYLE_RULES
+                            if any(needle in lowered for needle in needles)), 'default')
+        if len(_STYLE_CLASSES) < 10000:
+            _STYLE_CLASSES[node_type] = style_class
+    return style_class
+
+
+class WorkflowGraph:
+    """Nodes and main-output edges of a workflow, addressed by position.
+
+    Connections reference nodes by name; when names repeat, edges attach to
+    the first node of that name, but every node keeps its own position (and
+    Mermaid id) instead of overwriting the others.
+    """
+
+    def __init__(self, nodes: List[Dict], connections: Dict, skip_notes: bool = False):
+        self.names: List[str] = []
+        self.types: List[str] = []
+        self.style_classes: List[str] = []
+        first_index: Dict[str, int] = {}
+        for i, node in enumerate(nodes):
+            node_type = node.get('type', '').replace('n8n-nodes-base.', '')
+            if skip_notes and node_type == 'stickyNote':
+                continue
+            name = node.get('name', f'Node {i}')
+            first_index.setdefault(name, len(self.names))
+            self.names.append(name)
+            self.types.append(node_type)
+            self.style_classes.append(node_style_class(node_type))
+
+        # (source, target, output label); the label is the output index for multi-output nodes
+        self.edges: List[Tuple[int, int, Optional[int]]] = []
+        for source_name, source_connections in (connections or {}).items():
+            source = first_index.get(source_name)
+            if source is None or not isinstance(source_connections, dict):
+                continue
+            main_connections = source_connections.get('main')
+            if not isinstance(main_connections, list):
+                continue
+            for output, output_connections in enumerate(main_connections):
+                if not isinstance(output_connections, list):
+                    continue
+                for connection in output_connections:
+                    if not isinstance(connection, dict) or not isinstance(connection.get('node'), str):
+                        continue
+                    target = first_index.get(connection['node'])
+                    if target is not None:
+                        self.edges.append((source, target, output if len(main_connections) > 1 else None))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def node_label(self, index: int) -> str:
+        return f"{_clean(self.names[index])}<br>({_clean(self.types[index])})"
+
+
+def _clean(text: str) -> str:
+    return str(text).replace('"', "'")
+
+
+def _class_lines(assignments: Dict[str, List[str]]) -> List[str]:
+    """classDef once per style plus one class line per style, instead of a style line per node."""
+    lines = []
+    for style_class, ids in assignments.items():
+        lines.append(f"  classDef {style_class} {NODE_STYLES[style_class]}")
+        lines.append(f"  class {','.join(ids)} {style_class}")
+    return lines
+
+
+def generate_mermaid_diagram(nodes: List[Dict], connections: Dict) -> str:
+    """Generate Mermaid.js flowchart code from workflow nodes and connections."""
+    if not nodes:
+        return "graph TD\n  EmptyWorkflow[No nodes found in workflow]"
+
+    graph = WorkflowGraph(nodes, connections)
+    mermaid_code = ["graph TD"]
+    classes: Dict[str, List[str]] = defaultdict(list)
+    for i in range(len(graph)):
+        mermaid_code.append(f"  node{i}[\"{graph.node_label(i)}\"]")
+        classes[graph.style_classes[i]].append(f"node{i}")
+
+    # Add arrow with output index if multiple outputs
+    for source, target, output in graph.edges:
+        arrow = f" -->|{output}| " if output is not None else " --> "
+        mermaid_code.append(f"  node{source}{arrow}node{target}")
+
+    mermaid_code.extend(_class_lines(classes))
+    return "\n".join(mermaid_code)
+
+
+# --- Level of detail ----------------------------------------------------------
+
+def _collapse_chains(graph: WorkflowGraph, min_length: int = MIN_CHAIN_LENGTH) -> List[List[int]]:
+    """Group nodes into units; runs of >= min_length nodes linked one-to-one become one unit."""
+    successors: List[set] = [set() for _ in range(len(graph))]
+    predecessors: List[set] = [set() for _ in range(len(graph))]
+    for source, target, _ in graph.edges:
+        if source != target:
+            successors[source].add(target)
+            predecessors[target].add(source)
+
+    def next_in_chain(node: int) -> Optional[int]:
+        if len(successors[node]) != 1:
+            return None
+        target = next(iter(successors[node]))
+        return target if len(predecessors[target]) == 1 else None
+
+    continued = {target for target in (next_in_chain(node) for node in range(len(graph))) if target is not None}
+    units: List[List[int]] = []
+    assigned = set()
+    # Chain heads first, then whatever is left (members of pure cycles)
+    for start in [n for n in range(len(graph)) if n not in continued] + list(range(len(graph))):
+        if start in assigned:
+            continue
+        chain = [start]
+        assigned.add(start)
+        node = next_in_chain(start)
+        while node is not None and node not in assigned:
+            chain.append(node)
+            assigned.add(node)
+            node = next_in_chain(node)
+        if len(chain) >= min_length:
+            units.append(chain)
+        else:
+            units.extend([member] for member in chain)
+    return units
+
+
+def _unit_edges(graph: WorkflowGraph, unit_of: List[int]) -> Dict[Tuple[int, int], List[Optional[int]]]:
+    edges: Dict[Tuple[int, int], List[Optional[int]]] = {}
+    for source, target, output in graph.edges:
+        pair = (unit_of[source], unit_of[target])
+        if pair[0] != pair[1]:
+            edges.setdefault(pair, []).append(output)
+    return edges
+
+
+def _layers(unit_count: int, edges: Iterable[Tuple[int, int]]) -> List[int]:
+    """Longest-path layer of each unit; units on cycles continue from their layered predecessors."""
+    successors: List[List[int]] = [[] for _ in range(unit_count)]
+    indegree = [0] * unit_count
+    for source, target in edges:
+        successors[source].append(target)
+        indegree[target] += 1
+    layer = [0] * unit_count
+    ready = deque(u for u in range(unit_count) if indegree[u] == 0)
+    done = [False] * unit_count
+    while True:
+        while ready:
+            unit = ready.popleft()
+            done[unit] = True
+            for target in successors[unit]:
+                layer[target] = max(layer[target], layer[unit] + 1)
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    ready.append(target)
+        remaining = [u for u in range(unit_count) if not done[u]]
+        if not remaining:
+            return layer
+        # Break a cycle at its shallowest node
+        unit = min(remaining, key=lambda u: layer[u])
+        indegree[unit] = 0
+        ready.append(unit)
+
+
+def _summarize_types(graph: WorkflowGraph, members: List[int], limit: int = 3) -> str:
+    counts = Counter(graph.types[m] or 'node' for m in members)
+    parts = [f"{node_type} ×{count}" if count > 1 else node_type for node_type, count in counts.most_common(limit)]
+    if len(counts) > limit:
+        parts.append(f"+{len(counts) - limit} more")
+    return _clean(", ".join(parts))
+
+
+def _unit_line(graph: WorkflowGraph, unit_id: str, unit: List[int]) -> str:
+    if len(unit) == 1:
+        return f"  {unit_id}[\"{graph.node_label(unit[0])}\"]"
+    first, last = _clean(graph.names[unit[0]]), _clean(graph.names[unit[-1]])
+    return f"  {unit_id}[[\"{first} → … → {last}<br>({len(unit)} steps: {_summarize_types(graph, unit)})\"]]"
+
+
+def generate_lod_diagram(nodes: List[Dict], connections: Dict, detail: str = 'auto',
+                         cluster_by: str = 'layer', max_nodes: int = DEFAULT_MAX_NODES,
+                         expand: Iterable[str] = ()) -> Dict[str, Any]:
+    """Level-of-detail Mermaid rendering for large workflows.
+
+    detail:
+      full       every node (generate_mermaid_diagram)
+      auto       every node when they fit in max_nodes; otherwise linear chains
+                 are collapsed, and if that is not enough nodes are grouped
+                 into collapsed clusters
+      clustered  always group nodes into subgraphs
+    cluster_by: 'layer' (distance from the trigger) or 'type' (node type).
+    expand: cluster ids (from the returned 'clusters') to show node by node.
+
+    At most max_nodes boxes are drawn; an expanded cluster that does not fit
+    shows its first nodes and a "+N more" box. Sticky notes are left out of
+    every mode but full.
+    """
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail must be one of {', '.join(DETAIL_LEVELS)}")
+    if cluster_by not in CLUSTER_MODES:
+        raise ValueError(f"cluster_by must be one of {', '.join(CLUSTER_MODES)}")
+    result: Dict[str, Any] = {'detail': detail, 'node_count': len(nodes), 'clusters': [], 'truncated': False}
+    if detail == 'full' or not nodes:
+        result['diagram'] = generate_mermaid_diagram(nodes, connections)
+        result['rendered_nodes'] = len(nodes)
+        return result
+
+    graph = WorkflowGraph(nodes, connections, skip_notes=True)
+    units = [[i] for i in range(len(graph))]
+    if len(graph) > max_nodes or detail == 'clustered':
+        if cluster_by == 'layer':
+            units = _collapse_chains(graph)
+    unit_of = [0] * len(graph)
+    for u, unit in enumerate(units):
+        for member in unit:
+            unit_of[member] = u
+    edges = _unit_edges(graph, unit_of)
+
+    if detail == 'auto' and len(units) <= max_nodes:
+        result['detail'] = 'auto' if len(units) == len(graph) else 'collapsed'
+        entity_of = [f"n{u}" for u in range(len(units))]
+        lines = ["graph TD"] + [_unit_line(graph, entity_of[u], unit) for u, unit in enumerate(units)]
+        classes: Dict[str, List[str]] = defaultdict(list)
+        for u, unit in enumerate(units):
+            classes['chain' if len(unit) > 1 else graph.style_classes[unit[0]]].append(entity_of[u])
+        result['rendered_nodes'] = len(units)
+    else:
+        result['detail'] = 'clustered'
+        lines, classes, entity_of = _render_clusters(graph, units, edges, cluster_by, max_nodes,
+                                                     set(expand), result)
+
+    # Edges between the boxes actually drawn; parallel ones become a single "×N" edge
+    entity_edges: Dict[Tuple[str, str], List[Optional[int]]] = {}
+    for (source, target), outputs in edges.items():
+        pair = (entity_of[source], entity_of[target])
+        if pair[0] != pair[1]:
+            entity_edges.setdefault(pair, []).extend(outputs)
+    for (source_entity, target_entity), outputs in entity_edges.items():
+        if len(outputs) == 1:
+            arrow = f" -->|{outputs[0]}| " if outputs[0] is not None else " --> "
+        else:
+            arrow = f" -->|×{len(outputs)}| "
+        lines.append(f"  {source_entity}{arrow}{target_entity}")
+    lines.extend(_class_lines(classes))
+    result['diagram'] = "\n".join(lines)
+    return result
+
+
+def _render_clusters(graph: WorkflowGraph, units: List[List[int]], edges, cluster_by: str,
+                     max_nodes: int, expand: set, result: Dict[str, Any]):
+    """Subgraph lines, style classes and unit -> drawn box id for clustered mode."""
+    if cluster_by == 'layer':
+        layer = _layers(len(units), edges.keys())
+        connected = {u for pair in edges for u in pair} | {u for u, unit in enumerate(units) if len(unit) > 1}
+        depth = max(layer) + 1 if layer else 1
+        band = -(-depth // (max_nodes - 1))  # merge layers so there are at most max_nodes clusters
+        # Nodes without any edge would otherwise all pile into the first step
+        keys = [layer[u] // band if u in connected else 'unconnected' for u in range(len(units))]
+        names = {key: (f"Step {key * band + 1}" if band == 1 else
+                       f"Steps {key * band + 1}-{min(depth, (key + 1) * band)}")
+                 for key in set(keys) if key != 'unconnected'}
+        order = sorted(names)
+        if 'unconnected' in keys:
+            names['unconnected'] = "Unconnected"
+            order.append('unconnected')
+    else:
+        type_counts = Counter(graph.types[unit[0]] or 'node' for unit in units)
+        kept = [node_type for node_type, _ in type_counts.most_common(max_nodes - 1)]
+        keys = [graph.types[unit[0]] or 'node' for unit in units]
+        keys = [key if key in kept else 'other' for key in keys]
+        order = kept + (['other'] if 'other' in keys else [])
+        names = {key: key for key in order}
+
+    members: Dict[Any, List[int]] = defaultdict(list)
+    for u, key in enumerate(keys):
+        members[key].append(u)
+    cluster_ids = {key: f"c{i}" for i, key in enumerate(order)}
+    # Everything fits: clustered mode shows all clusters open unless some were asked for
+    open_all = len(units) <= max_nodes and not expand
+
+    lines = ["graph TD"]
+    classes: Dict[str, List[str]] = defaultdict(list)
+    entity_of = [''] * len(units)
+    # Every cluster gets one box; expanded ones share what is left for their extra nodes
+    budget = max_nodes - len(order)
+    for key in order:
+        cluster_id = cluster_ids[key]
+        cluster_units = members[key]
+        node_total = sum(len(units[u]) for u in cluster_units)
+        label = f"{names[key]} · {node_total} node{'s' if node_total != 1 else ''}"
+        expanded = open_all or cluster_id in expand
+        result['clusters'].append({'id': cluster_id, 'label': _clean(label), 'nodes': node_total,
+                                   'expanded': expanded})
+        if not expanded:
+            members_flat = [m for u in cluster_units for m in units[u]]
+            lines.append(f"  {cluster_id}[[\"{_clean(label)}<br>{_summarize_types(graph, members_flat)}\"]]")
+            classes['cluster'].append(cluster_id)
+            for u in cluster_units:
+                entity_of[u] = cluster_id
+            continue
+
+        lines.append(f"  subgraph {cluster_id}[\"{_clean(label)}\"]")
+        shown = cluster_units if len(cluster_units) <= budget + 1 else cluster_units[:budget]
+        for u in shown:
+            entity_of[u] = f"n{u}"
+            lines.append("  " + _unit_line(graph, entity_of[u], units[u]))
+            classes['chain' if len(units[u]) > 1 else graph.style_classes[units[u][0]]].append(entity_of[u])
+        hidden = cluster_units[len(shown):]
+        if hidden:
+            more_id = f"{cluster_id}more"
+            lines.append(f"    {more_id}[\"+{len(hidden)} more\"]")
+            classes['cluster'].append(more_id)
+            for u in hidden:
+                entity_of[u] = more_id
+            result['truncated'] = True
+        budget -= len(shown) - (0 if hidden else 1)
+        lines.append("  end")
+
+    result['rendered_nodes'] = len(set(entity_of))
+    return lines, classes, entity_of
+
+
+def compact_graph(nodes: List[Dict], connections: Dict) -> str:
+    """Just the parts of a workflow the diagram generators read, as JSON."""
+    compact_nodes = [{'name': node.get('name'), 'type': node.get('type', '')} if 'name' in node
+                     else {'type': node.get('type', '')} for node in nodes]
+    compact_connections = {name: {'main': value['main']} for name, value in (connections or {}).items()
+                           if isinstance(value, dict) and 'main' in value}
+    return json.dumps({'nodes': compact_nodes, 'connections': compact_connections}, separators=(',', ':'))
+
+
+def compress_diagram(diagram: str) -> bytes:
+    return zlib.compress(diagram.encode('utf-8'), 6)
+
+
+def decompress_diagram(blob: bytes) -> str:
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def diagram_etag(file_hash: Optional[str], options: str = '') -> str:
+    """Strong ETag for the diagram of a given file version and rendering options."""
+    suffix = f"-{hashlib.md5(options.encode('utf-8')).hexdigest()[:10]}" if options else ''
+    return f'"{file_hash}-d{DIAGRAM_VERSION}{suffix}"'
@@ -13,25 +13,26 @@ from collections import defaultdict
 import shutil
 from datetime import datetime
 
+from backup_store import BackupStore, DEFAULT_STORE_DIR
+
 class WorkflowExcellenceUpgrader:
-    def __init__(self, workflows_dir="workflows", backup_dir="workflows_backup"):
+    def __init__(self, workflows_dir="workflows", backup_dir=DEFAULT_STORE_DIR):
         self.workflows_dir = Path(workflows_dir)
         self.backup_dir = Path(backup_dir)
+        self.backup_store = BackupStore(backup_dir)
+        self.backup_run_id = None
         self.upgrade_stats = defaultdict(int)
         self.issues_fixed = defaultdict(int)
         
-        # Create backup directory
-        self.backup_dir.mkdir(exist_ok=True)
-        
     def create_backup(self):
         """Create backup of original workflows before modifications"""
         print("📦 Creating backup of original workflows...")
         
-        if self.backup_dir.exists():
-            shutil.rmtree(self.backup_dir)
+        with self.backup_store.begin_run('workflow_excellence', self.workflows_dir) as run:
+            run.add_tree(self.workflows_dir)
         
-        shutil.copytree(self.workflows_dir, self.backup_dir)
-        print(f"✅ Backup created at: {self.backup_dir}")
+        self.backup_run_id = run.run_id
+        print(f"✅ Backup run {run.run_id} created ({run.stats['bytes_stored']:,} new bytes stored)")
     
     def analyze_quality_issues(self, workflow_data: Dict) -> List[Dict]:
         """Analyze specific quality issues in a workflow"""
@@ -512,14 +513,15 @@ class WorkflowExcellenceUpgrader:
         report_data = {
             'upgrade_timestamp': datetime.now().isoformat(),
             'summary': upgrade_results,
-            'backup_location': str(self.backup_dir)
+            'backup_location': str(self.backup_dir),
+            'backup_run_id': self.backup_run_id
         }
         
         with open("workflow_upgrade_report.json", "w") as f:
             json.dump(report_data, f, indent=2)
         
         print(f"\n📄 Detailed report saved to: workflow_upgrade_report.json")
-        print(f"📦 Original workflows backed up to: {self.backup_dir}")
+        print(f"📦 Original workflows backed up as run {self.backup_run_id} (restore: python backup_store.py restore {self.backup_run_id})")
 
 def main():
     """Main upgrade function"""
@@ -17,6 +17,17 @@ from pathlib import Path
 from typing import Dict, List, Any, Set
 from collections import defaultdict
 
+from security_scanner import SecretScanner
+
+SENSITIVE_DATA_SCANNER = SecretScanner(
+    key_rules={'sensitive': [
+        'password', 'token', 'key', 'secret', 'credential',
+        'api_key', 'access_token', 'refresh_token', 'sessionKey'
+    ]},
+    scan_urls=False
+)
+HARDCODED_URL_SCANNER = SecretScanner(key_rules={}, url_pattern=r'https?://[^\s"\'<>]+')
+
 class WorkflowFixer:
     def __init__(self, workflows_dir="workflows"):
         self.workflows_dir = Path(workflows_dir)
@@ -32,70 +43,28 @@ class WorkflowFixer:
         
     def fix_sensitive_data(self, workflow_data: Dict) -> Dict:
         """Remove or replace sensitive data with placeholders"""
-        fixed = False
-        
-        def replace_sensitive_values(obj, path=""):
-            nonlocal fixed
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
-                    
-                    # Check for sensitive data patterns
-                    sensitive_patterns = [
-                        r'password', r'token', r'key', r'secret', r'credential',
-                        r'api_key', r'access_token', r'refresh_token', r'sessionKey'
-                    ]
-                    
-                    if any(pattern in key.lower() for pattern in sensitive_patterns):
-                        if value and str(value).strip() and value != "":
-                            if isinstance(value, str) and not value.startswith('{{') and not value.startswith('${'):
-                                obj[key] = f"{{{{ $credentials.{key} }}}}"
-                                fixed = True
-                    
-                    # Recursively check nested objects
-                    replace_sensitive_values(value, current_path)
-                    
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    replace_sensitive_values(item, f"{path}[{i}]")
-        
-        replace_sensitive_values(workflow_data)
-        return workflow_data, fixed
+        def credential_placeholder(finding):
+            value = finding.value
+            if isinstance(value, str) and not value.startswith('{{') and not value.startswith('${'):
+                return f"{{{{ $credentials.{finding.key} }}}}"
+            return None
+        
+        workflow_data, findings = SENSITIVE_DATA_SCANNER.redact(workflow_data, key_replacement=credential_placeholder)
+        return workflow_data, bool(findings)
     
     def fix_hardcoded_urls(self, workflow_data: Dict) -> Dict:
         """Replace hardcoded URLs with environment variables or placeholders"""
-        fixed = False
-        
-        def replace_urls(obj, path=""):
-            nonlocal fixed
-            if isinstance(obj, str):
-                # Match URLs but not expressions
-                url_pattern = r'https?://[^\s"\'<>]+'
-                urls = re.findall(url_pattern, obj)
-                
-                for url in urls:
-                    if not any(placeholder in obj for placeholder in ['{{', '${', 'YOUR_', 'PLACEHOLDER']):
-                        # Replace with environment variable pattern
-                        if 'myshopify.com' in url:
-                            obj = obj.replace(url, "{{ $env.SHOPIFY_URL }}")
-                        elif 'webhook' in url.lower():
-                            obj = obj.replace(url, "{{ $env.WEBHOOK_URL }}")
-                        else:
-                            obj = obj.replace(url, "{{ $env.API_BASE_URL }}")
-                        fixed = True
-                        
-            elif isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
-                    obj[key] = replace_urls(value, current_path)
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    obj[i] = replace_urls(item, f"{path}[{i}]")
-                    
-            return obj
-        
-        workflow_data = replace_urls(workflow_data)
-        return workflow_data, fixed
+        def env_placeholder(url):
+            # Replace with environment variable pattern
+            if 'myshopify.com' in url:
+                return "{{ $env.SHOPIFY_URL }}"
+            elif 'webhook' in url.lower():
+                return "{{ $env.WEBHOOK_URL }}"
+            return "{{ $env.API_BASE_URL }}"
+        
+        # Strings that already contain expressions or placeholders are left alone
+        workflow_data, findings = HARDCODED_URL_SCANNER.redact(workflow_data, url_replacement=env_placeholder)
+        return workflow_data, bool(findings)
     
     def add_error_handling(self, workflow_data: Dict) -> Dict:
         """Add error handling nodes to workflows that need them"""
@@ -13,9 +13,15 @@ from typing import Dict, List, Any
 import requests
 from collections import defaultdict
 
+from analysis_store import AnalysisRecord, AnalysisStore, workflow_files
+
 class WorkflowMonitor:
-    def __init__(self, workflows_dir="workflows"):
+    ANALYZER_NAME = "health"
+    ANALYZER_VERSION = 1  # bump when health checks change so stored results are recomputed
+    
+    def __init__(self, workflows_dir="workflows", analysis_db=None):
         self.workflows_dir = Path(workflows_dir)
+        self.store = AnalysisStore(analysis_db)
         self.monitoring_data = {
             'last_check': None,
             'workflow_status': {},
@@ -60,54 +66,58 @@ class WorkflowMonitor:
         
         return health_status
     
-    def generate_health_report(self) -> Dict[str, Any]:
+    def check_workflow_file(self, workflow_file: Path) -> AnalysisRecord:
+        """Health-check one workflow file for the analysis store"""
+        try:
+            with open(workflow_file, 'r', encoding='utf-8') as f:
+                workflow_data = json.load(f)
+            
+            health_status = self.check_workflow_health(workflow_data)
+            workflow_name = workflow_data.get('name', workflow_file.stem)
+        except Exception as e:
+            workflow_name = workflow_file.name
+            health_status = {
+                'status': 'error',
+                'issues': [f'Failed to parse: {str(e)}']
+            }
+        
+        # Parse failures count as critical but not as common issues
+        findings = [] if health_status['status'] == 'error' else health_status['issues'] + health_status['warnings']
+        return AnalysisRecord(
+            result={'workflow_name': workflow_name, 'health': health_status},
+            workflow_name=workflow_name,
+            score=health_status.get('metrics', {}).get('complexity_score'),
+            status=health_status['status'],
+            issue_count=len(health_status['issues']) + len(health_status.get('warnings', [])),
+            labels={'issue': {finding: 1 for finding in findings}}
+        )
+    
+    def generate_health_report(self, force: bool = False) -> Dict[str, Any]:
         """Generate comprehensive health report for all workflows"""
         print("🏥 Generating workflow health report...")
         
+        run_stats = self.store.run(
+            self.ANALYZER_NAME, self.ANALYZER_VERSION, workflow_files(self.workflows_dir),
+            self.check_workflow_file, force=force,
+            root=self.workflows_dir
+        )
+        print(run_stats.summary())
+        
+        name = self.ANALYZER_NAME
+        status_counts = self.store.status_counts(name)
         health_report = {
             'timestamp': datetime.now().isoformat(),
-            'total_workflows': 0,
-            'healthy_workflows': 0,
-            'warning_workflows': 0,
-            'critical_workflows': 0,
-            'workflow_details': {},
-            'common_issues': defaultdict(int),
+            'total_workflows': sum(count for status, count in status_counts.items() if status != 'error'),
+            'healthy_workflows': status_counts.get('healthy', 0),
+            'warning_workflows': status_counts.get('warning', 0),
+            'critical_workflows': status_counts.get('critical', 0) + status_counts.get('error', 0),
+            'workflow_details': {
+                result['workflow_name']: result['health'] for result in self.store.results(name)
+            },
+            'common_issues': defaultdict(int, self.store.label_counts(name, 'issue')),
             'recommendations': []
         }
         
-        for category_dir in self.workflows_dir.iterdir():
-            if category_dir.is_dir():
-                for workflow_file in category_dir.glob('*.json'):
-                    try:
-                        with open(workflow_file, 'r', encoding='utf-8') as f:
-                            workflow_data = json.load(f)
-                        
-                        health_status = self.check_workflow_health(workflow_data)
-                        workflow_name = workflow_data.get('name', workflow_file.stem)
-                        
-                        health_report['total_workflows'] += 1
-                        health_report['workflow_details'][workflow_name] = health_status
-                        
-                        if health_status['status'] == 'healthy':
-                            health_report['healthy_workflows'] += 1
-                        elif health_status['status'] == 'warning':
-                            health_report['warning_workflows'] += 1
-                        else:
-                            health_report['critical_workflows'] += 1
-                        
-                        # Track common issues
-                        for issue in health_status['issues']:
-                            health_report['common_issues'][issue] += 1
-                        for warning in health_status['warnings']:
-                            health_report['common_issues'][warning] += 1
-                            
-                    except Exception as e:
-                        health_report['workflow_details'][workflow_file.name] = {
-                            'status': 'error',
-                            'issues': [f'Failed to parse: {str(e)}']
-                        }
-                        health_report['critical_workflows'] += 1
-        
         # Generate recommendations
         if health_report['warning_workflows'] > health_report['total_workflows'] * 0.3:
             health_report['recommendations'].append('Consider adding error handling to more workflows')
@@ -229,11 +239,11 @@ class WorkflowMonitor:
         
         print("📊 Dashboard saved to: workflow_dashboard.html")
     
-    def run_monitoring(self):
+    def run_monitoring(self, force: bool = False, include_details: bool = False):
         """Run complete monitoring process"""
         print("🔍 Starting workflow monitoring...")
         
-        health_report = self.generate_health_report()
+        health_report = self.generate_health_report(force=force)
         
         # Print summary
         print(f"\n📊 HEALTH SUMMARY:")
@@ -250,6 +260,10 @@ class WorkflowMonitor:
         # Save dashboard
         self.save_dashboard(health_report)
         
+        # Per-workflow details live in the analysis store; only embed them on request
+        if not include_details:
+            health_report = {key: value for key, value in health_report.items() if key != 'workflow_details'}
+        
         # Save detailed report
         with open("workflow_health_report.json", "w") as f:
             json.dump(health_report, f, indent=2)
@@ -259,8 +273,17 @@ class WorkflowMonitor:
 
 def main():
     """Main monitoring function"""
-    monitor = WorkflowMonitor()
-    monitor.run_monitoring()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Check workflow health and build the monitoring dashboard')
+    parser.add_argument('--workflows-dir', default='workflows')
+    parser.add_argument('--analysis-db', help='Analysis store path (default: database/analysis.db)')
+    parser.add_argument('--force', action='store_true', help='Re-check every workflow, ignoring stored results')
+    parser.add_argument('--details', action='store_true', help='Embed every per-workflow status in the JSON report')
+    args = parser.parse_args()
+    
+    monitor = WorkflowMonitor(args.workflows_dir, args.analysis_db)
+    monitor.run_monitoring(force=args.force, include_details=args.details)
 
 if __name__ == "__main__":
     main()
@@ -10,16 +10,22 @@ from pathlib import Path
 from collections import defaultdict, Counter
 import re
 
+from analysis_store import AnalysisRecord, AnalysisStore, workflow_files
+
 class WorkflowPatternAnalyzer:
-    def __init__(self, workflows_dir="workflows"):
+    ANALYZER_NAME = "patterns"
+    ANALYZER_VERSION = 1  # bump when detection rules change so stored results are recomputed
+    
+    def __init__(self, workflows_dir="workflows", analysis_db=None):
         self.workflows_dir = Path(workflows_dir)
+        self.store = AnalysisStore(analysis_db)
         self.patterns = defaultdict(int)
         self.node_types = Counter()
         self.integrations = Counter()
         self.trigger_patterns = Counter()
         self.complexity_distribution = Counter()
         self.error_handling_patterns = Counter()
-        self.data_flow_patterns = defaultdict(list)
+        self.data_flow_patterns = {}
         
     def analyze_workflow(self, workflow_path):
         """Analyze a single workflow file"""
@@ -32,16 +38,15 @@ class WorkflowPatternAnalyzer:
             
             # Basic metrics
             node_count = len(nodes)
-            self.complexity_distribution[self.get_complexity_level(node_count)] += 1
             
             # Analyze nodes
             node_types = []
             integrations = set()
             triggers = []
+            error_handlers = []
             
             for node in nodes:
                 node_type = node.get('type', '')
-                node_name = node.get('name', '')
                 
                 # Extract integration from node type
                 if '.' in node_type:
@@ -49,30 +54,28 @@ class WorkflowPatternAnalyzer:
                     integrations.add(integration)
                 
                 node_types.append(node_type)
-                self.node_types[node_type] += 1
                 
                 # Identify trigger nodes
                 if any(t in node_type.lower() for t in ['trigger', 'webhook', 'cron', 'schedule']):
                     triggers.append(node_type)
-                    self.trigger_patterns[node_type] += 1
                 
                 # Check for error handling
                 if any(e in node_type.lower() for e in ['error', 'catch']):
-                    self.error_handling_patterns[node_type] += 1
+                    error_handlers.append(node_type)
             
             # Analyze data flow patterns
-            self.analyze_data_flow(nodes, connections)
-            
-            # Store integration info
-            for integration in integrations:
-                self.integrations[integration] += 1
+            connection_count, patterns = self.analyze_data_flow(nodes, connections)
             
             return {
                 'filename': workflow_path.name,
                 'node_count': node_count,
+                'complexity': self.get_complexity_level(node_count),
                 'node_types': node_types,
-                'integrations': list(integrations),
+                'integrations': sorted(integrations),
                 'triggers': triggers,
+                'error_handlers': error_handlers,
+                'connection_count': connection_count,
+                'patterns': patterns,
                 'has_error_handling': any('error' in nt.lower() for nt in node_types)
             }
             
@@ -90,44 +93,89 @@ class WorkflowPatternAnalyzer:
             return 'Complex'
     
     def analyze_data_flow(self, nodes, connections):
-        """Analyze data flow patterns in workflows"""
+        """Analyze data flow patterns in workflows, returning (connection count, matched patterns)"""
         # Count connection patterns
         connection_count = 0
         for source, targets in connections.items():
             if isinstance(targets, dict) and 'main' in targets:
                 connection_count += len(targets['main'])
         
-        self.data_flow_patterns['total_connections'].append(connection_count)
-        
         # Identify common patterns
         node_names = [node.get('name', '') for node in nodes]
+        patterns = []
         
         # HTTP -> Process -> Store pattern
         if any('http' in name.lower() for name in node_names) and \
            any('process' in name.lower() or 'transform' in name.lower() for name in node_names):
-            self.patterns['http_process_store'] += 1
+            patterns.append('http_process_store')
         
         # Trigger -> Filter -> Action pattern
         if any('trigger' in name.lower() for name in node_names) and \
            any('filter' in name.lower() for name in node_names):
-            self.patterns['trigger_filter_action'] += 1
+            patterns.append('trigger_filter_action')
         
         # Loop patterns
         if any('loop' in name.lower() or 'batch' in name.lower() for name in node_names):
-            self.patterns['loop_processing'] += 1
+            patterns.append('loop_processing')
+        
+        return connection_count, patterns
+    
+    def to_record(self, workflow_path):
+        """Store-friendly record; unreadable workflows are kept with status 'error'"""
+        result = self.analyze_workflow(workflow_path)
+        if result is None:
+            return AnalysisRecord(result={'filename': workflow_path.name}, status='error')
+        return AnalysisRecord(
+            result=result,
+            status=result['complexity'],
+            node_count=result['node_count'],
+            has_error_handling=result['has_error_handling'],
+            labels={
+                'node_type': Counter(result['node_types']),
+                'integration': {integration: 1 for integration in result['integrations']},
+                'trigger': Counter(result['triggers']),
+                'error_handler': Counter(result['error_handlers']),
+                'pattern': {pattern: 1 for pattern in result['patterns']}
+            }
+        )
     
-    def analyze_all_workflows(self):
-        """Analyze all workflows in the repository"""
+    def analyze_all_workflows(self, force=False):
+        """Analyze changed workflows and load the aggregates used by the report"""
         print("🔍 Analyzing workflow patterns...")
         
-        analyzed_count = 0
-        for category_dir in self.workflows_dir.iterdir():
-            if category_dir.is_dir():
-                for workflow_file in category_dir.glob('*.json'):
-                    result = self.analyze_workflow(workflow_file)
-                    if result:
-                        analyzed_count += 1
+        run_stats = self.store.run(
+            self.ANALYZER_NAME, self.ANALYZER_VERSION, workflow_files(self.workflows_dir),
+            self.to_record, force=force,
+            root=self.workflows_dir
+        )
+        print(run_stats.summary())
+        
+        name = self.ANALYZER_NAME
+        self.complexity_distribution = Counter({
+            level: count for level, count in self.store.status_counts(name).items() if level != 'error'
+        })
+        self.node_types = Counter(dict(self.store.label_counts(name, 'node_type')))
+        self.integrations = Counter(dict(self.store.label_counts(name, 'integration')))
+        self.trigger_patterns = Counter(dict(self.store.label_counts(name, 'trigger')))
+        self.error_handling_patterns = Counter(dict(self.store.label_counts(name, 'error_handler')))
+        self.patterns = defaultdict(int, self.store.label_counts(name, 'pattern'))
+        
+        # Connection statistics are aggregated in SQL rather than kept as a per-workflow list
+        avg_connections, max_connections, min_connections = self.store.aggregate(
+            name,
+            "AVG(json_extract(result, '$.connection_count'))",
+            "MAX(json_extract(result, '$.connection_count'))",
+            "MIN(json_extract(result, '$.connection_count'))"
+        )
+        self.data_flow_patterns = {}
+        if avg_connections is not None:
+            self.data_flow_patterns = {
+                'avg_connections': avg_connections,
+                'max_connections': max_connections,
+                'min_connections': min_connections
+            }
         
+        analyzed_count = sum(self.complexity_distribution.values())
         print(f"✅ Analyzed {analyzed_count} workflows")
         return analyzed_count
     
@@ -172,12 +220,11 @@ class WorkflowPatternAnalyzer:
             print(f"   {error_type}: {count} uses")
         
         # Data Flow Analysis
-        if self.data_flow_patterns['total_connections']:
-            avg_connections = sum(self.data_flow_patterns['total_connections']) / len(self.data_flow_patterns['total_connections'])
+        if self.data_flow_patterns:
             print(f"\n📈 DATA FLOW ANALYSIS:")
-            print(f"   Average connections per workflow: {avg_connections:.1f}")
-            print(f"   Max connections: {max(self.data_flow_patterns['total_connections'])}")
-            print(f"   Min connections: {min(self.data_flow_patterns['total_connections'])}")
+            print(f"   Average connections per workflow: {self.data_flow_patterns['avg_connections']:.1f}")
+            print(f"   Max connections: {self.data_flow_patterns['max_connections']}")
+            print(f"   Min connections: {self.data_flow_patterns['min_connections']}")
     
     def generate_recommendations(self):
         """Generate optimization recommendations"""
@@ -212,10 +259,18 @@ class WorkflowPatternAnalyzer:
 
 def main():
     """Main analysis function"""
-    analyzer = WorkflowPatternAnalyzer()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Analyze workflow patterns')
+    parser.add_argument('--workflows-dir', default='workflows')
+    parser.add_argument('--analysis-db', help='Analysis store path (default: database/analysis.db)')
+    parser.add_argument('--force', action='store_true', help='Re-analyze every workflow, ignoring stored results')
+    args = parser.parse_args()
+    
+    analyzer = WorkflowPatternAnalyzer(args.workflows_dir, args.analysis_db)
     
     # Run analysis
-    count = analyzer.analyze_all_workflows()
+    count = analyzer.analyze_all_workflows(force=args.force)
     
     if count > 0:
         # Generate reports
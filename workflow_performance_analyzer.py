@@ -11,11 +11,22 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Tuple
 from collections import defaultdict
-import statistics
+
+from analysis_store import AnalysisRecord, AnalysisStore, workflow_files
 
 class WorkflowPerformanceAnalyzer:
-    def __init__(self, workflows_dir="workflows"):
+    ANALYZER_NAME = "performance"
+    ANALYZER_VERSION = 1  # bump when scoring changes so stored results are recomputed
+    SCORE_BANDS = [
+        ('excellent (90-100)', 90, None),
+        ('good (80-89)', 80, 90),
+        ('fair (70-79)', 70, 80),
+        ('poor (<70)', None, 70)
+    ]
+    
+    def __init__(self, workflows_dir="workflows", analysis_db=None):
         self.workflows_dir = Path(workflows_dir)
+        self.store = AnalysisStore(analysis_db)
         self.analysis_results = {
             'performance_metrics': {},
             'complexity_analysis': {},
@@ -326,75 +337,67 @@ class WorkflowPerformanceAnalyzer:
                 'overall_score': 0
             }
     
-    def analyze_all_workflows(self) -> Dict[str, Any]:
-        """Analyze all workflows and generate comprehensive report"""
+    def to_record(self, analysis: Dict[str, Any]) -> AnalysisRecord:
+        """Columns the performance report aggregates on"""
+        complexity = analysis.get('complexity', {})
+        return AnalysisRecord(
+            result=analysis,
+            workflow_name=analysis.get('workflow_name'),
+            score=analysis.get('overall_score', 0),
+            status='error' if 'error' in analysis else 'ok',
+            node_count=complexity.get('node_count'),
+            labels={'optimization': {
+                opportunity: 1 for opportunity in analysis.get('optimization_opportunities', [])
+            }}
+        )
+    
+    def analyze_all_workflows(self, force: bool = False) -> Dict[str, Any]:
+        """Analyze changed workflows and build the report from stored results"""
         print("📊 Analyzing workflow performance...")
         
+        run_stats = self.store.run(
+            self.ANALYZER_NAME, self.ANALYZER_VERSION, workflow_files(self.workflows_dir),
+            lambda path: self.to_record(self.analyze_single_workflow(path)),
+            force=force,
+            root=self.workflows_dir
+        )
+        print(run_stats.summary())
+        
+        name = self.ANALYZER_NAME
         analysis_results = {
             'timestamp': datetime.now().isoformat(),
-            'total_workflows': 0,
-            'workflow_analyses': [],
+            'total_workflows': self.store.count(name),
             'summary_statistics': {},
-            'top_performers': [],
-            'optimization_candidates': [],
-            'recommendations': []
+            'top_performers': self.store.results(name, order_by="score DESC, path", limit=10),
+            'optimization_candidates': self.store.results(
+                name, order_by="score, path", limit=10, where="score < 70"),
+            'common_opportunities': self.store.label_counts(name, 'optimization', limit=10, per_workflow=True),
+            'recommendations': [],
+            'cache': {'analyzed': run_stats.analyzed, 'reused': run_stats.reused}
         }
         
-        all_scores = []
-        
-        for category_dir in self.workflows_dir.iterdir():
-            if category_dir.is_dir():
-                for workflow_file in category_dir.glob('*.json'):
-                    analysis_results['total_workflows'] += 1
-                    analysis = self.analyze_single_workflow(workflow_file)
-                    analysis_results['workflow_analyses'].append(analysis)
-                    
-                    if 'overall_score' in analysis:
-                        all_scores.append(analysis['overall_score'])
-        
-        # Calculate summary statistics
-        if all_scores:
+        # Summary statistics come straight from SQL aggregates
+        summary = self.store.score_summary(name)
+        if summary['count']:
             analysis_results['summary_statistics'] = {
-                'average_score': round(statistics.mean(all_scores), 1),
-                'median_score': round(statistics.median(all_scores), 1),
-                'min_score': min(all_scores),
-                'max_score': max(all_scores),
-                'score_distribution': {
-                    'excellent (90-100)': len([s for s in all_scores if s >= 90]),
-                    'good (80-89)': len([s for s in all_scores if 80 <= s < 90]),
-                    'fair (70-79)': len([s for s in all_scores if 70 <= s < 80]),
-                    'poor (<70)': len([s for s in all_scores if s < 70])
-                }
+                'average_score': round(summary['average'], 1),
+                'median_score': round(summary['median'], 1),
+                'min_score': summary['min'],
+                'max_score': summary['max'],
+                'score_distribution': self.store.score_distribution(name, self.SCORE_BANDS)
             }
         
-        # Find top performers
-        sorted_analyses = sorted(
-            [a for a in analysis_results['workflow_analyses'] if 'overall_score' in a],
-            key=lambda x: x['overall_score'],
-            reverse=True
-        )
-        analysis_results['top_performers'] = sorted_analyses[:10]
-        
-        # Find optimization candidates
-        optimization_candidates = [
-            a for a in analysis_results['workflow_analyses']
-            if 'overall_score' in a and a['overall_score'] < 70
-        ]
-        analysis_results['optimization_candidates'] = sorted(
-            optimization_candidates,
-            key=lambda x: x['overall_score']
-        )[:10]
-        
         # Generate recommendations
-        if analysis_results['summary_statistics']['average_score'] < 75:
+        stats = analysis_results['summary_statistics']
+        if stats and stats['average_score'] < 75:
             analysis_results['recommendations'].append("Overall workflow quality needs improvement")
         
-        if analysis_results['summary_statistics']['score_distribution']['poor (<70)'] > analysis_results['total_workflows'] * 0.3:
+        if stats and stats['score_distribution']['poor (<70)'] > analysis_results['total_workflows'] * 0.3:
             analysis_results['recommendations'].append("Focus on improving low-performing workflows")
         
         return analysis_results
     
-    def generate_performance_report(self, analysis_results: Dict[str, Any]):
+    def generate_performance_report(self, analysis_results: Dict[str, Any], include_details: bool = False):
         """Generate comprehensive performance report"""
         print("\n" + "="*60)
         print("📊 WORKFLOW PERFORMANCE ANALYSIS REPORT")
@@ -426,6 +429,10 @@ class WorkflowPerformanceAnalyzer:
             for rec in analysis_results['recommendations']:
                 print(f"   • {rec}")
         
+        # Per-workflow analyses live in the analysis store; only embed them on request
+        if include_details:
+            analysis_results['workflow_analyses'] = self.store.results(self.ANALYZER_NAME)
+        
         # Save detailed report
         with open("workflow_performance_report.json", "w") as f:
             json.dump(analysis_results, f, indent=2)
@@ -434,9 +441,18 @@ class WorkflowPerformanceAnalyzer:
 
 def main():
     """Main performance analysis function"""
-    analyzer = WorkflowPerformanceAnalyzer()
-    analysis_results = analyzer.analyze_all_workflows()
-    analyzer.generate_performance_report(analysis_results)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Analyze workflow performance')
+    parser.add_argument('--workflows-dir', default='workflows')
+    parser.add_argument('--analysis-db', help='Analysis store path (default: database/analysis.db)')
+    parser.add_argument('--force', action='store_true', help='Re-analyze every workflow, ignoring stored results')
+    parser.add_argument('--details', action='store_true', help='Embed every per-workflow analysis in the JSON report')
+    args = parser.parse_args()
+    
+    analyzer = WorkflowPerformanceAnalyzer(args.workflows_dir, args.analysis_db)
+    analysis_results = analyzer.analyze_all_workflows(force=args.force)
+    analyzer.generate_performance_report(analysis_results, include_details=args.details)
     
     print(f"\n🎉 Performance analysis complete!")
 
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Workflow Byte Prefilter
+Skip full JSON parsing for workflow files that cannot match a rule set.
+
+Each file is memory-mapped and searched for the byte patterns of the
+rules in play (node types, keys, raw fragments) with mmap.find, which
+runs at memchr speed. Only candidate files are handed to json.load, so
+targeted scans such as "all workflows using openAi" run at close to grep
+speed.
+
+n8n exports write node types and keys literally, so a workflow using a
+node type always contains its bytes. Node type rules match ASCII case
+insensitively, like node_types_used() (openAi, lmChatOpenAi, OpenAI), so
+the prefilter never drops a file the confirmation would accept. Prefilter
+hits are candidates only, callers confirm them on the parsed data (see
+node_types_used()).
+
+Usage:
+  python workflow_prefilter.py --node-type openAi
+  python workflow_prefilter.py --node-type httpRequest --node-type code --all
+  python workflow_prefilter.py --key pinData
+"""
+
+import json
+import mmap
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+@dataclass
+class PrefilterRule:
+    """A named set of byte patterns; a file matches when any pattern occurs."""
+    name: str
+    patterns: List[bytes]
+    ignore_case: bool = False
+
+    @classmethod
+    def node_type(cls, type_fragment: str) -> "PrefilterRule":
+        """Match workflows containing a node type such as httpRequest or openAi (any case)."""
+        return cls(f"node:{type_fragment}", [type_fragment.encode('ascii')], ignore_case=True)
+
+    @classmethod
+    def key(cls, key_name: str) -> "PrefilterRule":
+        """Match workflows containing a JSON key, e.g. pinData."""
+        return cls(f"key:{key_name}", [f'"{key_name}"'.encode('ascii')])
+
+    @classmethod
+    def text(cls, fragment: str, ignore_case: bool = True) -> "PrefilterRule":
+        """Match workflows containing a raw UTF-8 fragment anywhere."""
+        return cls(f"text:{fragment}", [fragment.encode('utf-8')], ignore_case=ignore_case)
+
+
+@dataclass
+class PrefilterStats:
+    """Counters describing how much parsing the prefilter avoided."""
+    files_checked: int = 0
+    candidates: int = 0
+    parses_avoided: int = 0
+    bytes_scanned: int = 0
+    errors: int = 0
+    rule_hits: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'files_checked': self.files_checked,
+            'candidates': self.candidates,
+            'parses_avoided': self.parses_avoided,
+            'bytes_scanned': self.bytes_scanned,
+            'errors': self.errors,
+            'avoided_ratio': round(self.parses_avoided / self.files_checked, 4) if self.files_checked else 0.0,
+            'rule_hits': dict(self.rule_hits)
+        }
+
+
+class WorkflowPrefilter:
+    """Memory-mapped byte prefilter for a set of rules.
+
+    With require_all=False a file is a candidate when any rule matches;
+    with require_all=True every rule must match.
+    """
+
+    def __init__(self, rules: Sequence[PrefilterRule], require_all: bool = False):
+        if not rules:
+            raise ValueError("WorkflowPrefilter needs at least one rule")
+        self.rules = list(rules)
+        self.require_all = require_all
+        self.stats = PrefilterStats()
+        self.last_matched: set = set()
+
+        # Case-sensitive literals use find(); only case-insensitive rules pay for a regex
+        self._matchers = []
+        for rule in self.rules:
+            if rule.ignore_case:
+                regex = re.compile(b"|".join(re.escape(p) for p in rule.patterns), re.IGNORECASE)
+                self._matchers.append((rule.name, None, regex))
+            else:
+                self._matchers.append((rule.name, rule.patterns, None))
+
+    def rules_matched(self, buffer: Union[bytes, mmap.mmap]) -> set:
+        """Return the names of the matching rules.
+
+        Every rule is evaluated in any-mode, so last_matched tells callers
+        which rules hit (e.g. a key rule when a node type fails confirmation);
+        with require_all the scan stops at the first miss.
+        """
+        matched = set()
+        for name, patterns, regex in self._matchers:
+            if patterns is not None:
+                hit = any(buffer.find(p) != -1 for p in patterns)
+            else:
+                hit = regex.search(buffer) is not None
+            if hit:
+                matched.add(name)
+            elif self.require_all:
+                break
+        return matched
+
+    def matches_file(self, path: Union[str, Path]) -> bool:
+        """Test a file's raw bytes without parsing it."""
+        path = Path(path)
+        self.stats.files_checked += 1
+        try:
+            size = path.stat().st_size
+            if size == 0:
+                matched = set()
+            else:
+                with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    matched = self.rules_matched(mm)
+            self.stats.bytes_scanned += size
+        except (OSError, ValueError) as e:
+            print(f"❌ Prefilter could not read {path.name}: {e}", file=sys.stderr)
+            self.stats.errors += 1
+            return False
+
+        self.last_matched = matched
+        for name in matched:
+            self.stats.rule_hits[name] = self.stats.rule_hits.get(name, 0) + 1
+
+        is_candidate = len(matched) == len(self.rules) if self.require_all else bool(matched)
+        if is_candidate:
+            self.stats.candidates += 1
+        else:
+            self.stats.parses_avoided += 1
+        return is_candidate
+
+    def candidates(self, files: Iterable[Union[str, Path]]) -> Iterator[Path]:
+        """Yield only the files that may match."""
+        for path in files:
+            if self.matches_file(path):
+                yield Path(path)
+
+    def load_candidates(self, files: Iterable[Union[str, Path]]) -> Iterator[Tuple[Path, Dict]]:
+        """Yield (path, parsed JSON) for candidate files; unparsable files are skipped."""
+        for path in self.candidates(files):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    yield path, json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+                print(f"❌ Error reading {path.name}: {e}", file=sys.stderr)
+                self.stats.errors += 1
+
+    def report(self) -> str:
+        s = self.stats
+        ratio = (s.parses_avoided / s.files_checked * 100) if s.files_checked else 0.0
+        return (f"⚡ Prefilter: {s.candidates}/{s.files_checked} candidates, "
+                f"{s.parses_avoided} parses avoided ({ratio:.1f}%), {s.bytes_scanned:,} bytes scanned")
+
+
+def node_types_used(workflow_data: Dict, type_fragments: Sequence[str]) -> List[str]:
+    """Confirm a prefilter hit: node types containing any fragment (case-insensitive)."""
+    fragments = [f.lower() for f in type_fragments]
+    found = []
+    for node in workflow_data.get('nodes', []) or []:
+        node_type = node.get('type', '') if isinstance(node, dict) else ''
+        if any(fragment in node_type.lower() for fragment in fragments) and node_type not in found:
+            found.append(node_type)
+    return found
+
+
+def main():
+    """Find workflows using given node types or keys."""
+    import argparse
+    import time
+
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+    parser = argparse.ArgumentParser(description='Find workflows by node type or key without parsing every file')
+    parser.add_argument('--workflows-dir', default='workflows')
+    parser.add_argument('--node-type', action='append', default=[], help='Node type fragment, e.g. openAi')
+    parser.add_argument('--key', action='append', default=[], help='JSON key that must be present')
+    parser.add_argument('--all', action='store_true', help='Require every rule instead of any')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    rules = [PrefilterRule.node_type(t) for t in args.node_type] + [PrefilterRule.key(k) for k in args.key]
+    if not rules:
+        parser.error("give at least one --node-type or --key")
+
+    prefilter = WorkflowPrefilter(rules, require_all=args.all)
+    files = sorted(Path(args.workflows_dir).rglob("*.json"))
+
+    start = time.perf_counter()
+    matches = []
+    for path, data in prefilter.load_candidates(files):
+        # Key patterns include the quotes and are exact; node types are confirmed on the parsed nodes
+        types = node_types_used(data, args.node_type) if args.node_type else []
+        confirmed = [t for t in args.node_type if any(t.lower() in used.lower() for used in types)]
+        if args.all:
+            if len(confirmed) < len(args.node_type):
+                continue
+        elif not confirmed and not any(name.startswith("key:") for name in prefilter.last_matched):
+            continue
+        matches.append({'file': str(path), 'node_types': types})
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps({'matches': matches, 'prefilter': prefilter.stats.to_dict(),
+                          'seconds': round(elapsed, 4)}, indent=2, ensure_ascii=False))
+        return
+
+    for match in matches:
+        print(f"  {match['file']}  {', '.join(match['node_types'])}")
+    print(f"\n🔍 {len(matches)} matching workflows in {elapsed:.2f}s")
+    print(prefilter.report())
+
+
+if __name__ == "__main__":
+    main()
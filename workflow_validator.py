@@ -11,9 +11,30 @@ from typing import Dict, List, Any, Tuple
 import re
 from collections import defaultdict
 
+from analysis_store import AnalysisRecord, AnalysisStore, workflow_files
+from security_scanner import SecretScanner, KIND_SENSITIVE_KEY, KIND_HARDCODED_URL
+
+NODE_PARAMETER_SCANNER = SecretScanner(
+    key_rules={'sensitive': [
+        'password', 'token', 'key', 'secret', 'credential',
+        'api_key', 'access_token', 'refresh_token'
+    ]},
+    url_pattern=r'https?://[^\s]+'
+)
+
 class WorkflowValidator:
-    def __init__(self, workflows_dir="workflows"):
+    ANALYZER_NAME = "validator"
+    ANALYZER_VERSION = 1  # bump when checks or scoring change so stored results are recomputed
+    QUALITY_BANDS = [
+        ('Excellent (90-100)', 90, None),
+        ('Good (80-89)', 80, 90),
+        ('Fair (70-79)', 70, 80),
+        ('Poor (<70)', None, 70)
+    ]
+    
+    def __init__(self, workflows_dir="workflows", analysis_db=None):
         self.workflows_dir = Path(workflows_dir)
+        self.store = AnalysisStore(analysis_db)
         self.validation_results = defaultdict(list)
         self.quality_scores = {}
         self.security_issues = []
@@ -58,43 +79,19 @@ class WorkflowValidator:
         """Validate individual node configuration"""
         issues = []
         
-        # Check for sensitive data in parameters
-        parameters = node.get('parameters', {})
-        sensitive_patterns = [
-            r'password', r'token', r'key', r'secret', r'credential',
-            r'api_key', r'access_token', r'refresh_token'
-        ]
-        
-        def check_sensitive_data(obj, path=""):
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
-                    if any(pattern in key.lower() for pattern in sensitive_patterns):
-                        if value and str(value).strip() and value != "":
-                            issues.append(f"Sensitive data found in {current_path}")
-                    check_sensitive_data(value, current_path)
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    check_sensitive_data(item, f"{path}[{i}]")
-        
-        check_sensitive_data(parameters)
-        
-        # Check for hardcoded URLs (potential security issue)
-        def check_hardcoded_urls(obj, path=""):
-            if isinstance(obj, str):
-                url_pattern = r'https?://[^\s]+'
-                if re.search(url_pattern, obj):
-                    if not any(placeholder in obj for placeholder in ['{{', '${', 'YOUR_', 'PLACEHOLDER']):
-                        issues.append(f"Hardcoded URL found in {path}")
-            elif isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
-                    check_hardcoded_urls(value, current_path)
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    check_hardcoded_urls(item, f"{path}[{i}]")
-        
-        check_hardcoded_urls(parameters)
+        # Check for sensitive data and hardcoded URLs in parameters (single pass)
+        findings = NODE_PARAMETER_SCANNER.scan(node.get('parameters', {}))
+        
+        for finding in findings:
+            if finding.kind == KIND_SENSITIVE_KEY:
+                issues.append(f"Sensitive data found in {finding.path}")
+        
+        # Hardcoded URLs are a potential security issue; report each string once
+        url_paths = []
+        for finding in findings:
+            if finding.kind == KIND_HARDCODED_URL and finding.path not in url_paths:
+                url_paths.append(finding.path)
+        issues.extend(f"Hardcoded URL found in {path}" for path in url_paths)
         
         return issues
     
@@ -299,27 +296,39 @@ class WorkflowValidator:
                 'workflow_name': 'Error'
             }
     
-    def validate_all_workflows(self) -> Dict[str, Any]:
-        """Validate all workflows in the repository"""
+    def to_record(self, result: Dict[str, Any]) -> AnalysisRecord:
+        """Columns the validation report aggregates on"""
+        issue_types = defaultdict(int)
+        for issue in result['issues']:
+            issue_type = issue.split(':')[0] if ':' in issue else issue
+            issue_types[issue_type] += 1
+        return AnalysisRecord(
+            result=result,
+            workflow_name=result['workflow_name'],
+            score=result['quality_score'],
+            status='valid' if not result['issues'] else 'invalid',
+            node_count=result['node_count'],
+            issue_count=len(result['issues']),
+            has_error_handling=result['has_error_handling'],
+            labels={'issue': dict(issue_types)}
+        )
+    
+    def validate_all_workflows(self, force: bool = False) -> Dict[str, Any]:
+        """Validate changed workflows and summarize all stored results"""
         print("🔍 Validating all workflows...")
         
-        validation_results = []
-        total_workflows = 0
-        valid_workflows = 0
-        high_quality_workflows = 0
-        
-        for category_dir in self.workflows_dir.iterdir():
-            if category_dir.is_dir():
-                for workflow_file in category_dir.glob('*.json'):
-                    total_workflows += 1
-                    result = self.validate_single_workflow(workflow_file)
-                    validation_results.append(result)
-                    
-                    if not result['issues']:
-                        valid_workflows += 1
-                    
-                    if result['quality_score'] >= 80:
-                        high_quality_workflows += 1
+        run_stats = self.store.run(
+            self.ANALYZER_NAME, self.ANALYZER_VERSION, workflow_files(self.workflows_dir),
+            lambda path: self.to_record(self.validate_single_workflow(path)),
+            force=force,
+            root=self.workflows_dir
+        )
+        print(run_stats.summary())
+        
+        name = self.ANALYZER_NAME
+        total_workflows = self.store.count(name)
+        valid_workflows = self.store.count(name, "issue_count = 0")
+        high_quality_workflows = self.store.count(name, "score >= 80")
         
         # Generate summary
         summary = {
@@ -328,7 +337,7 @@ class WorkflowValidator:
             'high_quality_workflows': high_quality_workflows,
             'validation_rate': (valid_workflows / total_workflows * 100) if total_workflows > 0 else 0,
             'quality_rate': (high_quality_workflows / total_workflows * 100) if total_workflows > 0 else 0,
-            'results': validation_results
+            'cache': {'analyzed': run_stats.analyzed, 'reused': run_stats.reused}
         }
         
         print(f"✅ Validated {total_workflows} workflows")
@@ -337,7 +346,7 @@ class WorkflowValidator:
         
         return summary
     
-    def generate_validation_report(self, summary: Dict[str, Any]):
+    def generate_validation_report(self, summary: Dict[str, Any], include_details: bool = False):
         """Generate comprehensive validation report"""
         print("\n" + "="*60)
         print("📋 WORKFLOW VALIDATION REPORT")
@@ -349,28 +358,15 @@ class WorkflowValidator:
         print(f"   High Quality: {summary['high_quality_workflows']} ({summary['quality_rate']:.1f}%)")
         
         # Issue analysis
-        issue_counts = defaultdict(int)
-        for result in summary['results']:
-            for issue in result['issues']:
-                issue_type = issue.split(':')[0] if ':' in issue else issue
-                issue_counts[issue_type] += 1
-        
+        name = self.ANALYZER_NAME
+        summary['common_issues'] = self.store.label_counts(name, 'issue', limit=10)
         print(f"\n⚠️  MOST COMMON ISSUES:")
-        for issue_type, count in sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)[:10]:
+        for issue_type, count in summary['common_issues']:
             print(f"   {issue_type}: {count} workflows")
         
         # Quality distribution
-        quality_ranges = {'Excellent (90-100)': 0, 'Good (80-89)': 0, 'Fair (70-79)': 0, 'Poor (<70)': 0}
-        for result in summary['results']:
-            score = result['quality_score']
-            if score >= 90:
-                quality_ranges['Excellent (90-100)'] += 1
-            elif score >= 80:
-                quality_ranges['Good (80-89)'] += 1
-            elif score >= 70:
-                quality_ranges['Fair (70-79)'] += 1
-            else:
-                quality_ranges['Poor (<70)'] += 1
+        quality_ranges = self.store.score_distribution(name, self.QUALITY_BANDS)
+        summary['quality_distribution'] = quality_ranges
         
         print(f"\n⭐ QUALITY DISTRIBUTION:")
         for range_name, count in quality_ranges.items():
@@ -378,10 +374,16 @@ class WorkflowValidator:
             print(f"   {range_name}: {count} workflows ({percentage:.1f}%)")
         
         # Error handling analysis
-        error_handling_count = sum(1 for result in summary['results'] if result['has_error_handling'])
+        error_handling_count = self.store.totals(
+            name, {'with_error_handling': 'COALESCE(SUM(has_error_handling), 0)'})['with_error_handling']
+        summary['error_handling_workflows'] = error_handling_count
         print(f"\n🛡️ ERROR HANDLING:")
         print(f"   Workflows with error handling: {error_handling_count} ({error_handling_count/summary['total_workflows']*100:.1f}%)")
         
+        # Per-workflow results live in the analysis store; only embed them on request
+        if include_details:
+            summary['results'] = self.store.results(name)
+        
         # Save detailed report
         with open("workflow_validation_report.json", "w") as f:
             json.dump(summary, f, indent=2)
@@ -390,13 +392,22 @@ class WorkflowValidator:
 
 def main():
     """Main validation function"""
-    validator = WorkflowValidator()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Validate all workflows')
+    parser.add_argument('--workflows-dir', default='workflows')
+    parser.add_argument('--analysis-db', help='Analysis store path (default: database/analysis.db)')
+    parser.add_argument('--force', action='store_true', help='Re-validate every workflow, ignoring stored results')
+    parser.add_argument('--details', action='store_true', help='Embed every per-workflow result in the JSON report')
+    args = parser.parse_args()
+    
+    validator = WorkflowValidator(args.workflows_dir, args.analysis_db)
     
     # Run validation
-    summary = validator.validate_all_workflows()
+    summary = validator.validate_all_workflows(force=args.force)
     
     # Generate report
-    validator.generate_validation_report(summary)
+    validator.generate_validation_report(summary, include_details=args.details)
     
     print(f"\n🎉 Workflow validation complete!")
 